@@ -0,0 +1,7 @@
+"""
+Shared data-access and analysis helpers used by the figure and table scripts.
+
+The figure scripts add the ``code/`` directory to ``sys.path`` and import from
+this package, e.g. ``from common.data_access import load_dataset``.
+Command-line tools are run from ``code/`` with ``python -m common.<module>``.
+"""
@@ -0,0 +1,183 @@
+"""
+AI Methods × Megatrends Heatmap - Yellow color scheme
+
+Drawn from an AI method x megatrend count table (rows by total, with a
+Total column) for every article subset by common.pipeline.
+"""
+
+import matplotlib.pyplot as plt
+from matplotlib.colors import LinearSegmentedColormap
+from matplotlib.patches import Rectangle
+import numpy as np
+
+from common.export import save_figure
+from common.heatmap import (annotate_cells, cell_colors, count_labels, draw_cells,
+                            draw_gradient, log_scale)
+
+# PDF settings for editable text in Illustrator (applied by common.pipeline)
+RC_PARAMS = {'pdf.fonttype': 42, 'ps.fonttype': 42, 'svg.fonttype': 'none'}
+
+# Megatrend colors
+MEGATREND_COLORS = {
+    'Digital Transformation & Smart Cities': '#1565C0',
+    'Climate Change & Environmental Sustainability': '#2E7D32',
+    'Urban Mobility & Transportation': '#EF6C00',
+    'Social Equity & Quality of Life': '#00838F',
+    'Urban Development & Land Use': '#7B1FA2',
+    'Urban Resilience & Safety': '#C62828',
+}
+
+MEGATREND_SHORT = {
+    'Digital Transformation & Smart Cities': 'Digital &\nSmart Cities',
+    'Climate Change & Environmental Sustainability': 'Climate &\nEnvironment',
+    'Urban Mobility & Transportation': 'Mobility &\nTransportation',
+    'Social Equity & Quality of Life': 'Social Equity\n& QoL',
+    'Urban Development & Land Use': 'Urban\nDevelopment',
+    'Urban Resilience & Safety': 'Resilience\n& Safety',
+}
+
+MEGATREND_ORDER = [
+    'Digital Transformation & Smart Cities',
+    'Climate Change & Environmental Sustainability',
+    'Urban Mobility & Transportation',
+    'Social Equity & Quality of Life',
+    'Urban Development & Land Use',
+    'Urban Resilience & Safety',
+]
+
+# Column order of the non-empirical heatmap (by article count)
+MEGATREND_ORDER_BY_COUNT = [
+    'Digital Transformation & Smart Cities',
+    'Urban Mobility & Transportation',
+    'Climate Change & Environmental Sustainability',
+    'Urban Development & Land Use',
+    'Urban Resilience & Safety',
+    'Social Equity & Quality of Life',
+]
+
+
+# Font sizes of the figure text
+FONT_SIZES = {'cell': 16, 'header': 13, 'label': 15, 'total': 16, 'title': 20, 'colorbar': 12}
+
+
+def create_heatmap(table, title, stem, megatrend_order=MEGATREND_ORDER, font_sizes=None,
+                   left_margin=5.5, formats=('pdf', 'png')):
+    """Create heatmap with yellow color scheme
+
+    table is indexed by AI method with one column per megatrend plus Total;
+    a Total row is ignored. font_sizes overrides entries of FONT_SIZES.
+    """
+    fs = {**FONT_SIZES, **(font_sizes or {})}
+    df = table.drop(index='Total', errors='ignore').rename_axis('AI_Method').reset_index()
+    
+    # Yellow/Amber color scheme
+    colors_cmap = ['#FFFFFF', '#FFFDE7', '#FFF59D', '#FFEE58', '#FDD835', '#F9A825', '#F57F17']
+    cmap = LinearSegmentedColormap.from_list('yellow_heat', colors_cmap, N=256)
+    
+    # Use available megatrend columns
+    megatrend_cols = [col for col in megatrend_order if col in df.columns]
+    
+    df_sorted = df.sort_values('Total', ascending=False).reset_index(drop=True)
+    
+    methods = df_sorted['AI_Method'].tolist()
+    values = df_sorted[megatrend_cols].values.astype(float)
+    totals = df_sorted['Total'].values
+    
+    n_methods = len(methods)
+    n_mega = len(megatrend_cols)
+    
+    # Cell dimensions
+    cell_width = 2.8
+    cell_height = 0.75
+    
+    right_margin = 2.8
+    top_margin = 3.2
+    bottom_margin = 2.0
+    
+    fig_width = left_margin + n_mega * cell_width + right_margin
+    fig_height = top_margin + n_methods * cell_height + bottom_margin
+    
+    fig, ax = plt.subplots(figsize=(fig_width, fig_height))
+    
+    vmax = values.max() if values.max() > 0 else 1
+    
+    x_start = left_margin
+    y_start = top_margin
+    
+    # Draw heatmap cells as one collection, zero cells in grey
+    zero = values == 0
+    colors = cell_colors(log_scale(values, vmax), cmap, zero)
+    draw_cells(ax, colors, x_start, y_start, cell_width, cell_height, linewidth=2)
+    annotate_cells(ax, count_labels(values), x_start, y_start, cell_width, cell_height,
+                   colors=np.where(zero, '#BDBDBD', '#5D4037'),
+                   fontweights=np.where(zero, 'normal', 'bold'), fontsize=fs['cell'])
+
+    # Megatrend headers
+    header_box_y = y_start - 0.9
+    header_text_y = y_start - 1.8
+    
+    for j, mt in enumerate(megatrend_cols):
+        x = x_start + j * cell_width
+        
+        box_margin = 0.35
+        rect = Rectangle((x + box_margin, header_box_y), cell_width - 2*box_margin, 0.65,
+                        facecolor=MEGATREND_COLORS.get(mt, '#888888'), edgecolor='none')
+        ax.add_patch(rect)
+        
+        short_name = MEGATREND_SHORT.get(mt, mt)
+        ax.text(x + cell_width/2, header_text_y, short_name, 
+               ha='center', va='top', fontsize=fs['header'], fontweight='bold', 
+               color='#333333', linespacing=0.85)
+    
+    # AI Method labels
+    for i, method in enumerate(methods):
+        y = y_start + i * cell_height
+        ax.text(x_start - 0.5, y + cell_height/2, method, 
+               ha='right', va='center', fontsize=fs['label'], color='#222222', fontweight='medium')
+    
+    # Total column
+    total_x = x_start + n_mega * cell_width + 0.7
+    
+    ax.text(total_x, header_box_y + 0.35, 'Total', ha='left', va='center',
+           fontsize=fs['label'], fontweight='bold', color='#333333')
+    
+    for i, total in enumerate(totals):
+        y = y_start + i * cell_height
+        ax.text(total_x, y + cell_height/2, f'{int(total):,}', 
+               ha='left', va='center', fontsize=fs['total'], fontweight='bold', 
+               color='#E65100')  # Orange for totals
+    
+    ax.set_xlim(0, fig_width)
+    ax.set_ylim(fig_height, 0)
+    ax.axis('off')
+    
+    # Title
+    ax.text(x_start + (n_mega * cell_width) / 2, 0.8, 
+           title, ha='center', va='center', fontsize=fs['title'], fontweight='bold')
+    
+    # Colorbar
+    cbar_width = n_mega * cell_width * 0.45
+    cbar_height = 0.4
+    cbar_x = x_start + (n_mega * cell_width - cbar_width) / 2
+    cbar_y = y_start + n_methods * cell_height + 0.8
+    
+    draw_gradient(ax, cmap, cbar_x, cbar_y, cbar_width, cbar_height)
+
+    rect = Rectangle((cbar_x, cbar_y), cbar_width, cbar_height,
+                    facecolor='none', edgecolor='#999999', linewidth=1)
+    ax.add_patch(rect)
+    
+    ax.text(cbar_x, cbar_y + cbar_height + 0.25, '1', ha='center', va='bottom', 
+           fontsize=fs['colorbar'], color='#555555')
+    ax.text(cbar_x + cbar_width, cbar_y + cbar_height + 0.25, f'{int(vmax)}', 
+           ha='center', va='bottom', fontsize=fs['colorbar'], color='#555555')
+    ax.text(cbar_x + cbar_width/2, cbar_y + cbar_height + 0.25, 
+           'Articles (log scale)', ha='center', va='bottom', fontsize=fs['colorbar'], color='#555555')
+    
+    plt.tight_layout()
+    
+    # Save
+    paths = save_figure(fig, stem, formats=formats, dpi=300, facecolor='white')
+    
+    print(f"Saved: {', '.join(p.name for p in paths)}")
+    plt.close()
@@ -0,0 +1,345 @@
+"""
+Build orchestrator for the processed tables and figures
+
+Every table and figure script is a node with declared inputs (datasets and
+processed tables) and outputs. Code inputs are found automatically: the
+script itself plus every common module it imports, transitively. A node
+depends on the nodes that produce its inputs, which gives the build DAG:
+
+    datasets -> tables (common.crosstab) -> heatmaps, dendrogram, ...
+    datasets -> DCA plots, overview figure, AI task x SDG table
+    curated AI method and task tables -> their heatmaps and charts
+
+A node is up to date when all its outputs exist and the SHA-256 of all its
+inputs equals the one recorded after its last successful run (in
+data/cache/build/state.json). Out-of-date nodes run in a process pool as
+soon as their upstream nodes are done; since hashes are taken when a node
+becomes ready, a rebuilt table whose bytes did not change does not trigger
+its figures. File hashes are memoised by size and mtime, so checking an
+up-to-date tree costs a few stat calls.
+
+Usage (from code/):
+    python -m common.build                  # rebuild everything out of date
+    python -m common.build --dry-run        # list what would run
+    python -m common.build dendrogram_empirical -j 2
+    python -m common.build --force tables   # rerun a node regardless of hashes
+"""
+
+import argparse
+import contextlib
+import hashlib
+import io
+import json
+import os
+import re
+import runpy
+import sys
+import time
+import traceback
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+from common.crosstab import TABLES
+from common.data_access import CACHE_DIR, DATASETS, PROCESSED_DIR, REPO_ROOT, content_hash
+
+CODE_DIR = REPO_ROOT / 'code'
+STATE_PATH = CACHE_DIR / 'build' / 'state.json'
+IMPORT_PATTERN = re.compile(r'^\s*(?:from|import)\s+common\.(\w+)', re.MULTILINE)
+# 'from common import a, b'
+MODULES_IMPORT_PATTERN = re.compile(r'^\s*from\s+common\s+import\s+([\w, ]+)$', re.MULTILINE)
+
+
+def script_node(script, inputs, outputs):
+    """Node that runs a script from its own directory; relative outputs are relative to it"""
+    path = CODE_DIR / script
+    return {'script': path, 'inputs': inputs, 'outputs': [path.parent / o for o in outputs]}
+
+
+def figures(*stems, formats=('pdf', 'png')):
+    """Output file names of figures saved in several formats"""
+    return [f'{stem}.{fmt}' for stem in stems for fmt in formats]
+
+
+# Inputs are dataset names (common.data_access.DATASETS) or paths relative
+# to data/processed
+NODES = {
+    'tables': {
+        'module': 'common.crosstab',
+        'inputs': sorted({spec['subset'] for spec in TABLES.values()}),
+        'outputs': [PROCESSED_DIR / rel for rel in TABLES]},
+    'ai_task_sdg_table_empirical': script_node(
+        'empirical_analysis/create_descriptive_ai_task_sdg_table.py', ['empirical'],
+        ['ai_task_sdg_table.csv', 'ai_task_sdg_table.md']),
+
+    'overview': script_node(
+        'overview/create_overview_figure.py', ['full', 'overview/world_countries_110m.npz'],
+        figures('overview_figure')),
+
+    'ai_methods_heatmap_empirical': script_node(
+        'empirical_analysis/ai_methods_heatmap.py', ['empirical/ai_method_megatrend_table.csv'],
+        figures('ai_methods_heatmap', formats=('pdf', 'png', 'svg'))),
+    'ai_task_sdg_charts_empirical': script_node(
+        'empirical_analysis/ai_task_sdg_visualization.py', ['empirical/ai_task_sdg_table.csv'],
+        figures('option1_stacked_bar', 'option2_percentage_bar', 'option3_grouped_bar',
+                'option4_lollipop', 'option5_bubble', 'option6_diverging', 'option7_donut',
+                'option8_proportional')),
+    'dca_empirical': script_node(
+        'empirical_analysis/create_dca_plot.py', ['full'], figures('dca_plot_v2')),
+    'dendrogram_empirical': script_node(
+        'empirical_analysis/create_dendrogram.py',
+        ['empirical/hierarchy_taxonomy.csv', 'empirical/megatrend_sdg_sustainability_table.csv'],
+        figures('dendrogram_final')),
+    'research_characteristics_empirical': script_node(
+        'empirical_analysis/research_characteristics_viz.py', ['empirical'],
+        figures('research_characteristics_heatmap', 'research_characteristics_bars')),
+    'sdg_heatmap_empirical': script_node(
+        'empirical_analysis/sdg_heatmap_combined.py',
+        ['empirical/megatrend_sdg_sustainability_table.csv'], figures('sdg_heatmap_combined')),
+
+    'ai_methods_heatmap_non_empirical': script_node(
+        'non_empirical_analysis/ai_methods_heatmap.py',
+        ['non_empirical/ai_method_megatrend_table.csv'], figures('ai_methods_heatmap')),
+    'ai_task_sdg_charts_non_empirical': script_node(
+        'non_empirical_analysis/ai_task_sdg_visualization.py',
+        ['non_empirical/ai_task_sdg_table.csv'],
+        figures('ai_task_sdg_absolute', 'ai_task_sdg_percentage', 'ai_task_sdg_bubble')),
+    'dca_non_empirical': script_node(
+        'non_empirical_analysis/create_dca_plot.py', ['full'], figures('dca_plot_non_empirical')),
+    'dendrogram_non_empirical': script_node(
+        'non_empirical_analysis/create_dendrogram.py',
+        ['non_empirical/hierarchy_taxonomy.csv',
+         'non_empirical/megatrend_sdg_sustainability_table.csv'],
+        figures('dendrogram_non_empirical')),
+    'research_characteristics_non_empirical': script_node(
+        'non_empirical_analysis/research_characteristics_viz.py', ['non_empirical'],
+        figures('research_characteristics_heatmap')),
+    'sdg_heatmap_non_empirical': script_node(
+        'non_empirical_analysis/sdg_heatmap_combined.py',
+        ['non_empirical/megatrend_sdg_sustainability_table.csv'],
+        figures('sdg_heatmap_non_empirical')),
+}
+
+
+def resolve_input(name):
+    """Path of a declared input: dataset name or path relative to data/processed"""
+    return DATASETS[name] if name in DATASETS else PROCESSED_DIR / name
+
+
+def code_inputs(node):
+    """The node's script or module plus all common modules it imports"""
+    entry = node.get('script') or CODE_DIR / (node['module'].replace('.', '/') + '.py')
+    seen, todo = {entry}, [entry]
+    while todo:
+        source = todo.pop().read_text(encoding='utf-8')
+        modules = IMPORT_PATTERN.findall(source) + [
+            name.strip() for names in MODULES_IMPORT_PATTERN.findall(source)
+            for name in names.split(',')]
+        for module in modules:
+            path = CODE_DIR / 'common' / f'{module}.py'
+            if path not in seen and path.exists():
+                seen.add(path)
+                todo.append(path)
+    return sorted(seen)
+
+
+def node_inputs(node):
+    """All input paths of a node, data first, then code"""
+    return [resolve_input(name) for name in node['inputs']] + code_inputs(node)
+
+
+def dependencies(nodes):
+    """Upstream nodes of every node: those producing one of its inputs"""
+    producers = {out.resolve(): name for name, node in nodes.items() for out in node['outputs']}
+    return {name: sorted({producers[p.resolve()] for p in node_inputs(node)
+                          if p.resolve() in producers} - {name})
+            for name, node in nodes.items()}
+
+
+def with_upstream(names, deps):
+    """Selected nodes and everything they depend on"""
+    selected, todo = set(), list(names)
+    while todo:
+        name = todo.pop()
+        if name not in selected:
+            selected.add(name)
+            todo.extend(deps[name])
+    return selected
+
+
+class HashMemo:
+    """Content hashes memoised by (size, mtime), persisted with the build state"""
+
+    def __init__(self, entries):
+        self.entries = entries
+
+    def __call__(self, path):
+        stat = path.stat()
+        key = str(path.resolve().relative_to(REPO_ROOT))
+        size, mtime, digest = self.entries.get(key, (None, None, None))
+        if (size, mtime) != (stat.st_size, stat.st_mtime_ns):
+            digest = content_hash(path)
+            self.entries[key] = (stat.st_size, stat.st_mtime_ns, digest)
+        return digest
+
+
+def load_state():
+    if STATE_PATH.exists():
+        return json.loads(STATE_PATH.read_text(encoding='utf-8'))
+    return {'nodes': {}, 'files': {}}
+
+
+def save_state(state):
+    STATE_PATH.parent.mkdir(parents=True, exist_ok=True)
+    tmp = STATE_PATH.with_name(f'{STATE_PATH.name}.{os.getpid()}.tmp')
+    tmp.write_text(json.dumps(state, indent=1, sort_keys=True), encoding='utf-8')
+    os.replace(tmp, STATE_PATH)
+
+
+def input_digest(node, file_hash):
+    """Digest over the command and the content of every input; None if one is missing"""
+    digest = hashlib.sha256(str(node.get('script') or node['module']).encode())
+    for path in node_inputs(node):
+        if not path.exists():
+            return None
+        digest.update(f'{path.resolve().relative_to(REPO_ROOT)}\0{file_hash(path)}\n'.encode())
+    return digest.hexdigest()
+
+
+def run_node(node):
+    """Run one node in a pool worker; returns (ok, seconds, captured output)"""
+    import matplotlib
+    import matplotlib.pyplot as plt
+
+    start = time.perf_counter()
+    log = io.StringIO()
+    cwd, argv = os.getcwd(), sys.argv
+    try:
+        with contextlib.redirect_stdout(log), contextlib.redirect_stderr(log):
+            matplotlib.rcdefaults()
+            if 'script' in node:
+                os.chdir(node['script'].parent)
+                sys.argv = [str(node['script'])]
+                runpy.run_path(str(node['script']), run_name='__main__')
+            else:
+                os.chdir(CODE_DIR)
+                sys.argv = [node['module']]
+                runpy.run_module(node['module'], run_name='__main__', alter_sys=True)
+        ok = True
+    except SystemExit as exit:
+        # Scripts ending in raise SystemExit(main()) succeed with status 0
+        ok = exit.code in (None, 0)
+        if not ok:
+            log.write(f"exit status {exit.code}\n")
+    except BaseException:
+        log.write(traceback.format_exc())
+        ok = False
+    finally:
+        plt.close('all')
+        os.chdir(cwd)
+        sys.argv = argv
+    return ok, time.perf_counter() - start, log.getvalue()
+
+
+def build(names=None, jobs=None, force=(), dry_run=False, verbose=False, nodes=NODES):
+    """Bring the selected nodes (default: all) up to date; returns {node: status}"""
+    deps = dependencies(nodes)
+    selected = with_upstream(names or nodes, deps)
+    state = load_state()
+    file_hash = HashMemo(state['files'])
+    status, pending, running = {}, set(selected), {}
+
+    os.environ.setdefault('MPLBACKEND', 'Agg')
+    pool = None if dry_run else ProcessPoolExecutor(max_workers=jobs)
+    try:
+        while pending or running:
+            ready = sorted(n for n in pending if all(d in status for d in deps[n]))
+            for name in ready:
+                pending.discard(name)
+                node = nodes[name]
+                upstream = [status[d] for d in deps[name]]
+                if any(s in ('failed', 'skipped') for s in upstream):
+                    status[name] = 'skipped'
+                    continue
+                if dry_run and any(s == 'stale' for s in upstream):
+                    status[name] = 'stale'
+                    continue
+                digest = input_digest(node, file_hash)
+                if digest is None:
+                    missing = [str(p.relative_to(REPO_ROOT)) for p in node_inputs(node)
+                               if not p.exists()]
+                    print(f"  {name}: missing input {', '.join(missing)}")
+                    status[name] = 'failed'
+                    continue
+                recorded = state['nodes'].get(name, {}).get('inputs')
+                fresh = (recorded == digest and name not in force
+                         and all(out.exists() for out in node['outputs']))
+                if fresh:
+                    status[name] = 'up to date'
+                elif dry_run:
+                    status[name] = 'stale'
+                else:
+                    running[pool.submit(run_node, node)] = (name, digest)
+
+            if not running:
+                if pending and not ready:
+                    raise RuntimeError(f"dependency cycle among {sorted(pending)}")
+                continue
+
+            finished, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in finished:
+                name, digest = running.pop(future)
+                ok, seconds, log = future.result()
+                status[name] = 'built' if ok else 'failed'
+                print(f"  {name}: {status[name]} in {seconds:.1f}s")
+                if verbose or not ok:
+                    print('    ' + log.strip().replace('\n', '\n    '))
+                if ok:
+                    state['nodes'][name] = {'inputs': digest}
+                else:
+                    state['nodes'].pop(name, None)
+                save_state(state)
+    finally:
+        if pool is not None:
+            pool.shutdown()
+    if not dry_run:
+        save_state(state)
+    return status
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('nodes', nargs='*', help='Nodes to build with their upstream (default: all)')
+    parser.add_argument('-j', '--jobs', type=int, default=None,
+                        help='Worker processes (default: number of CPUs)')
+    parser.add_argument('--force', nargs='*', default=None, metavar='NODE',
+                        help='Rerun these nodes (all selected if none given) regardless of hashes')
+    parser.add_argument('--dry-run', action='store_true', help='Only report out-of-date nodes')
+    parser.add_argument('-v', '--verbose', action='store_true', help='Show script output')
+    parser.add_argument('--list', action='store_true', help='List nodes and their upstream')
+    args = parser.parse_args()
+
+    unknown = [n for n in args.nodes + (args.force or []) if n not in NODES]
+    if unknown:
+        parser.error(f"unknown node(s): {', '.join(unknown)}")
+    if args.list:
+        for name, upstream in dependencies(NODES).items():
+            print(f"{name}" + (f"  <- {', '.join(upstream)}" if upstream else ''))
+        return
+
+    force = set(args.force) if args.force else set()
+    if args.force == []:
+        force = set(args.nodes or NODES)
+
+    start = time.perf_counter()
+    status = build(args.nodes, jobs=args.jobs, force=force, dry_run=args.dry_run,
+                   verbose=args.verbose)
+    counts = {s: sum(1 for v in status.values() if v == s) for s in sorted(set(status.values()))}
+    print(', '.join(f'{n} {s}' for s, n in counts.items()) + f" ({time.perf_counter() - start:.1f}s)")
+    if args.dry_run:
+        for name in sorted(n for n, s in status.items() if s == 'stale'):
+            print(f"  would build {name}")
+    if 'failed' in status.values():
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
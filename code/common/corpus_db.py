@@ -0,0 +1,190 @@
+"""
+SQLite export of the coded corpus for ad-hoc analysis
+
+Writes the full coded dataset into one SQLite file that only needs the
+Python standard library (sqlite3) or the sqlite3 shell to query:
+
+    articles        one row per article; row_id is the row in clean_research.csv,
+                    headers are snake_case (e.g. 'Cited by' -> cited_by) and
+                    sdg holds the leading SDG number of sdg_alignment
+    articles_fts    FTS5 index over title and abstract (porter stemming)
+    empirical, non_empirical
+                    views of the article-type subsets
+    xt_*            the crosstab tables of data/processed/ that common.crosstab
+                    rebuilds, materialised in long form (row_label, col_label,
+                    n) and listed in crosstabs; the curated AI method and task
+                    tables are not among them
+
+The coded dimensions (year, country, megatrend, SDG, AI method and task,
+article type) have B-tree indexes, so filtered counts do not scan the
+table. The file is rebuilt only when clean_research.csv changed.
+
+    SELECT subject_megatrend, count(*) FROM articles
+     WHERE year >= 2023 AND country_first_author = 'China' GROUP BY 1;
+    SELECT a.year, a.title FROM articles_fts f JOIN articles a ON a.row_id = f.rowid
+     WHERE articles_fts MATCH 'title:"graph neural" AND abstract:traffic';
+    SELECT * FROM xt_empirical_frequency_spatial_scale WHERE col_label = 'Total';
+
+Usage (from code/):
+    python -m common.corpus_db                 # write data/cache/clean_research.sqlite
+    python -m common.corpus_db --out corpus.sqlite --force
+"""
+
+import argparse
+import contextlib
+import os
+import re
+import sqlite3
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from common.crosstab import DERIVED, TABLES, build_tables
+from common.data_access import (CACHE_DIR, SUBSETS, content_hash, load_dataset, resolve_path,
+                                subset_mask)
+
+DEFAULT_PATH = CACHE_DIR / 'clean_research.sqlite'
+
+# Bump when the schema changes so existing databases are rebuilt
+SCHEMA_VERSION = 2
+
+INTEGER_COLUMNS = {'year', 'cited_by', 'sdg'}
+
+# Coded dimensions with a B-tree index
+INDEXED_COLUMNS = ['year', 'country_first_author', 'subject_megatrend', 'sdg', 'ai_method',
+                   'ai_task', 'article_type']
+
+FTS_COLUMNS = ['title', 'abstract']
+
+
+def sql_name(column):
+    """snake_case SQL identifier of a dataset header, e.g. 'Author(s) ID' -> author_s_id"""
+    return re.sub(r'\W+', '_', column.strip().lower()).strip('_')
+
+
+def article_rows(df):
+    """The articles table: snake_case columns, derived sdg number, None for missing"""
+    table = df.rename(columns=sql_name)
+    column, derive = DERIVED['sdg']
+    table['sdg'] = pd.to_numeric(derive(df[column]), errors='coerce').astype('Int64')
+    table.insert(0, 'row_id', np.arange(len(table)))
+    return table
+
+
+def create_articles(con, table):
+    """Create and fill the articles table"""
+    columns = [c for c in table.columns if c != 'row_id']
+    definitions = ['row_id INTEGER PRIMARY KEY'] + [
+        f'"{c}" INTEGER' if c in INTEGER_COLUMNS else f'"{c}" TEXT' for c in columns]
+    con.execute(f'CREATE TABLE articles ({", ".join(definitions)})')
+    values = table.astype(object).where(table.notna(), None)
+    placeholders = ', '.join('?' * len(table.columns))
+    con.executemany(f'INSERT INTO articles VALUES ({placeholders})',
+                    values.itertuples(index=False, name=None))
+    for column in INDEXED_COLUMNS:
+        con.execute(f'CREATE INDEX idx_articles_{column} ON articles ("{column}")')
+
+
+def create_fts(con):
+    """FTS5 index over title and abstract, reading its text from articles"""
+    con.execute(f"CREATE VIRTUAL TABLE articles_fts USING fts5({', '.join(FTS_COLUMNS)}, "
+                "content='articles', content_rowid='row_id', tokenize='porter unicode61')")
+    con.execute("INSERT INTO articles_fts(articles_fts) VALUES ('rebuild')")
+
+
+def create_subset_views(con):
+    """One view per article-type subset"""
+    for subset, article_types in SUBSETS.items():
+        if article_types is None:
+            continue
+        values = ', '.join("'" + t.replace("'", "''") + "'" for t in article_types)
+        con.execute(f'CREATE VIEW {subset} AS SELECT * FROM articles '
+                    f'WHERE article_type IN ({values})')
+
+
+def create_crosstabs(con, df):
+    """Materialise the data/processed/ crosstab tables in long form"""
+    frames = {subset: df[subset_mask(df, subset).to_numpy()] for subset in SUBSETS}
+    results = build_tables(TABLES, frames=frames)
+    con.execute('CREATE TABLE crosstabs (name TEXT PRIMARY KEY, source TEXT, subset TEXT, '
+                'rows TEXT, cols TEXT)')
+    for rel, table in results.items():
+        spec = TABLES[rel]
+        name = 'xt_' + sql_name(rel.removesuffix('.csv'))
+        cols = spec['cols'] if isinstance(spec['cols'], str) else ', '.join(spec['cols'])
+        con.execute('INSERT INTO crosstabs VALUES (?, ?, ?, ?, ?)',
+                    (name, f'data/processed/{rel}', spec['subset'], spec['rows'], cols))
+        con.execute(f'CREATE TABLE {name} (row_label TEXT, col_label TEXT, n INTEGER, '
+                    'PRIMARY KEY (row_label, col_label)) WITHOUT ROWID')
+        long = table.stack()
+        con.executemany(f'INSERT INTO {name} VALUES (?, ?, ?)',
+                        [(str(r), str(c), int(n)) for (r, c), n in long.items()])
+
+
+def stored_version(path):
+    """(schema version, source hash) recorded in an existing database, or None"""
+    if not path.exists():
+        return None
+    try:
+        with contextlib.closing(sqlite3.connect(f'file:{path}?mode=ro', uri=True)) as con:
+            return tuple(con.execute('SELECT schema_version, source_hash FROM meta').fetchone())
+    except sqlite3.Error:
+        return None
+
+
+def export(path=DEFAULT_PATH, dataset='full', force=False):
+    """Write the database unless it is up to date; returns True if it was written"""
+    path = Path(path)
+    source = resolve_path(dataset)
+    digest = content_hash(source)
+    if not force and stored_version(path) == (SCHEMA_VERSION, digest):
+        return False
+
+    df = load_dataset(dataset)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(f'{path.name}.{os.getpid()}.tmp')
+    tmp.unlink(missing_ok=True)
+    con = sqlite3.connect(tmp)
+    try:
+        with con:
+            create_articles(con, article_rows(df))
+            create_fts(con)
+            create_subset_views(con)
+            create_crosstabs(con, df)
+            con.execute('CREATE TABLE meta (schema_version INTEGER, source_hash TEXT, '
+                        'source TEXT, created TEXT)')
+            con.execute("INSERT INTO meta VALUES (?, ?, ?, datetime('now'))",
+                        (SCHEMA_VERSION, digest, str(source)))
+        con.execute('ANALYZE')
+        con.execute('VACUUM')
+    finally:
+        con.close()
+    os.replace(tmp, path)
+    return True
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--out', default=DEFAULT_PATH, type=Path,
+                        help='Database file (default: data/cache/clean_research.sqlite)')
+    parser.add_argument('--dataset', default='full', help='Dataset name or CSV path')
+    parser.add_argument('--force', action='store_true', help='Rebuild even if up to date')
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    written = export(args.out, args.dataset, force=args.force)
+    elapsed = time.perf_counter() - start
+
+    with contextlib.closing(sqlite3.connect(args.out)) as con:
+        n_articles = con.execute('SELECT count(*) FROM articles').fetchone()[0]
+        n_crosstabs = con.execute('SELECT count(*) FROM crosstabs').fetchone()[0]
+    status = f'written in {elapsed:.2f}s' if written else 'up to date'
+    print(f"{args.out}: {status}")
+    print(f"  {n_articles:,} articles, {len(INDEXED_COLUMNS)} indexed columns, "
+          f"{n_crosstabs} crosstab tables, {args.out.stat().st_size / 1e6:.1f} MB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,244 @@
+"""
+Country name resolution to ISO3 codes
+
+Country names reach the figures in several spellings: the coded
+country_first_author column ('USA', 'United States', 'Russian Federation',
+'Macau'), the Natural Earth map names ('United States of America',
+'Dem. Rep. Congo') and the funder tables ('NSFC (China)', 'US NSF').
+Every spelling is normalised (case, accents, punctuation, '&' -> 'and') and
+looked up in one alias index built from
+
+- COUNTRY_ALIASES, a curated table of display names and variants as they
+  occur in country_first_author and common bibliographic spellings,
+- the country names of the bundled Natural Earth geometry (common.geo),
+
+so each name resolves with a single dictionary lookup. Names that are not
+found are reported instead of being matched by substring, which used to
+join 'Niger' with 'Nigeria'. Placeholders such as 'Unknown' resolve to no
+country without being reported.
+
+Usage:
+    from common.countries import display_names, iso3_codes
+    df['country_iso3'] = iso3_codes(df['country_first_author'], source='country_first_author')
+    df['country'] = display_names(df['country_iso3'])
+
+Report unmatched names in the coded data and the country / funder tables
+(run from code/):
+    python -m common.countries
+"""
+
+import argparse
+import re
+import unicodedata
+from collections import Counter
+from functools import lru_cache
+
+import numpy as np
+import pandas as pd
+
+from common.data_access import PROCESSED_DIR, load_dataset
+from common.geo import WORLD_PATH
+
+# ISO3 -> (display name, other spellings). The display name follows the
+# spelling used in the coded data and figures; countries not listed here are
+# known by their Natural Earth name. EUU (as used by the World Bank) stands
+# for the European Union, which appears among the funders.
+COUNTRY_ALIASES = {
+    'USA': ('USA', 'United States', 'United States of America', 'US', 'U.S.', 'U.S.A.'),
+    'GBR': ('UK', 'United Kingdom', 'Great Britain', 'England', 'Scotland', 'Wales',
+            'Northern Ireland'),
+    'ARE': ('UAE', 'United Arab Emirates'),
+    'RUS': ('Russia', 'Russian Federation'),
+    'KOR': ('South Korea', 'Korea', 'Republic of Korea', 'Korea, Republic of', 'Korea (South)'),
+    'PRK': ('North Korea', "Democratic People's Republic of Korea", 'Korea, DPR'),
+    'CZE': ('Czech Republic', 'Czechia'),
+    'MKD': ('North Macedonia', 'Macedonia', 'Republic of North Macedonia'),
+    'COD': ('Democratic Republic of Congo', 'Democratic Republic of the Congo', 'DR Congo',
+            'DRC', 'Congo, Democratic Republic', 'Dem. Rep. Congo'),
+    'COG': ('Congo', 'Republic of the Congo', 'Congo-Brazzaville'),
+    'IRN': ('Iran', 'Islamic Republic of Iran', 'Iran, Islamic Republic of'),
+    'SYR': ('Syria', 'Syrian Arab Republic'),
+    'VNM': ('Vietnam', 'Viet Nam'),
+    'LAO': ('Laos', 'Lao PDR', "Lao People's Democratic Republic"),
+    'TUR': ('Turkey', 'Türkiye'),
+    'CIV': ("Côte d'Ivoire", 'Ivory Coast'),
+    'SWZ': ('Eswatini', 'Swaziland'),
+    'TWN': ('Taiwan', 'Chinese Taipei', 'Taiwan, Province of China'),
+    'HKG': ('Hong Kong', 'Hong Kong SAR', 'Hong Kong, China'),
+    'MAC': ('Macao', 'Macau', 'Macao SAR'),
+    'PSE': ('Palestine', 'State of Palestine', 'Palestinian Territories'),
+    'MMR': ('Myanmar', 'Burma'),
+    'BRN': ('Brunei', 'Brunei Darussalam'),
+    'MDA': ('Moldova', 'Republic of Moldova'),
+    'TZA': ('Tanzania', 'United Republic of Tanzania'),
+    'BOL': ('Bolivia', 'Plurinational State of Bolivia'),
+    'VEN': ('Venezuela', 'Bolivarian Republic of Venezuela'),
+    'BIH': ('Bosnia and Herzegovina', 'Bosnia'),
+    'DOM': ('Dominican Republic',),
+    'CAF': ('Central African Republic',),
+    'GNQ': ('Equatorial Guinea',),
+    'SSD': ('South Sudan',),
+    'TLS': ('Timor-Leste', 'East Timor'),
+    'SLB': ('Solomon Islands',),
+    'FLK': ('Falkland Islands',),
+    'ESH': ('Western Sahara',),
+    'CPV': ('Cabo Verde', 'Cape Verde'),
+    # Countries and territories too small for the 1:110m map
+    'SGP': ('Singapore',),
+    'BHR': ('Bahrain',),
+    'MUS': ('Mauritius',),
+    'MLT': ('Malta',),
+    'MDV': ('Maldives',),
+    'FRO': ('Faroe Islands',),
+    'AND': ('Andorra',),
+    'MCO': ('Monaco',),
+    'LIE': ('Liechtenstein',),
+    'BRB': ('Barbados',),
+    'SYC': ('Seychelles',),
+    'EUU': ('EU', 'European Union', 'European Commission', 'Horizon 2020', 'Horizon Europe'),
+}
+
+# Values that mean "no country" and are not reported as unmatched
+NO_COUNTRY = ('Unknown', 'Not Specified', 'Not Available', 'N/A', 'NA', 'None', '-')
+
+# Extra keys for funder names: demonyms and funding agency acronyms
+FUNDER_ALIASES = {
+    'Chinese': 'CHN', 'Korean': 'KOR', 'Canadian': 'CAN', 'American': 'USA', 'Japanese': 'JPN',
+    'German': 'DEU', 'British': 'GBR', 'Indian': 'IND', 'Saudi': 'SAU', 'Australian': 'AUS',
+    'Italian': 'ITA', 'Spanish': 'ESP', 'French': 'FRA', 'Brazilian': 'BRA', 'Iranian': 'IRN',
+    'Turkish': 'TUR', 'Malaysian': 'MYS', 'Pakistani': 'PAK', 'Swiss': 'CHE', 'Dutch': 'NLD',
+    'European': 'EUU',
+    'NSFC': 'CHN', 'NRF': 'KOR', 'NSF': 'USA', 'NIH': 'USA', 'NSERC': 'CAN', 'SSHRC': 'CAN',
+    'JSPS': 'JPN', 'DFG': 'DEU', 'UKRI': 'GBR', 'EPSRC': 'GBR', 'ESRC': 'GBR', 'ARC': 'AUS',
+    'CNPq': 'BRA', 'CAPES': 'BRA', 'FCT': 'PRT', 'ERC': 'EUU',
+}
+
+
+def normalize(name):
+    """Lookup key of a name: accents, case, punctuation and spacing removed"""
+    text = unicodedata.normalize('NFKD', str(name)).encode('ascii', 'ignore').decode()
+    text = re.sub(r"[.'’]", '', text.casefold().replace('&', ' and '))
+    text = ' '.join(re.sub(r'[^a-z0-9]+', ' ', text).split())
+    return text[4:] if text.startswith('the ') else text
+
+
+class CountryIndex:
+    """Alias index: normalised name -> ISO3 code, plus ISO3 -> display name"""
+
+    def __init__(self, aliases, natural_earth=None):
+        self.names = {}
+        self.keys = {normalize(v): None for v in NO_COUNTRY}
+        # Natural Earth names first, so curated spellings take precedence
+        for code, name in (natural_earth or {}).items():
+            self.names.setdefault(code, name)
+            self.keys[normalize(name)] = code
+        for code, (display, *variants) in aliases.items():
+            self.names[code] = display
+            for variant in (display, *variants):
+                self.keys[normalize(variant)] = code
+        self.funder_keys = {**self.keys, **{normalize(k): v for k, v in FUNDER_ALIASES.items()}}
+
+    def resolve(self, name):
+        """ISO3 code of a country name, None for placeholders; KeyError if unknown"""
+        return self.keys[normalize(name)]
+
+    def resolve_funder(self, name):
+        """ISO3 code of a funder's country, from '(Country)' or the longest known word sequence"""
+        inner = re.search(r'\(([^)]*)\)', str(name))
+        if inner and normalize(inner.group(1)) in self.keys:
+            return self.keys[normalize(inner.group(1))]
+        words = normalize(name).split()
+        for n in range(len(words), 0, -1):
+            for i in range(len(words) - n + 1):
+                code = self.funder_keys.get(' '.join(words[i:i + n]))
+                if code is not None:
+                    return code
+        raise KeyError(name)
+
+    def codes(self, values, funders=False):
+        """ISO3 code per value (None where unresolved) and a Counter of unmatched names"""
+        values = pd.Series(values)
+        resolve = self.resolve_funder if funders else self.resolve
+        lookup, unmatched = {}, Counter()
+        counts = values.value_counts()
+        counts = counts[counts > 0]
+        for name, n in counts.items():
+            try:
+                lookup[name] = resolve(name)
+            except KeyError:
+                lookup[name] = None
+                unmatched[name] = n
+        return values.map(lookup).to_numpy(dtype=object), unmatched
+
+
+@lru_cache(maxsize=None)
+def country_index():
+    """Alias index from COUNTRY_ALIASES and the bundled Natural Earth names"""
+    natural_earth = {}
+    if WORLD_PATH.exists():
+        with np.load(WORLD_PATH) as archive:
+            natural_earth = dict(zip(archive['iso3'].tolist(), archive['name'].tolist()))
+    return CountryIndex(COUNTRY_ALIASES, natural_earth)
+
+
+def report_unmatched(unmatched, source):
+    """Print unmatched names with their number of rows"""
+    if unmatched:
+        names = ', '.join(f'{name} ({n})' for name, n in unmatched.most_common())
+        print(f"Unmatched country names in {source}: {names}")
+
+
+def iso3_codes(values, source='input', funders=False):
+    """ISO3 code per country (or funder) name, reporting names that do not resolve"""
+    codes, unmatched = country_index().codes(values, funders=funders)
+    report_unmatched(unmatched, source)
+    return pd.Series(codes, index=getattr(values, 'index', None), dtype=object)
+
+
+def display_names(codes):
+    """Display name per ISO3 code (missing codes stay missing)"""
+    names = country_index().names
+    return pd.Series(codes).map(names)
+
+
+# Processed tables keyed by country or funder name: (path, column, funders)
+NAME_TABLES = [
+    ('overview/country_top_subjects.csv', 'Country', False),
+    ('overview/top13_country_specializations.csv', 'Country', False),
+    ('overview/funder_sdg_coverage.csv', 'Funder', True),
+    ('overview/funder_cluster_coverage.csv', 'Funder', True),
+    ('overview/funder_ai_methods_coverage.csv', 'Funder', True),
+    ('non_empirical/funder_sdg_coverage.csv', 'Funder', True),
+    ('non_empirical/funder_cluster_coverage.csv', 'Funder', True),
+    ('non_empirical/funder_ai_methods_coverage.csv', 'Funder', True),
+]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--dataset', default='full',
+                        help='coded dataset whose country_first_author is checked (default: full)')
+    args = parser.parse_args(argv)
+
+    index = country_index()
+    sources = [(f'{args.dataset}: country_first_author',
+                load_dataset(args.dataset, columns=['country_first_author'])['country_first_author'],
+                False)]
+    for rel, column, funders in NAME_TABLES:
+        path = PROCESSED_DIR / rel
+        if path.exists():
+            sources.append((f'{rel}: {column}', pd.read_csv(path, encoding='utf-8-sig')[column], funders))
+
+    n_unmatched = 0
+    for source, values, funders in sources:
+        codes, unmatched = index.codes(values, funders=funders)
+        resolved = pd.Series(codes).dropna()
+        print(f"{source}: {values.nunique()} names -> {resolved.nunique()} countries")
+        report_unmatched(unmatched, source)
+        n_unmatched += len(unmatched)
+    print(f"{n_unmatched} unmatched names")
+    return 1 if n_unmatched else 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
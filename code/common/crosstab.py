@@ -0,0 +1,275 @@
+"""
+Single-pass crosstab engine for the megatrend frequency tables
+
+Every coded dimension a table needs is encoded as integer codes once per
+dataset. All dimension x dimension blocks of all tables for that dataset are
+then counted together: each block's (row, column) code pairs are folded into
+one flat key (block offset + row * n_cols + col) and a single np.bincount
+over the concatenated keys yields every count at once.
+
+The tables are written in the exact layout of the files in data/processed/
+(row/column order, Total row/column placement, index header, BOM, LF line
+endings), so rebuilding them only changes the bytes whose counts changed.
+
+Usage (from code/):
+    python -m common.crosstab                 # rebuild every table
+    python -m common.crosstab --check         # report tables that are out of date
+"""
+
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+from common.data_access import PROCESSED_DIR, REPO_ROOT, load_dataset
+
+# Megatrend column order of the empirical tables (README "Main Datasets")
+MEGATREND_ORDER = [
+    'Digital Transformation & Smart Cities',
+    'Climate Change & Environmental Sustainability',
+    'Urban Mobility & Transportation',
+    'Social Equity & Quality of Life',
+    'Urban Development & Land Use',
+    'Urban Resilience & Safety',
+]
+
+SDG_NUMBERS = [str(n) for n in range(1, 17)]
+SUSTAINABILITY_LEVELS = ['Strong', 'Medium', 'Weak']
+
+# Dimensions derived from a coded column: name -> (source column, function)
+DERIVED = {
+    # Leading SDG number of sdg_alignment, e.g. 'SDG 11 (Sustainable Cities)' -> '11'
+    'sdg': ('sdg_alignment', lambda s: s.astype('string').str.extract(r'SDG\s*(\d{1,2})')[0]),
+}
+
+# Layout defaults; each table spec overrides what differs
+DEFAULT_LAYOUT = {
+    'row_order': 'alpha',   # 'alpha' or 'total' (descending, ties alphabetical)
+    'col_order': 'alpha',   # 'alpha' or an explicit list of labels
+    'top': None,            # keep only the first n rows after ordering
+    'total': 'sum',         # Total column: 'sum' of the row or number of 'rows' (articles)
+    'total_col': 'last',    # 'first', 'last' or None
+    'total_row': True,
+    'index_label': '',
+    'bom': True,
+}
+
+# Tables under data/processed/. 'cols' may list several dimensions, whose
+# blocks are placed side by side. The AI method and AI task x megatrend
+# tables are curated: they count split, consolidated method mentions and
+# standardised tasks (top 20 plus 'Other'), not raw coded values, so they
+# are not rebuilt here.
+TABLES = {
+    'empirical/frequency_methodological_approach.csv': {
+        'subset': 'empirical', 'rows': 'methodological_approach', 'cols': 'subject_megatrend',
+        'col_order': MEGATREND_ORDER},
+    'empirical/frequency_spatial_scale.csv': {
+        'subset': 'empirical', 'rows': 'spatial_scale', 'cols': 'subject_megatrend',
+        'col_order': MEGATREND_ORDER},
+    'empirical/frequency_temporal_scale.csv': {
+        'subset': 'empirical', 'rows': 'temporal_scale', 'cols': 'subject_megatrend',
+        'col_order': MEGATREND_ORDER},
+    'empirical/frequency_temporal_focus.csv': {
+        'subset': 'empirical', 'rows': 'temporal_focus', 'cols': 'subject_megatrend',
+        'col_order': MEGATREND_ORDER},
+    'empirical/megatrend_sdg_sustainability_table.csv': {
+        'subset': 'empirical', 'rows': 'subject_megatrend',
+        'cols': ['sdg', 'level_of_sustainability'],
+        'col_order': SDG_NUMBERS + SUSTAINABILITY_LEVELS, 'row_order': 'total',
+        'total': 'rows', 'total_col': 'first', 'index_label': 'Megatrend'},
+    'non_empirical/megatrend_sdg_sustainability_table.csv': {
+        'subset': 'non_empirical', 'rows': 'subject_megatrend',
+        'cols': ['sdg', 'level_of_sustainability'],
+        'col_order': SDG_NUMBERS + SUSTAINABILITY_LEVELS,
+        'total': 'rows', 'total_row': False, 'index_label': 'Megatrend', 'bom': False},
+}
+
+
+def layout(spec):
+    """Table spec with the layout defaults filled in"""
+    return {**DEFAULT_LAYOUT, **spec}
+
+
+def col_dims(spec):
+    """Column dimensions of a table spec as a list"""
+    return [spec['cols']] if isinstance(spec['cols'], str) else list(spec['cols'])
+
+
+def table_blocks(spec):
+    """(row dim, col dim) blocks counted for a table; col dim None is the row marginal"""
+    blocks = [(spec['rows'], col) for col in col_dims(spec)]
+    if layout(spec)['total'] == 'rows':
+        blocks.append((spec['rows'], None))
+    return blocks
+
+
+def source_columns(dims):
+    """Dataset columns needed to build the given dimensions"""
+    return sorted({DERIVED[d][0] if d in DERIVED else d for d in dims})
+
+
+def encode(df, dims):
+    """Integer codes (-1 for missing) and sorted labels for each dimension"""
+    encoded = {}
+    for dim in dims:
+        if dim in DERIVED:
+            column, derive = DERIVED[dim]
+            values = derive(df[column])
+        else:
+            values = df[dim]
+        values = values.astype('string').str.strip()
+        codes, labels = pd.factorize(values, sort=True, use_na_sentinel=True)
+        encoded[dim] = (codes.astype(np.int64), pd.Index(labels.astype(object)))
+    return encoded
+
+
+def count_blocks(encoded, blocks, weights=None):
+    """Count every (row dim, col dim) block in one np.bincount pass
+
+    Returns {block: 2-D count array}. With weights (e.g. +1 / -1 per row) the
+    counts are weighted sums, as used for incremental deltas.
+    """
+    keys, key_weights, shapes = [], [], {}
+    offset = 0
+    for block in dict.fromkeys(blocks):
+        row_dim, col_dim = block
+        row_codes, row_labels = encoded[row_dim]
+        if col_dim is None:
+            col_codes, n_cols = np.zeros_like(row_codes), 1
+        else:
+            col_codes, col_labels = encoded[col_dim]
+            n_cols = len(col_labels)
+        valid = (row_codes >= 0) & (col_codes >= 0)
+        keys.append(offset + row_codes[valid] * n_cols + col_codes[valid])
+        if weights is not None:
+            key_weights.append(weights[valid])
+        shapes[block] = (offset, len(row_labels), n_cols)
+        offset += len(row_labels) * n_cols
+
+    flat = np.bincount(np.concatenate(keys) if keys else np.empty(0, dtype=np.int64),
+                       weights=np.concatenate(key_weights) if weights is not None else None,
+                       minlength=offset)
+    flat = np.rint(flat).astype(np.int64)
+    return {block: flat[start:start + n_rows * n_cols].reshape(n_rows, n_cols)
+            for block, (start, n_rows, n_cols) in shapes.items()}
+
+
+def assemble_table(spec, encoded, counts):
+    """Lay out the counted blocks of one table as in data/processed/"""
+    spec = layout(spec)
+    row_labels = encoded[spec['rows']][1]
+    body = pd.concat(
+        [pd.DataFrame(counts[(spec['rows'], col)], index=row_labels, columns=encoded[col][1])
+         for col in col_dims(spec)], axis=1)
+
+    if spec['col_order'] == 'alpha':
+        body = body[sorted(body.columns)]
+    else:
+        body = body.reindex(columns=spec['col_order'], fill_value=0)
+
+    if spec['total'] == 'rows':
+        total = pd.Series(counts[(spec['rows'], None)][:, 0], index=row_labels)
+    else:
+        total = body.sum(axis=1)
+    # Drop categories that only occur together with a missing column value
+    keep = total > 0
+    body, total = body[keep], total[keep]
+
+    if spec['row_order'] == 'total':
+        order = total.sort_values(ascending=False, kind='mergesort').index
+        body, total = body.loc[order], total.loc[order]
+    if spec['top']:
+        body, total = body.head(spec['top']), total.head(spec['top'])
+
+    if spec['total_col'] == 'first':
+        body.insert(0, 'Total', total)
+    elif spec['total_col'] == 'last':
+        body['Total'] = total
+    if spec['total_row']:
+        body.loc['Total'] = body.sum(axis=0)
+    return body.astype(np.int64)
+
+
+def build_tables(tables=TABLES, frames=None):
+    """Compute tables, loading and encoding each dataset once
+
+    frames optionally maps subset name -> DataFrame to use instead of the
+    cached dataset (e.g. an edited copy).
+    """
+    by_subset = {}
+    for rel, spec in tables.items():
+        by_subset.setdefault(spec['subset'], {})[rel] = spec
+
+    results = {}
+    for subset, specs in by_subset.items():
+        blocks = [b for spec in specs.values() for b in table_blocks(spec)]
+        dims = list(dict.fromkeys(d for b in blocks for d in b if d is not None))
+        if frames and subset in frames:
+            df = frames[subset]
+        else:
+            df = load_dataset(subset, columns=source_columns(dims))
+        encoded = encode(df, dims)
+        counts = count_blocks(encoded, blocks)
+        for rel, spec in specs.items():
+            results[rel] = assemble_table(spec, encoded, counts)
+    return results
+
+
+def facet_tables(df, rows, facets):
+    """rows x facet count table for every facet, all counted in one np.bincount pass"""
+    encoded = encode(df, list(dict.fromkeys([rows, *facets])))
+    counts = count_blocks(encoded, [(rows, facet) for facet in facets])
+    return {facet: pd.DataFrame(counts[(rows, facet)], index=encoded[rows][1],
+                                columns=encoded[facet][1])
+            for facet in facets}
+
+
+def table_bytes(table, spec):
+    """CSV bytes of a table in its data/processed/ layout"""
+    spec = layout(spec)
+    text = table.to_csv(index_label=spec['index_label'], lineterminator='\n')
+    return (b'\xef\xbb\xbf' if spec['bom'] else b'') + text.encode('utf-8')
+
+
+def write_tables(results, tables=TABLES, check=False):
+    """Write tables whose bytes changed; return the relative paths that differ"""
+    changed = []
+    for rel, table in results.items():
+        path = PROCESSED_DIR / rel
+        data = table_bytes(table, tables[rel])
+        if path.exists() and path.read_bytes() == data:
+            continue
+        changed.append(rel)
+        if not check:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            path.write_bytes(data)
+    return changed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('tables', nargs='*',
+                        help='Tables to build, relative to data/processed (default: all)')
+    parser.add_argument('--check', action='store_true',
+                        help='Only report tables whose content would change')
+    args = parser.parse_args()
+
+    unknown = [t for t in args.tables if t not in TABLES]
+    if unknown:
+        parser.error(f"unknown table(s): {', '.join(unknown)}")
+    tables = {rel: TABLES[rel] for rel in args.tables} if args.tables else TABLES
+
+    start = time.perf_counter()
+    results = build_tables(tables)
+    changed = write_tables(results, tables, check=args.check)
+    elapsed = time.perf_counter() - start
+
+    for rel in tables:
+        status = ('out of date' if args.check else 'updated') if rel in changed else 'unchanged'
+        print(f"  {(PROCESSED_DIR / rel).relative_to(REPO_ROOT)}: {status}")
+    print(f"{len(tables)} tables in {elapsed:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
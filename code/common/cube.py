@@ -0,0 +1,205 @@
+"""
+Sparse count cube over the coded dimensions
+
+The cube stores one row per distinct combination of dimension codes that
+occurs in a dataset, plus the number of articles with that combination
+(a COO-style sparse cube; the dense cube would have billions of mostly
+empty cells). Any 1-, 2- or 3-D marginal, optionally filtered, is a single
+weighted np.bincount over those cells:
+
+    from common.cube import CountCube
+    cube = CountCube.load('full')
+    cube.query('article_type', 'level_of_sustainability')
+    cube.query('country_first_author', 'ai_method', where={'Year': [2020, 2021]})
+    cube.query('subject_megatrend', 'sdg', 'level_of_sustainability',
+               where={'article_type': 'Empirical'})
+
+Cubes are cached in data/cache/ next to the dataset cache they were built
+from and rebuilt whenever the dataset or DIMENSIONS changes.
+
+Build the cubes for the coded datasets (from code/):
+    python -m common.cube
+"""
+
+import hashlib
+import json
+import os
+import time
+
+import numpy as np
+import pandas as pd
+
+from common.crosstab import DERIVED, encode, source_columns
+from common.data_access import CACHE_DIR, REPO_ROOT, cached_columns, ensure_cache, read_cache
+from common.schema import INTEGER_FIELDS
+
+# Dimensions of the cube (METHODOLOGY §8.2). 'sdg' is the leading SDG number
+# of sdg_alignment, as used by the megatrend SDG tables.
+DIMENSIONS = [
+    'Year',
+    'country_first_author',
+    'subject_megatrend',
+    'subject_cluster',
+    'sdg_alignment',
+    'sdg',
+    'ai_method',
+    'ai_task',
+    'article_type',
+    'methodological_approach',
+    'spatial_scale',
+    'temporal_scale',
+    'temporal_focus',
+    'level_of_sustainability',
+]
+
+# Bump when the cube layout changes; the cache name also carries a hash of
+# DIMENSIONS, so cached cubes are rebuilt when either changes
+CUBE_VERSION = 2
+
+
+class CountCube:
+    """Sparse article counts over DIMENSIONS with slice/dice queries
+
+    `codes` is an (n_cells, n_dims) array of category codes (-1 = missing),
+    `counts` the number of articles in each cell and `labels` the category
+    labels of each dimension, indexed by code.
+    """
+
+    def __init__(self, codes, counts, labels):
+        self.codes = codes
+        self.counts = counts
+        self.labels = labels
+        self.dims = list(labels)
+        self._axis = {dim: i for i, dim in enumerate(self.dims)}
+
+    @classmethod
+    def from_frame(cls, df, dims=DIMENSIONS):
+        """Build a cube from a coded DataFrame"""
+        dims = [d for d in dims if d in df.columns or (d in DERIVED and DERIVED[d][0] in df.columns)]
+        encoded = encode(df, dims)
+        labels = {}
+        for dim in dims:
+            dim_labels = encoded[dim][1]
+            if dim in INTEGER_FIELDS:
+                dim_labels = dim_labels.astype(int)
+            labels[dim] = dim_labels
+        stacked = np.column_stack([encoded[d][0] for d in dims]).astype(np.int32)
+        codes, counts = np.unique(stacked, axis=0, return_counts=True)
+        return cls(codes, counts.astype(np.int64), labels)
+
+    @classmethod
+    def load(cls, name_or_path='full', refresh=False):
+        """Cube of a dataset, built on first use and cached next to its data cache"""
+        data_cache = ensure_cache(name_or_path)
+        tag = hashlib.sha1(json.dumps(DIMENSIONS).encode()).hexdigest()[:8]
+        target = data_cache.with_name(f'cube__{data_cache.stem}.c{CUBE_VERSION}-{tag}.npz')
+        if target.exists() and not refresh:
+            return cls.read(target)
+        available = set(cached_columns(data_cache))
+        columns = [c for c in source_columns(DIMENSIONS) if c in available]
+        cube = cls.from_frame(read_cache(data_cache, columns))
+        cube.write(target)
+        return cube
+
+    def write(self, target):
+        """Save the cube atomically as .npz (labels stored as JSON)"""
+        tmp = target.with_name(f'{target.name}.{os.getpid()}.tmp')
+        labels = json.dumps({dim: [str(v) for v in values] for dim, values in self.labels.items()})
+        with open(tmp, 'wb') as f:
+            np.savez_compressed(f, codes=self.codes, counts=self.counts, labels=np.array(labels))
+        os.replace(tmp, target)
+
+        # Drop cubes built from older versions of the same dataset
+        stem = target.name.split('.')[0]
+        for stale in target.parent.glob(f'{stem}.*.npz'):
+            if stale != target:
+                stale.unlink(missing_ok=True)
+
+    @classmethod
+    def read(cls, target):
+        """Load a cube written by write()"""
+        with np.load(target) as data:
+            raw_labels = json.loads(str(data['labels']))
+            labels = {}
+            for dim, values in raw_labels.items():
+                index = pd.Index(values, dtype=object)
+                labels[dim] = index.astype(int) if dim in INTEGER_FIELDS else index
+            return cls(data['codes'], data['counts'], labels)
+
+    def mask(self, where=None):
+        """Boolean mask over cells matching {dim: value or list of values}"""
+        keep = np.ones(len(self.counts), dtype=bool)
+        for dim, values in (where or {}).items():
+            if np.isscalar(values):
+                values = [values]
+            wanted = self.labels[dim].get_indexer(list(values))
+            keep &= np.isin(self.codes[:, self._axis[dim]], wanted[wanted >= 0])
+        return keep
+
+    def total(self, where=None):
+        """Number of articles matching the filters"""
+        return int(self.counts[self.mask(where)].sum())
+
+    def query(self, *dims, where=None):
+        """Article counts over 1-3 dimensions, restricted by where filters
+
+        Returns a Series sorted by count (as value_counts) for one dimension,
+        a rows x columns DataFrame for two
+        and a DataFrame with a (dim1, dim2) row MultiIndex for three. Articles
+        missing any requested dimension are excluded and categories without
+        articles are dropped, as in pd.crosstab. Only label combinations that
+        occur are counted, never the full product of the dimensions' labels.
+        """
+        if not 1 <= len(dims) <= 3:
+            raise ValueError('query takes one to three dimensions')
+        axes = [self._axis[d] for d in dims]
+        keep = self.mask(where)
+        cell_codes = self.codes[keep][:, axes]
+        keep_cells = (cell_codes >= 0).all(axis=1)
+        cell_codes = cell_codes[keep_cells]
+        weights = self.counts[keep][keep_cells]
+
+        shape = tuple(len(self.labels[d]) for d in dims)
+        flat = (np.ravel_multi_index(cell_codes.T.astype(np.int64), shape) if len(cell_codes)
+                else np.empty(0, dtype=np.int64))
+        # Sum the cells of each observed key; keys come out in label order
+        keys, inverse = np.unique(flat, return_inverse=True)
+        sums = np.bincount(inverse, weights=weights, minlength=len(keys)).astype(np.int64)
+
+        if len(dims) == 1:
+            index = self.labels[dims[0]].take(keys).rename(dims[0])
+            result = pd.Series(sums, index=index, name='count')
+            return result.sort_values(ascending=False, kind='mergesort')
+
+        row_keys, cols = np.divmod(keys, shape[-1])
+        rows, row_pos = np.unique(row_keys, return_inverse=True)
+        cols, col_pos = np.unique(cols, return_inverse=True)
+        table = np.zeros((len(rows), len(cols)), dtype=np.int64)
+        table[row_pos, col_pos] = sums
+        if len(dims) == 2:
+            index = self.labels[dims[0]].take(rows).rename(dims[0])
+        else:
+            first, second = np.divmod(rows, shape[1])
+            index = pd.MultiIndex.from_arrays([self.labels[dims[0]].take(first),
+                                               self.labels[dims[1]].take(second)], names=dims[:2])
+        columns = self.labels[dims[-1]].take(cols).rename(dims[-1])
+        return pd.DataFrame(table, index=index, columns=columns)
+
+
+def main():
+    """Build the cube of every coded dataset and time a sample query"""
+    for name in ['full', 'empirical', 'non_empirical']:
+        start = time.perf_counter()
+        cube = CountCube.load(name, refresh=True)
+        built = time.perf_counter() - start
+
+        start = time.perf_counter()
+        cube.query('country_first_author', 'sdg', where={'article_type': 'Empirical'})
+        queried = (time.perf_counter() - start) * 1000
+        print(f"  {name}: {cube.total():,} articles in {len(cube.counts):,} cells "
+              f"(built in {built:.2f}s, 2-D query in {queried:.1f} ms)")
+    print(f"Cubes written to {CACHE_DIR.relative_to(REPO_ROOT)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,233 @@
+"""
+Columnar cache for the Scopus exports and the coded research datasets
+
+Every CSV is parsed once, typed (categoricals for the coded variables,
+integers for Year / Cited by) and written to data/cache/ as Parquet.
+Cache files are keyed by the SHA-256 of the source CSV, so editing a CSV
+invalidates its cache automatically. Coded columns are returned with the
+plain dtype of their values, as pd.read_csv gives them: categoricals would
+make value_counts, pd.crosstab and groupby (observed=False before pandas 3)
+list categories that do not occur in a filtered frame.
+
+Usage from a figure script:
+    from common.data_access import load_dataset
+    df = load_dataset('empirical', columns=['subject_megatrend', 'ai_method'])
+
+Only the requested columns are read from the Parquet file. Long text
+columns (Abstract, Funding Texts, ...) can be pulled in on first access
+through CodedDataset.text().
+
+Warm the cache for every known dataset (run from code/):
+    python -m common.data_access
+"""
+
+import hashlib
+import os
+import pickle
+import time
+from pathlib import Path
+
+import pandas as pd
+
+from common.schema import (CATEGORICAL_FIELDS, INTEGER_FIELDS, STRING_FIELDS, TEXT_FIELDS,
+                           normalize_columns)
+
+REPO_ROOT = Path(__file__).resolve().parents[2]
+DATA_DIR = REPO_ROOT / 'data'
+RAW_DIR = DATA_DIR / 'raw'
+PROCESSED_DIR = DATA_DIR / 'processed'
+CACHE_DIR = DATA_DIR / 'cache'
+
+# Named coded datasets (see README "Main Datasets")
+DATASETS = {
+    'full': PROCESSED_DIR / 'clean_research.csv',
+    'empirical': PROCESSED_DIR / 'empirical_clean.csv',
+    'non_empirical': PROCESSED_DIR / 'clean_research_non_empirical.csv',
+    'combined_raw': RAW_DIR / 'combined_research.csv',
+}
+
+# Article-type subsets behind the empirical / non-empirical datasets
+SUBSETS = {
+    'full': None,
+    'empirical': ['Empirical'],
+    'non_empirical': ['Methodological', 'Review/Survey', 'Conceptual/Theoretical'],
+}
+
+# Bump when the typing rules change so existing cache files are rebuilt
+CACHE_VERSION = 1
+
+# Parquet needs pyarrow; fall back to pickle so the cache still works without it
+try:
+    import pyarrow  # noqa: F401
+    CACHE_FORMAT = 'parquet'
+except ImportError:
+    CACHE_FORMAT = 'pickle'
+
+
+def resolve_path(name_or_path):
+    """Map a dataset name ('full', 'empirical', ...) or a path to a CSV path"""
+    if name_or_path in DATASETS:
+        return DATASETS[name_or_path]
+    path = Path(name_or_path)
+    if not path.is_absolute() and not path.exists():
+        path = DATA_DIR / path
+    return path.resolve()
+
+
+def subset_mask(df, subset):
+    """Boolean mask selecting the rows of an article-type subset"""
+    article_types = SUBSETS[subset]
+    if article_types is None:
+        return pd.Series(True, index=df.index)
+    return df['article_type'].isin(article_types)
+
+
+def content_hash(path, chunk_size=1 << 20):
+    """SHA-256 of a file's bytes"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def cache_stem(path):
+    """Flat cache name for a CSV, e.g. 'raw__2020_research'"""
+    path = Path(path).resolve()
+    try:
+        rel = path.relative_to(DATA_DIR)
+    except ValueError:
+        rel = Path(path.name)
+    return '__'.join(rel.with_suffix('').parts)
+
+
+def cache_path(path, digest):
+    """Cache file for a CSV with the given content hash"""
+    suffix = 'parquet' if CACHE_FORMAT == 'parquet' else 'pkl'
+    return CACHE_DIR / f'{cache_stem(path)}.{digest[:16]}.v{CACHE_VERSION}.{suffix}'
+
+
+def apply_dtypes(df):
+    """Normalise headers and convert coded columns to compact dtypes"""
+    df = normalize_columns(df)
+    for col in CATEGORICAL_FIELDS:
+        if col in df.columns:
+            df[col] = df[col].astype('category')
+    for col in INTEGER_FIELDS:
+        if col in df.columns and not pd.api.types.is_integer_dtype(df[col]):
+            df[col] = pd.to_numeric(df[col], errors='coerce').astype('Int64')
+    return df
+
+
+def read_raw_csv(path):
+    """Parse a Scopus export or coded CSV with canonical headers, before typing"""
+    df = pd.read_csv(path, encoding='utf-8-sig', low_memory=False,
+                     dtype={col: str for col in STRING_FIELDS})
+    return normalize_columns(df)
+
+
+def read_csv(path):
+    """Parse a Scopus export or coded CSV into a typed DataFrame"""
+    return apply_dtypes(read_raw_csv(path))
+
+
+def write_cache(df, target):
+    """Write a cache file atomically so parallel readers never see a partial file"""
+    target.parent.mkdir(parents=True, exist_ok=True)
+    tmp = target.with_name(f'{target.name}.{os.getpid()}.tmp')
+    if CACHE_FORMAT == 'parquet':
+        df.to_parquet(tmp, index=False)
+    else:
+        with open(tmp, 'wb') as f:
+            pickle.dump(df, f, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(tmp, target)
+
+    # Drop caches built from older versions of the same CSV
+    stem = target.name.split('.')[0]
+    for stale in target.parent.glob(f'{stem}.*'):
+        if stale != target and not stale.name.endswith('.tmp'):
+            stale.unlink(missing_ok=True)
+
+
+def plain_dtypes(df):
+    """Categorical columns converted back to the dtype of their categories"""
+    converted = {col: values.astype(values.cat.categories.dtype)
+                 for col, values in df.items() if isinstance(values.dtype, pd.CategoricalDtype)}
+    return df.assign(**converted) if converted else df
+
+
+def read_cache(target, columns=None):
+    """Read a cache file written by write_cache, optionally projected to columns"""
+    if columns is not None:
+        columns = list(columns)
+    if CACHE_FORMAT == 'parquet':
+        return plain_dtypes(pd.read_parquet(target, columns=columns))
+    with open(target, 'rb') as f:
+        df = pickle.load(f)
+    return plain_dtypes(df if columns is None else df[columns])
+
+
+def cached_columns(target):
+    """Column names stored in a cache file, without loading its data"""
+    if CACHE_FORMAT == 'parquet':
+        import pyarrow.parquet as pq
+        return pq.read_schema(target).names
+    return list(read_cache(target).columns)
+
+
+def ensure_cache(name_or_path, refresh=False):
+    """Build the cache for a CSV if it is missing or stale; return its path"""
+    path = resolve_path(name_or_path)
+    if not path.exists():
+        raise FileNotFoundError(f'Dataset not found: {path}')
+    target = cache_path(path, content_hash(path))
+    if refresh or not target.exists():
+        write_cache(read_csv(path), target)
+    return target
+
+
+def load_dataset(name_or_path, columns=None, refresh=False):
+    """Load a coded dataset or Scopus export through the columnar cache"""
+    return read_cache(ensure_cache(name_or_path, refresh=refresh), columns)
+
+
+class CodedDataset:
+    """Column-projected view of a cached dataset with lazily loaded text columns
+
+    `frame` holds only the declared columns (by default every column except
+    the long TEXT_FIELDS). `text(column)` reads a single text column from the
+    cache the first time it is requested; the result shares the frame's row
+    index, so it can be aligned with any filtered subset via
+    `.loc[subset.index]`.
+    """
+
+    def __init__(self, name_or_path, columns=None, refresh=False):
+        self.cache_file = ensure_cache(name_or_path, refresh=refresh)
+        if columns is None:
+            columns = [c for c in cached_columns(self.cache_file) if c not in TEXT_FIELDS]
+        self.frame = read_cache(self.cache_file, columns)
+        self._text = {}
+
+    def text(self, column):
+        """Return a text column, reading it from the cache on first access"""
+        if column not in self._text:
+            self._text[column] = read_cache(self.cache_file, [column])[column]
+        return self._text[column]
+
+
+def main():
+    """Convert every known CSV (coded datasets and raw exports) into the cache"""
+    sources = [p for p in DATASETS.values() if p.exists()]
+    sources += sorted(p for p in RAW_DIR.glob('*_research.csv') if p not in sources)
+
+    print(f"Cache directory: {CACHE_DIR} ({CACHE_FORMAT})")
+    for path in sources:
+        start = time.perf_counter()
+        target = ensure_cache(path)
+        elapsed = time.perf_counter() - start
+        print(f"  {path.relative_to(REPO_ROOT)} -> {target.name} ({elapsed:.2f}s)")
+    print("Done!")
+
+
+if __name__ == "__main__":
+    main()
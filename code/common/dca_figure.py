@@ -0,0 +1,288 @@
+"""
+Detrended Correspondence Analysis (DCA) plot of an article subset
+Style: Ellipses with keyword clouds (similar to reference image)
+
+Axis 1: From Black-Box Prediction to Interpretable Intelligence
+Axis 2: From Physical Systems to Cyber-Physical Integration
+
+Drawn for the empirical and non-empirical articles (and custom subsets) by
+common.pipeline; the subset's rows keep their positions in the dataset the
+term matrix was built from.
+"""
+
+import numpy as np
+import matplotlib.pyplot as plt
+from matplotlib.patches import Ellipse
+from matplotlib.colors import to_rgba
+
+from common.export import save_figure
+from common.ordination import dca, feature_matrix
+from common.terms import STOPWORDS
+
+# Use fonts compatible with Adobe Illustrator (applied by common.pipeline)
+RC_PARAMS = {'pdf.fonttype': 42, 'ps.fonttype': 42, 'font.size': 9}
+
+# Megatrends in drawing order
+MEGATREND_ORDER = [
+    'Climate Change & Environmental Sustainability',
+    'Urban Development & Land Use',
+    'Urban Resilience & Safety',
+    'Urban Mobility & Transportation',
+    'Social Equity & Quality of Life',
+    'Digital Transformation & Smart Cities',
+]
+
+# Colors for megatrends (similar to reference image style)
+MEGATREND_COLORS = {
+    'Climate Change & Environmental Sustainability': '#8BC34A',  # Light green
+    'Urban Development & Land Use': '#9C27B0',  # Purple
+    'Urban Resilience & Safety': '#F44336',  # Red
+    'Urban Mobility & Transportation': '#2196F3',  # Blue
+    'Social Equity & Quality of Life': '#00BCD4',  # Cyan
+    'Digital Transformation & Smart Cities': '#E91E63',  # Pink
+}
+
+# Short names for display
+MEGATREND_SHORT_NAMES = {
+    'Climate Change & Environmental Sustainability': 'Climate & Environment',
+    'Urban Development & Land Use': 'Urban Development',
+    'Urban Resilience & Safety': 'Resilience & Safety',
+    'Urban Mobility & Transportation': 'Mobility & Transport',
+    'Social Equity & Quality of Life': 'Social Equity',
+    'Digital Transformation & Smart Cities': 'Digital & Smart Cities',
+}
+
+# The sign of a DCA axis is arbitrary; each axis is oriented so that its
+# anchor feature lies on the low side (black-box methods on the left of
+# axis 1, climate-related SDG 13 at the bottom of axis 2)
+AXIS_ANCHORS = ['ai_method=Deep Learning', 'sdg=13']
+
+# Coded columns used as DCA features; abstract terms come from the term matrix cache
+COLUMNS = ['subject_megatrend', 'ai_method', 'ai_task', 'sdg_alignment', 'level_of_sustainability']
+
+
+def calculate_positions(frame, terms):
+    """Article scores on the first two DCA axes, centred on the mean article
+
+    The ordination runs on the article x feature matrix of coded AI methods,
+    AI tasks, SDGs, sustainability level and abstract terms (common.ordination).
+    """
+    X, features = feature_matrix(frame, terms)
+    result = dca(X, n_axes=2)
+    scores = result.row_scores
+    for axis, anchor in enumerate(AXIS_ANCHORS):
+        matches = np.flatnonzero(features == anchor)
+        if len(matches) and result.col_scores[matches[0], axis] > np.nanmean(result.col_scores[:, axis]):
+            scores[:, axis] = -scores[:, axis]
+    return scores - np.nanmean(scores, axis=0)
+
+
+def create_dca_plot(frame, terms, label, stem, stopwords=STOPWORDS):
+    """Create the DCA plot with ellipses and keywords
+
+    frame holds the subset's coded COLUMNS, indexed by row position in the
+    dataset of terms; label names the subset in the title ('Empirical').
+    """
+    np.random.seed(42)
+    df = frame.copy()
+
+    # DCA scores of each article
+    positions = calculate_positions(frame, terms)
+    df['axis1'] = positions[:, 0]
+    df['axis2'] = positions[:, 1]
+
+    # Remove articles without valid positions
+    df = df[df['subject_megatrend'].isin(MEGATREND_ORDER)].dropna(subset=['axis1', 'axis2'])
+
+    # Create figure
+    fig, ax = plt.subplots(figsize=(14, 12))
+
+    cluster_info = []
+
+    # Top abstract keywords of every megatrend in one sparse group-sum
+    megatrend_keywords = terms.top_terms(df['subject_megatrend'], k=15,
+                                         stopwords=stopwords)
+
+    # Draw ellipses for each megatrend
+    for megatrend in MEGATREND_ORDER:
+        megatrend_df = df[df['subject_megatrend'] == megatrend]
+
+        if len(megatrend_df) < 10:
+            continue
+
+        x = megatrend_df['axis1'].values
+        y = megatrend_df['axis2'].values
+
+        mean_x, mean_y = np.mean(x), np.mean(y)
+
+        # Calculate covariance matrix for ellipse
+        cov = np.cov(x, y)
+        eigenvalues, eigenvectors = np.linalg.eigh(cov)
+
+        order = eigenvalues.argsort()[::-1]
+        eigenvalues = eigenvalues[order]
+        eigenvectors = eigenvectors[:, order]
+
+        angle = np.degrees(np.arctan2(*eigenvectors[:, 0][::-1]))
+
+        # Larger multiplier for bigger ellipses (like reference image)
+        width = 3.5 * np.sqrt(eigenvalues[0])
+        height = 3.5 * np.sqrt(eigenvalues[1])
+
+        color = MEGATREND_COLORS[megatrend]
+
+        # Draw ellipse with more transparency for overlap visibility
+        ellipse = Ellipse((mean_x, mean_y), width, height, angle=angle,
+                         facecolor=to_rgba(color, 0.25),
+                         edgecolor=to_rgba(color, 0.7),
+                         linewidth=2, zorder=1)
+        ax.add_patch(ellipse)
+
+        keywords = megatrend_keywords.get(megatrend, [])
+
+        cluster_info.append({
+            'name': megatrend,
+            'short_name': MEGATREND_SHORT_NAMES[megatrend],
+            'count': len(megatrend_df),
+            'mean_x': mean_x,
+            'mean_y': mean_y,
+            'width': width,
+            'height': height,
+            'angle': angle,
+            'color': color,
+            'keywords': keywords
+        })
+
+        # Add cluster label with count (positioned near top of ellipse)
+        short_name = MEGATREND_SHORT_NAMES[megatrend]
+        angle_rad = np.radians(angle)
+
+        # Position label offset from center toward top
+        label_offset_x = -0.3 * height * np.sin(angle_rad)
+        label_offset_y = 0.3 * height * np.cos(angle_rad)
+
+        ax.text(mean_x + label_offset_x, mean_y + label_offset_y,
+               f'{short_name}, {len(megatrend_df)}',
+               fontsize=10, fontweight='bold', ha='center', va='center',
+               color=to_rgba(color, 1.0), zorder=5,
+               bbox=dict(boxstyle='round,pad=0.2', facecolor='white',
+                        edgecolor='none', alpha=0.8))
+
+        # Add keywords scattered throughout the ellipse
+        n_keywords_to_show = min(12, len(keywords))
+
+        for j, (keyword, count) in enumerate(keywords[:n_keywords_to_show]):
+            # Random position within ellipse
+            r = np.random.uniform(0.15, 0.85)
+            theta = np.random.uniform(0, 2 * np.pi)
+
+            # Position in ellipse local coordinates
+            local_x = r * (width/2) * np.cos(theta) * 0.8
+            local_y = r * (height/2) * np.sin(theta) * 0.8
+
+            # Rotate to ellipse orientation
+            rot_x = local_x * np.cos(angle_rad) - local_y * np.sin(angle_rad)
+            rot_y = local_x * np.sin(angle_rad) + local_y * np.cos(angle_rad)
+
+            kw_x = mean_x + rot_x
+            kw_y = mean_y + rot_y
+
+            # Font size based on frequency (larger range like reference)
+            max_count = keywords[0][1] if keywords else 1
+            fontsize = 7 + (count / max_count) * 5
+
+            ax.text(kw_x, kw_y, keyword.capitalize(),
+                   fontsize=fontsize, ha='center', va='center',
+                   color=to_rgba(color, 0.8), zorder=3)
+
+    # Square frame around all ellipses; u is the frame size in units of the
+    # original fixed (-4, 5) frame, so decorations keep their proportions
+    reach = [max(info['width'], info['height']) / 2 for info in cluster_info]
+    lo = np.floor(min(min(i['mean_x'], i['mean_y']) - r for i, r in zip(cluster_info, reach)))
+    hi = np.ceil(max(max(i['mean_x'], i['mean_y']) + r for i, r in zip(cluster_info, reach)))
+    u = (hi - lo) / 9
+
+    # Set axis limits
+    ax.set_xlim(lo, hi)
+    ax.set_ylim(lo, hi)
+
+    # Add quadrant dividers
+    ax.axhline(y=0, color='#aaaaaa', linestyle='--', linewidth=1, zorder=0, alpha=0.6)
+    ax.axvline(x=0, color='#aaaaaa', linestyle='--', linewidth=1, zorder=0, alpha=0.6)
+
+    # Axis labels
+    ax.set_xlabel('Detrended correspondence analysis first axis,\nranging from black-box prediction to interpretable intelligence',
+                  fontsize=11, fontweight='bold', labelpad=12)
+    ax.set_ylabel('Detrended correspondence analysis second axis,\nranging from physical systems to cyber-physical integration',
+                  fontsize=11, fontweight='bold', labelpad=12)
+
+    # Add endpoint descriptions at corners
+    ax.text(lo, lo - 0.3 * u, 'Black-Box Prediction\n(Technical Metrics, Algorithmic Sophistication)',
+            fontsize=8, ha='left', va='top', style='italic', color='#666666')
+    ax.text(hi, lo - 0.3 * u, 'Interpretable Intelligence\n(Explainability, Policy Relevance)',
+            fontsize=8, ha='right', va='top', style='italic', color='#666666')
+    ax.text(lo - 0.6 * u, lo, 'Physical Systems\n(Climate, Land,\nHydrology)',
+            fontsize=8, ha='right', va='bottom', style='italic', color='#666666', rotation=90)
+    ax.text(lo - 0.6 * u, hi, 'Cyber-Physical\n(IoT, Data\nInfrastructure)',
+            fontsize=8, ha='right', va='top', style='italic', color='#666666', rotation=90)
+
+    # Style
+    ax.spines['top'].set_visible(False)
+    ax.spines['right'].set_visible(False)
+    step = 2 if hi - lo > 6 else 1
+    ticks = np.arange(np.ceil(lo / step) * step, hi + 0.01, step)
+    ax.set_xticks(ticks)
+    ax.set_yticks(ticks)
+
+    # Add legend box (bottom right like reference)
+    legend_x, legend_y = lo + 7.5 * u, lo + 1.5 * u
+
+    legend_box = plt.Rectangle((legend_x - 0.5 * u, legend_y - 1.3 * u), 2.0 * u, 1.8 * u,
+                                facecolor='white', edgecolor='#cccccc',
+                                linewidth=1, zorder=4)
+    ax.add_patch(legend_box)
+
+    ax.text(legend_x + 0.5 * u, legend_y + 0.3 * u, 'Legend', fontsize=10, fontweight='bold',
+           ha='center', va='bottom', zorder=5)
+
+    # Example ellipse in legend (black filled circle like reference)
+    legend_circle = plt.Circle((legend_x + 0.5 * u, legend_y - 0.3 * u), 0.4 * u,
+                               facecolor='#333333', edgecolor='none', zorder=5)
+    ax.add_patch(legend_circle)
+
+    ax.text(legend_x + 0.5 * u, legend_y - 0.3 * u, 'Group,\nnumber of\narticles',
+           fontsize=7, ha='center', va='center', fontweight='bold',
+           color='white', zorder=6)
+
+    ax.text(legend_x + 0.5 * u, legend_y - 1.0 * u, 'Group ellipse\nbased on eigenvalues',
+           fontsize=7, ha='center', va='top', style='italic', color='#666666', zorder=5)
+
+    # Arrow pointing to ellipse edge
+    ax.annotate('', xy=(legend_x + 0.85 * u, legend_y - 0.5 * u),
+               xytext=(legend_x + 1.2 * u, legend_y - 0.85 * u),
+               arrowprops=dict(arrowstyle='-', color='#666666', lw=1), zorder=5)
+
+    # Title
+    ax.set_title('Detrended Correspondence Analysis (DCA) of AI in Urban Studies\n(n = {:,} {} Articles, 2020-2025)'.format(len(df), label),
+                fontsize=13, fontweight='bold', pad=15)
+
+    plt.tight_layout()
+
+    # Save
+    paths = save_figure(fig, stem, formats=('pdf', 'png'),
+                        dpi=300, edgecolor='none', facecolor='white')
+
+    print(f"Saved: {', '.join(p.name for p in paths)}")
+
+    # Print statistics
+    print(f"\n=== DCA Plot Statistics ({label}) ===")
+    print(f"Total articles: {len(df)}")
+    print(f"\nMegatrends ({len(cluster_info)}):")
+    for info in sorted(cluster_info, key=lambda x: -x['count']):
+        print(f"\n  {info['short_name']}: {info['count']} articles")
+        print(f"    Position: ({info['mean_x']:.2f}, {info['mean_y']:.2f})")
+        print(f"    Ellipse size: {info['width']:.2f} x {info['height']:.2f}")
+        top_kw = ', '.join([k[0] for k in info['keywords'][:5]])
+        print(f"    Top keywords: {top_kw}")
+
+    plt.close()
@@ -0,0 +1,274 @@
+"""
+Duplicate detection across the yearly Scopus exports
+
+The yearly exports overlap: the same article can appear twice under one EID,
+or as early-access and final versions, corrigenda or preprint/final pairs
+under different EIDs with slightly edited titles and abstracts.
+
+Records are matched in two stages:
+1. exact keys: the same normalised DOI or the same EID
+2. near duplicates: MinHash signatures of the abstract's word 3-shingles
+   (ignoring the copyright line and '[No abstract available]' placeholders),
+   banded for locality-sensitive hashing (LSH). Only records sharing a band
+   are compared, so the cost grows linearly with the corpus instead of with
+   the number of pairs; candidate pairs are kept when their estimated
+   Jaccard similarity reaches the threshold.
+
+Matched records form duplicate groups (connected components). Each group
+keeps one record (the final publication stage first, then the most cited,
+then the latest year) and the merge report lists every grouped record with
+how it was matched.
+
+Usage (from code/):
+    python -m common.dedup                        # report on combined_research.csv
+    python -m common.dedup --threshold 0.7 --report duplicates.csv
+"""
+
+import argparse
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+from scipy import sparse
+from scipy.sparse.csgraph import connected_components
+
+from common.data_access import REPO_ROOT, load_dataset
+from common.tokens import tokenize
+
+SHINGLE_SIZE = 3        # words per shingle
+NUM_PERM = 128          # MinHash permutations
+BANDS = 16              # LSH bands of NUM_PERM // BANDS rows; ~0.7 Jaccard crossover
+THRESHOLD = 0.8         # estimated Jaccard similarity of a near duplicate
+MAX_BUCKET = 50         # larger LSH buckets are boilerplate, not duplicates
+MIN_SHINGLES = 10       # shorter abstracts are not compared
+CHUNK_SHINGLES = 1 << 12     # small chunks keep the hash block in cache
+SEED = 20200101
+
+REPORT_COLUMNS = ['group', 'kept', 'match', 'similarity', 'EID', 'DOI', 'Year',
+                  'Publication Stage', 'Cited by', 'Title']
+
+
+def normalize_doi(doi):
+    """Lower-case DOI without resolver prefix, NA when empty"""
+    doi = doi.astype('string').str.strip().str.lower()
+    doi = doi.str.replace(r'^(?:https?://(?:dx\.)?doi\.org/|doi:\s*)', '', regex=True)
+    return doi.mask(doi == '')
+
+
+def key_pairs(keys):
+    """(first row, row) pairs linking every row to the first row with the same key"""
+    codes, _ = pd.factorize(keys, use_na_sentinel=True)
+    rows = np.flatnonzero(codes >= 0)
+    # Codes are 0..n-1 in order of first occurrence
+    _, first = np.unique(codes[rows], return_index=True)
+    firsts = rows[first][codes[rows]]
+    linked = firsts != rows
+    return np.column_stack([firsts[linked], rows[linked]])
+
+
+def comparable_abstracts(abstracts):
+    """Abstracts with Scopus placeholders masked and the copyright line removed
+
+    The publisher line ('© 2021 Elsevier Ltd') differs between the versions of
+    one article, and placeholders such as '[No abstract available]' are shared
+    by unrelated records.
+    """
+    text = abstracts.astype('string').str.replace(r'\s*©.*$', '', regex=True)
+    return text.mask(text.str.fullmatch(r'\s*(?:\[[^\]]*\])?\s*', na=True))
+
+
+def shingle_hashes(texts, k=SHINGLE_SIZE):
+    """64-bit hashes of every word k-shingle and the document of each"""
+    ids, offsets, _ = tokenize(texts)
+    ids = ids.astype(np.uint64)
+    starts = np.arange(max(len(ids) - k + 1, 0))
+    doc_end = np.repeat(offsets[1:], np.diff(offsets))[:len(starts)]
+    starts = starts[starts + k <= doc_end]
+    hashes = np.zeros(len(starts), dtype=np.uint64)
+    with np.errstate(over='ignore'):
+        for j in range(k):
+            hashes = (hashes * np.uint64(0x100000001B3)) ^ (ids[starts + j] + np.uint64(1))
+    docs = np.searchsorted(offsets, starts, side='right') - 1
+    return hashes, docs
+
+
+def minhash(hashes, docs, n_docs, num_perm=NUM_PERM, seed=SEED):
+    """uint32 MinHash signatures (n_docs x num_perm); rows without shingles stay at the max
+
+    Permutation i maps a shingle hash x to ((x ^ a_i) * b_i) >> 32 with odd b_i.
+    """
+    rng = np.random.default_rng(seed)
+    a = rng.integers(0, 2 ** 63, num_perm, dtype=np.uint64)
+    b = rng.integers(0, 2 ** 62, num_perm, dtype=np.uint64) * np.uint64(2) + np.uint64(1)
+    signatures = np.full((n_docs, num_perm), np.iinfo(np.uint32).max, dtype=np.uint32)
+
+    # Shingles come grouped by document; process whole documents per chunk
+    bounds = np.flatnonzero(np.diff(docs)) + 1
+    doc_starts = np.concatenate([[0], bounds]) if len(docs) else np.empty(0, dtype=np.int64)
+    cuts = [0]
+    while cuts[-1] < len(doc_starts):
+        limit = doc_starts[cuts[-1]] + CHUNK_SHINGLES
+        cuts.append(max(int(np.searchsorted(doc_starts, limit, side='right')), cuts[-1] + 1))
+    ends = np.append(doc_starts[1:], len(docs))
+    with np.errstate(over='ignore'):
+        for lo, hi in zip(cuts[:-1], cuts[1:]):
+            first, last = doc_starts[lo], ends[hi - 1]
+            values = np.bitwise_xor(hashes[first:last, None], a)
+            np.multiply(values, b, out=values)
+            np.right_shift(values, np.uint64(32), out=values)
+            mins = np.minimum.reduceat(values, doc_starts[lo:hi] - first, axis=0)
+            signatures[docs[doc_starts[lo:hi]]] = mins
+    return signatures
+
+
+def lsh_candidates(signatures, valid, bands=BANDS, max_bucket=MAX_BUCKET, seed=SEED):
+    """Candidate pairs (i < j) that share at least one LSH band"""
+    rows_per_band = signatures.shape[1] // bands
+    mix = np.random.default_rng(seed + 1).integers(1, 2 ** 63, rows_per_band,
+                                                   dtype=np.uint64) | np.uint64(1)
+    docs = np.flatnonzero(valid)
+    pairs = []
+    with np.errstate(over='ignore'):
+        for band in range(bands):
+            block = signatures[docs, band * rows_per_band:(band + 1) * rows_per_band]
+            keys = (block.astype(np.uint64) * mix).sum(axis=1)
+            order = np.argsort(keys, kind='stable')
+            sorted_keys = keys[order]
+            bucket = np.cumsum(np.r_[True, sorted_keys[1:] != sorted_keys[:-1]])
+            sizes = np.bincount(bucket)
+            usable = (sizes[bucket] > 1) & (sizes[bucket] <= max_bucket)
+            # Every pair in a bucket is (p, p + d) in sorted order for some d
+            for d in range(1, max_bucket):
+                same = usable[:-d] & (bucket[:-d] == bucket[d:])
+                if not same.any():
+                    break
+                p = np.flatnonzero(same)
+                pairs.append(np.column_stack([docs[order[p]], docs[order[p + d]]]))
+    if not pairs:
+        return np.empty((0, 2), dtype=np.int64)
+    pairs = np.sort(np.concatenate(pairs), axis=1).astype(np.int64)
+    n = len(signatures)
+    keys = np.unique(pairs[:, 0] * n + pairs[:, 1])
+    return np.column_stack([keys // n, keys % n])
+
+
+def find_duplicates(df, threshold=THRESHOLD):
+    """Matched pairs: DataFrame of (a, b, match, similarity) over row positions"""
+    found = []
+    for column, match in [('DOI', 'doi'), ('EID', 'eid')]:
+        if column in df.columns:
+            keys = normalize_doi(df[column]) if column == 'DOI' else df[column].astype('string')
+            pairs = key_pairs(keys.to_numpy(dtype=object, na_value=None))
+            found.append(pd.DataFrame({'a': pairs[:, 0], 'b': pairs[:, 1], 'match': match,
+                                       'similarity': 1.0}))
+
+    if 'Abstract' in df.columns:
+        abstracts = comparable_abstracts(df['Abstract'].reset_index(drop=True))
+        hashes, docs = shingle_hashes(abstracts)
+        signatures = minhash(hashes, docs, len(df))
+        valid = np.bincount(docs, minlength=len(df)) >= MIN_SHINGLES
+        pairs = lsh_candidates(signatures, valid)
+        similarity = (signatures[pairs[:, 0]] == signatures[pairs[:, 1]]).mean(axis=1)
+        near = similarity >= threshold
+        found.append(pd.DataFrame({'a': pairs[near, 0], 'b': pairs[near, 1], 'match': 'near',
+                                   'similarity': similarity[near].round(3)}))
+
+    matches = pd.concat(found, ignore_index=True)
+    # One row per pair, the exact key taking precedence over near matching
+    pairs = np.sort(matches[['a', 'b']].to_numpy(), axis=1)
+    matches[['a', 'b']] = pairs
+    return matches.drop_duplicates(['a', 'b'], keep='first').reset_index(drop=True)
+
+
+def duplicate_groups(n_rows, matches):
+    """Group label per row (-1 when the row has no duplicate)"""
+    graph = sparse.coo_matrix((np.ones(len(matches)), (matches['a'], matches['b'])),
+                              shape=(n_rows, n_rows))
+    _, labels = connected_components(graph, directed=False)
+    sizes = np.bincount(labels)
+    grouped = sizes[labels] > 1
+    groups = np.full(n_rows, -1)
+    groups[grouped] = pd.factorize(labels[grouped])[0]
+    return groups
+
+
+def keep_order(df):
+    """Row preference within a group: final stage, most cited, latest year, first seen"""
+    stage = (df['Publication Stage'].astype('string').str.lower().eq('final').fillna(False)
+             if 'Publication Stage' in df.columns else pd.Series(False, index=df.index))
+    cited = (pd.to_numeric(df['Cited by'], errors='coerce').fillna(0)
+             if 'Cited by' in df.columns else pd.Series(0, index=df.index))
+    year = (pd.to_numeric(df['Year'], errors='coerce').fillna(0)
+            if 'Year' in df.columns else pd.Series(0, index=df.index))
+    preference = pd.DataFrame({'stage': stage.to_numpy(), 'cited': cited.to_numpy(),
+                               'year': year.to_numpy(), 'row': -np.arange(len(df))})
+    return preference.sort_values(['stage', 'cited', 'year', 'row'], ascending=False).index
+
+
+def deduplicate(df, threshold=THRESHOLD):
+    """Drop duplicates; returns (deduplicated frame, merge report)"""
+    df = df.reset_index(drop=True)
+    matches = find_duplicates(df, threshold)
+    groups = duplicate_groups(len(df), matches)
+
+    order = keep_order(df)
+    ranked = pd.Series(groups[order], index=order)
+    kept_rows = ranked[ranked >= 0].drop_duplicates(keep='first').index
+    drop = np.zeros(len(df), dtype=bool)
+    drop[groups >= 0] = True
+    drop[kept_rows] = False
+
+    # How each row joined its group: its strongest match
+    strength = {'doi': 0, 'eid': 1, 'near': 2}
+    links = pd.concat([matches.rename(columns={'a': 'row'}).drop(columns='b'),
+                       matches.rename(columns={'b': 'row'}).drop(columns='a')])
+    links = (links.assign(rank=links['match'].map(strength))
+             .sort_values(['row', 'rank', 'similarity'], ascending=[True, True, False])
+             .drop_duplicates('row').set_index('row'))
+
+    rows = np.flatnonzero(groups >= 0)
+    report = df.iloc[rows].reindex(columns=REPORT_COLUMNS[4:]).copy()
+    report.insert(0, 'group', groups[rows])
+    report.insert(1, 'kept', ~drop[rows])
+    report.insert(2, 'match', links['match'].reindex(rows).to_numpy())
+    report.insert(3, 'similarity', links['similarity'].reindex(rows).to_numpy())
+    report = report.sort_values(['group', 'kept'], ascending=[True, False], kind='stable')
+    return df[~drop].reset_index(drop=True), report.reset_index(drop=True)
+
+
+def summarize(report):
+    """One-line summary of a merge report"""
+    if report.empty:
+        return "no duplicates found"
+    dropped = report[~report['kept']]
+    by_match = dropped['match'].value_counts()
+    detail = ', '.join(f"{by_match.get(m, 0):,} {m}" for m in ['doi', 'eid', 'near'])
+    return (f"{report['group'].nunique():,} duplicate groups, {len(dropped):,} records "
+            f"dropped ({detail})")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--dataset', default='combined_raw',
+                        help='Dataset name or CSV path (default: combined_raw)')
+    parser.add_argument('--threshold', type=float, default=THRESHOLD,
+                        help=f'Estimated Jaccard similarity of near duplicates '
+                             f'(default: {THRESHOLD})')
+    parser.add_argument('--report', type=Path,
+                        default=REPO_ROOT / 'data' / 'raw' / 'combined_research_duplicates.csv',
+                        help='Merge report CSV to write')
+    args = parser.parse_args()
+
+    df = load_dataset(args.dataset)
+    start = time.perf_counter()
+    deduplicated, report = deduplicate(df, args.threshold)
+    elapsed = time.perf_counter() - start
+
+    report.to_csv(args.report, index=False, encoding='utf-8-sig')
+    print(f"{len(df):,} records -> {len(deduplicated):,} in {elapsed:.2f}s: {summarize(report)}")
+    print(f"Merge report: {args.report}")
+
+
+if __name__ == "__main__":
+    main()
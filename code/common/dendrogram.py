@@ -0,0 +1,207 @@
+"""
+Data-driven taxonomy dendrogram (Subject Clusters -> Research Trends -> Megatrends -> Root)
+
+The tree is built from a flat taxonomy table with one row per subject
+cluster (data/processed/<subset>/hierarchy_taxonomy.csv):
+
+    Megatrend, Research Trend, Subject Cluster, Articles
+
+Layout is computed for all nodes at once: leaves are stacked top to bottom in
+row units (megatrends by article count, trends by summed articles, clusters
+by articles), a parent sits at the mean height of its children, and gaps are
+added at trend and megatrend boundaries. Drawing uses one LineCollection per
+level for all elbows and a single scatter for every node, so the number of
+artists does not grow with the number of clusters. Figure height follows
+from the number of rows.
+
+Usage:
+    from common.dendrogram import read_taxonomy, layout_tree, draw_tree
+    tree = layout_tree(read_taxonomy(path), totals=megatrend_counts)
+    fig, ax = plt.subplots(figsize=(22, tree.figure_height()))
+    draw_tree(ax, tree, MEGATREND_COLORS, MEGATREND_SHORT)
+"""
+
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+from matplotlib.collections import LineCollection
+from matplotlib.colors import to_rgba
+from matplotlib.markers import MarkerStyle
+
+MEGATREND, TREND, CLUSTER, ARTICLES = 'Megatrend', 'Research Trend', 'Subject Cluster', 'Articles'
+
+# Column positions (axes fraction) of labels, nodes and connectors
+X_POSITIONS = {
+    'cluster_label': 0.26, 'cluster_dot': 0.27, 'cluster_vert': 0.30,
+    'trend_dot': 0.44, 'trend_label': 0.45, 'trend_vert': 0.60,
+    'mega_dot': 0.72, 'mega_label': 0.73, 'mega_vert': 0.88, 'root': 0.93,
+}
+
+ROOT_COLOR = '#263238'
+ROOT_LINE_COLOR = '#37474F'
+
+# Vertical size of one cluster row in the figure
+ROW_INCHES = 0.24
+
+
+def read_taxonomy(path):
+    """Flat taxonomy table from a hierarchy_taxonomy.csv"""
+    return pd.read_csv(path, encoding='utf-8-sig')[[MEGATREND, TREND, CLUSTER, ARTICLES]]
+
+
+def taxonomy_frame(nested):
+    """Flat taxonomy table from a {megatrend: {'trends': {trend: [(cluster, n)]}}} dict"""
+    rows = [(mt, trend, cluster, n)
+            for mt, data in nested.items()
+            for trend, clusters in data['trends'].items()
+            for cluster, n in clusters]
+    return pd.DataFrame(rows, columns=[MEGATREND, TREND, CLUSTER, ARTICLES])
+
+
+@dataclass
+class TreeLayout:
+    """Node positions of a laid-out taxonomy, y in row units growing downwards"""
+    clusters: pd.DataFrame     # one row per leaf: names, Articles, y
+    trends: pd.DataFrame       # Megatrend, Research Trend, y, y_min, y_max
+    megatrends: pd.DataFrame   # Megatrend, Articles, y, y_min, y_max
+    root_y: float
+    height: float              # y of the last leaf + 1
+
+    def figure_height(self, extra_rows=12, minimum=8):
+        """Figure height in inches for the rows plus header and legend space"""
+        return max(minimum, (self.height + extra_rows) * ROW_INCHES)
+
+
+def layout_tree(taxonomy, totals=None, order=None, trend_gap=0.3, megatrend_gap=1.3,
+                sort=True):
+    """Stack the leaves and place every parent at the mean height of its children
+
+    totals maps megatrend -> article count (defaults to the sum of its
+    clusters); order fixes the megatrend order instead of sorting by totals.
+    With sort=False, trends and clusters keep their order in the table.
+    """
+    df = taxonomy.reset_index(drop=True)
+    totals = (pd.Series(totals, dtype=float) if totals is not None
+              else df.groupby(MEGATREND, sort=False)[ARTICLES].sum())
+    mega_order = list(order) if order is not None else list(
+        totals.reindex(df[MEGATREND].unique()).sort_values(ascending=False, kind='stable').index)
+
+    df['_mega_rank'] = df[MEGATREND].map({mt: i for i, mt in enumerate(mega_order)})
+    df = df.dropna(subset=['_mega_rank'])
+    if sort:
+        df['_trend_size'] = df.groupby([MEGATREND, TREND], sort=False)[ARTICLES].transform('sum')
+        df = df.sort_values(['_mega_rank', '_trend_size', TREND, ARTICLES],
+                            ascending=[True, False, True, False], kind='stable')
+    else:
+        df['_trend_rank'] = df.groupby(MEGATREND, sort=False)[TREND].transform(
+            lambda s: pd.factorize(s)[0])
+        df = df.sort_values(['_mega_rank', '_trend_rank'], kind='stable')
+    df = df.reset_index(drop=True)
+
+    # Leaf heights: one row each plus a gap at every trend / megatrend boundary
+    new_mega = df[MEGATREND].ne(df[MEGATREND].shift()).to_numpy(copy=True)
+    new_trend = df[TREND].ne(df[TREND].shift()).to_numpy() | new_mega
+    new_mega[0] = new_trend[0] = False
+    gaps = np.where(new_mega, megatrend_gap, np.where(new_trend, trend_gap, 0.0))
+    df['y'] = np.arange(len(df)) + np.cumsum(gaps)
+
+    trends = (df.groupby([MEGATREND, TREND], sort=False)['y']
+                .agg(y='mean', y_min='min', y_max='max').reset_index())
+    megatrends = (trends.groupby(MEGATREND, sort=False)['y']
+                    .agg(y='mean', y_min='min', y_max='max').reset_index())
+    megatrends.insert(1, ARTICLES, totals.reindex(megatrends[MEGATREND]).to_numpy())
+
+    return TreeLayout(clusters=df[[MEGATREND, TREND, CLUSTER, ARTICLES, 'y']],
+                      trends=trends, megatrends=megatrends,
+                      root_y=float(megatrends['y'].mean()),
+                      height=float(df['y'].iloc[-1] + 1) if len(df) else 0.0)
+
+
+def _segments(x0, x1, y0, y1):
+    """(n, 2, 2) line segments from coordinate arrays"""
+    x0, x1, y0, y1 = np.broadcast_arrays(*(np.asarray(v, dtype=float) for v in (x0, x1, y0, y1)))
+    return np.stack([np.stack([x0, y0], axis=-1), np.stack([x1, y1], axis=-1)], axis=-2)
+
+
+def _rgba(colors, alpha):
+    return np.array([to_rgba(c, alpha) for c in colors]).reshape(-1, 4)
+
+
+def elbow_collections(tree, colors, x=X_POSITIONS, line_widths=(1.0, 1.8, 2.8, 3.5)):
+    """One LineCollection per level: clusters, trends and megatrends with the root"""
+    lw_cluster, lw_trend, lw_mega, lw_root = line_widths
+    clusters, trends, megas = tree.clusters, tree.trends, tree.megatrends
+
+    # Clusters: dot -> trend connector, plus the connector spanning each trend
+    spans = trends[trends['y_max'] > trends['y_min']]
+    cluster_lines = np.concatenate([
+        _segments(x['cluster_dot'], x['cluster_vert'], clusters['y'], clusters['y']),
+        _segments(x['cluster_vert'], x['cluster_vert'], spans['y_min'], spans['y_max'])])
+    cluster_colors = _rgba([colors[m] for m in pd.concat([clusters[MEGATREND], spans[MEGATREND]])], 0.5)
+
+    # Trends: cluster connector -> trend dot -> megatrend connector
+    spans = megas[megas['y_max'] > megas['y_min']]
+    trend_lines = np.concatenate([
+        _segments(x['cluster_vert'], x['trend_vert'], trends['y'], trends['y']),
+        _segments(x['trend_vert'], x['trend_vert'], spans['y_min'], spans['y_max'])])
+    trend_colors = _rgba([colors[m] for m in pd.concat([trends[MEGATREND], spans[MEGATREND]])], 0.6)
+
+    # Megatrends: trend connector -> megatrend dot -> root connector, then the root
+    mega_lines = np.concatenate([
+        _segments(x['trend_vert'], x['mega_vert'], megas['y'], megas['y']),
+        _segments(x['mega_vert'], x['mega_vert'], megas['y'].min(), megas['y'].max())[None],
+        _segments(x['mega_vert'], x['root'], tree.root_y, tree.root_y)[None]])
+    mega_colors = np.concatenate([_rgba([colors[m] for m in megas[MEGATREND]], 0.7),
+                                  _rgba([ROOT_LINE_COLOR], 0.8), _rgba([ROOT_LINE_COLOR], 0.9)])
+    mega_widths = [lw_mega] * (len(megas) + 1) + [lw_root]
+
+    return [LineCollection(cluster_lines, colors=cluster_colors, linewidths=lw_cluster, zorder=1),
+            LineCollection(trend_lines, colors=trend_colors, linewidths=lw_trend, zorder=2),
+            LineCollection(mega_lines, colors=mega_colors, linewidths=mega_widths, zorder=3)]
+
+
+def node_scatter(ax, tree, colors, x=X_POSITIONS):
+    """Every node as one scatter: circles for clusters, megatrends and root, squares for trends"""
+    clusters, trends, megas = tree.clusters, tree.trends, tree.megatrends
+    levels = [(clusters, x['cluster_dot'], 'o', 5, 0.3),
+              (trends, x['trend_dot'], 's', 8, 0.5),
+              (megas, x['mega_dot'], 'o', 14, 1.0)]
+
+    xs, ys, fills, markers, sizes, edges = [], [], [], [], [], []
+    for nodes, x_pos, marker, size, edge in levels:
+        xs.append(np.full(len(nodes), x_pos))
+        ys.append(nodes['y'].to_numpy())
+        fills.extend(colors[m] for m in nodes[MEGATREND])
+        markers.extend([marker] * len(nodes))
+        sizes.append(np.full(len(nodes), size ** 2))
+        edges.append(np.full(len(nodes), edge))
+    xs.append([x['root']]), ys.append([tree.root_y]), fills.append(ROOT_COLOR)
+    markers.append('o'), sizes.append([22 ** 2]), edges.append([1.5])
+
+    nodes = ax.scatter(np.concatenate(xs), np.concatenate(ys), s=np.concatenate(sizes),
+                       c=_rgba(fills, 1.0), edgecolors='white',
+                       linewidths=np.concatenate(edges), zorder=10)
+    paths = {m: MarkerStyle(m).get_path().transformed(MarkerStyle(m).get_transform())
+             for m in set(markers)}
+    nodes.set_paths([paths[m] for m in markers])
+    return nodes
+
+
+def draw_tree(ax, tree, colors, short_names, x=X_POSITIONS, fs_cluster=8.5, fs_trend=9.5,
+              fs_megatrend=11):
+    """Connectors, nodes and node labels of a laid-out taxonomy"""
+    for lines in elbow_collections(tree, colors, x):
+        ax.add_collection(lines, autolim=False)
+    node_scatter(ax, tree, colors, x)
+
+    for name, n, y in tree.clusters[[CLUSTER, ARTICLES, 'y']].itertuples(index=False):
+        ax.text(x['cluster_label'], y, f"{name} ({n})", va='center', ha='right',
+                fontsize=fs_cluster, color='#333333')
+    for name, y in tree.trends[[TREND, 'y']].itertuples(index=False):
+        ax.text(x['trend_label'], y, name, va='center', ha='left',
+                fontsize=fs_trend, color='#333333', fontweight='medium')
+    for mt, n, y in tree.megatrends[[MEGATREND, ARTICLES, 'y']].itertuples(index=False):
+        ax.text(x['mega_label'], y, f"{short_names.get(mt, mt)}\n(n={int(n):,})",
+                va='center', ha='left', fontsize=fs_megatrend,
+                color=colors[mt], fontweight='bold', linespacing=0.9)
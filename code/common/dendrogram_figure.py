@@ -0,0 +1,120 @@
+"""
+Polished Hierarchical Taxonomy Dendrogram
+- Compact, efficient layout
+- Proper line weights and clean orthogonal (right-angle) connections throughout
+- Full readable text
+- Professional academic visualization style
+- Built from a subset's hierarchy_taxonomy.csv (common.pipeline)
+"""
+
+import matplotlib.pyplot as plt
+
+from common.dendrogram import X_POSITIONS, draw_tree, layout_tree
+from common.export import save_figure
+
+# Applied by common.pipeline
+RC_PARAMS = {'pdf.fonttype': 42, 'ps.fonttype': 42, 'axes.linewidth': 0.5}
+
+# Refined color palette for megatrends
+MEGATREND_COLORS = {
+    'Digital Transformation & Smart Cities': '#1565C0',       # Blue
+    'Climate Change & Environmental Sustainability': '#2E7D32', # Green
+    'Urban Mobility & Transportation': '#EF6C00',              # Orange
+    'Urban Development & Land Use': '#7B1FA2',                 # Purple
+    'Social Equity & Quality of Life': '#00838F',              # Teal
+    'Urban Resilience & Safety': '#C62828',                    # Red
+}
+
+MEGATREND_SHORT = {
+    'Digital Transformation & Smart Cities': 'Digital & Smart Cities',
+    'Climate Change & Environmental Sustainability': 'Climate & Environment',
+    'Urban Mobility & Transportation': 'Mobility & Transportation',
+    'Urban Development & Land Use': 'Urban Development',
+    'Social Equity & Quality of Life': 'Social Equity & QoL',
+    'Urban Resilience & Safety': 'Resilience & Safety',
+}
+
+def create_dendrogram(taxonomy, totals, root_label, title, stem, sort=True, trend_gap=0.3,
+                      megatrend_gap=1.3, font_sizes=(8.5, 9.5, 11), legend_gap=2.5):
+    """Create a clean, professional hierarchical dendrogram
+
+    totals maps megatrend -> articles; sort=False keeps the taxonomy's own
+    trend and cluster order. font_sizes are (cluster, trend, megatrend).
+    """
+    
+    tree = layout_tree(taxonomy, totals=totals, trend_gap=trend_gap,
+                       megatrend_gap=megatrend_gap, sort=sort)
+    total_articles = int(tree.megatrends['Articles'].sum())
+    
+    print(f"Total clusters: {len(tree.clusters)}")
+    print(f"Total trends: {len(tree.trends)}")
+    print(f"Total megatrends: {len(tree.megatrends)}")
+    print(f"Total articles: {total_articles}")
+    
+    # Figure dimensions - height grows with the number of cluster rows
+    fig_width = 22
+    fig_height = tree.figure_height()
+    fig, ax = plt.subplots(figsize=(fig_width, fig_height))
+    
+    x = X_POSITIONS
+    fs_root = 13
+    fs_header = 12
+    
+    # Connectors (one collection per level), nodes (one scatter) and labels
+    fs_cluster, fs_trend, fs_megatrend = font_sizes
+    draw_tree(ax, tree, MEGATREND_COLORS, MEGATREND_SHORT,
+              fs_cluster=fs_cluster, fs_trend=fs_trend, fs_megatrend=fs_megatrend)
+    
+    # Root label
+    ax.text(x['root'], tree.root_y + 1.5, f'{root_label}\n(N={total_articles:,})',
+           va='top', ha='center', fontsize=fs_root, color='#263238',
+           fontweight='bold', linespacing=0.9)
+    
+    # Column headers
+    header_y = -1.5
+    for x_pos, header in [(x['cluster_label'] - 0.08, 'Subject Clusters'),
+                          (x['trend_dot'] + 0.07, 'Research Trends'),
+                          (x['mega_dot'] + 0.07, 'Megatrends'),
+                          (x['root'], 'Root')]:
+        ax.text(x_pos, header_y, header, ha='center', va='bottom', fontsize=fs_header,
+               fontweight='bold', color='#455A64')
+    
+    # Legend at bottom - horizontal layout
+    legend_y = tree.height + legend_gap
+    legend_x_start = 0.08
+    legend_names = {**MEGATREND_SHORT, 'Urban Mobility & Transportation': 'Mobility & Transport.'}
+    
+    for i, (mt_name, count) in enumerate(tree.megatrends[['Megatrend', 'Articles']].itertuples(index=False)):
+        short_name = legend_names.get(mt_name, mt_name)
+        pct = count / total_articles * 100
+        
+        x_pos = legend_x_start + (i % 3) * 0.30
+        y_pos = legend_y + (i // 3) * 1.6
+        
+        # Color patch
+        ax.add_patch(plt.Rectangle((x_pos, y_pos - 0.4), 0.015, 0.8,
+                                   facecolor=MEGATREND_COLORS[mt_name], edgecolor='none'))
+        # Label
+        ax.text(x_pos + 0.02, y_pos, f'{short_name} ({pct:.1f}%)',
+               va='center', ha='left', fontsize=9, color='#333333')
+    
+    # Set limits (rows grow downwards)
+    ax.set_xlim(0, 1)
+    ax.set_ylim(legend_y + legend_gap, -3.5)
+    ax.axis('off')
+    
+    # Title
+    ax.text(0.5, 1.015, title,
+           ha='center', va='bottom', fontsize=16, fontweight='bold',
+           transform=ax.transAxes)
+    ax.text(0.5, -2.6, 'Subject Clusters → Research Trends → Megatrends → Root',
+           ha='center', va='bottom', fontsize=12, color='#666666')
+    
+    plt.subplots_adjust(left=0.02, right=0.98, top=0.98, bottom=0.02)
+    
+    # Save
+    paths = save_figure(fig, stem, formats=('pdf', 'png'),
+                        dpi=300, edgecolor='none', facecolor='white')
+    
+    print(f"\nSaved: {', '.join(p.name for p in paths)}")
+    plt.close()
@@ -0,0 +1,82 @@
+"""
+Batched donut charts
+
+Drawing a donut per map location with one Wedge patch per category makes
+figure time grow with locations x categories. These helpers compute the
+wedge angles of all donuts from a (n_donuts, n_categories) count matrix
+with NumPy and build every wedge as a polygon of one PolyCollection; the
+white centres are a second collection. Wedges run clockwise from the top
+with the largest category first, as in the overview map.
+
+Usage:
+    from common.donut import draw_donuts
+    draw_donuts(ax, centers, counts, colors, radius=7)
+"""
+
+import numpy as np
+from matplotlib.collections import PolyCollection
+from matplotlib.colors import to_rgba_array
+
+
+def wedge_angles(counts, totals=None, start=90, sort=True):
+    """theta1, theta2 (degrees) of every category of every donut, clockwise from start
+
+    Shares are relative to totals (default: the row sums). Categories are
+    ordered by count within each donut when sort is set; returns
+    (theta1, theta2, order), each of shape (n_donuts, n_categories).
+    """
+    counts = np.asarray(counts, dtype=float)
+    order = (np.argsort(-counts, axis=1, kind='stable') if sort
+             else np.broadcast_to(np.arange(counts.shape[1]), counts.shape))
+    ordered = np.take_along_axis(counts, order, axis=1)
+    totals = (ordered.sum(axis=1, keepdims=True) if totals is None
+              else np.asarray(totals, dtype=float).reshape(-1, 1))
+    sweep = np.divide(ordered, totals, out=np.zeros_like(ordered), where=totals > 0) * 360
+    theta2 = start - (np.cumsum(sweep, axis=1) - sweep)
+    return theta2 - sweep, theta2, order
+
+
+def annulus_vertices(centers, theta1, theta2, radius, inner, n_arc=48):
+    """Polygon (outer arc, then inner arc reversed) of every wedge, shape (n, 2 * n_arc, 2)"""
+    centers = np.asarray(centers, dtype=float).reshape(-1, 1, 2)
+    t = np.linspace(0, 1, n_arc)
+    angles = np.radians(theta1[:, None] + (theta2 - theta1)[:, None] * t)
+    unit = np.stack([np.cos(angles), np.sin(angles)], axis=-1)
+    radius = np.asarray(radius, dtype=float).reshape(-1, 1, 1)
+    return np.concatenate([centers + radius * unit,
+                           centers + radius * inner * unit[:, ::-1]], axis=1)
+
+
+def disc_vertices(centers, radius, n_arc=48):
+    """Polygon of a circle around every centre, shape (n, n_arc, 2)"""
+    angles = np.linspace(0, 2 * np.pi, n_arc, endpoint=False)
+    unit = np.stack([np.cos(angles), np.sin(angles)], axis=-1)
+    radius = np.asarray(radius, dtype=float).reshape(-1, 1, 1)
+    return np.asarray(centers, dtype=float).reshape(-1, 1, 2) + radius * unit
+
+
+def draw_donuts(ax, centers, counts, colors, radius, totals=None, inner=0.55,
+                hole_color='white', edgecolor='white', linewidth=0.3, start=90, zorder=1):
+    """All donuts as one wedge PolyCollection plus one collection of centre discs
+
+    counts is (n_donuts, n_categories), colors one colour per category and
+    radius a scalar or one radius per donut; totals as in wedge_angles.
+    Empty categories are skipped. Returns (wedges, holes).
+    """
+    counts = np.asarray(counts, dtype=float).reshape(len(centers), -1)
+    centers = np.asarray(centers, dtype=float).reshape(-1, 2)
+    radius = np.broadcast_to(np.asarray(radius, dtype=float), (len(centers),))
+    theta1, theta2, order = wedge_angles(counts, totals, start=start)
+
+    keep = np.take_along_axis(counts, order, axis=1) > 0
+    donut = np.nonzero(keep)[0]
+    facecolors = to_rgba_array(colors)[order[keep]]
+    verts = annulus_vertices(centers[donut], theta1[keep], theta2[keep], radius[donut], inner)
+
+    wedges = PolyCollection(verts, facecolors=facecolors, edgecolors=edgecolor,
+                            linewidths=linewidth, zorder=zorder)
+    holes = PolyCollection(disc_vertices(centers, radius * inner * 0.95),
+                           facecolors=hole_color, edgecolors='none', zorder=zorder)
+    ax.add_collection(wedges, autolim=False)
+    ax.add_collection(holes, autolim=False)
+    return wedges, holes
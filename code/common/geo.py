@@ -0,0 +1,220 @@
+"""
+Offline country geometry for the world map panel
+
+The overview map used to read Natural Earth through geopandas, which no
+longer ships the dataset and fell back to downloading it on every run.
+The 1:110m Natural Earth admin-0 countries (public domain) are now stored
+in the repository as one compact NumPy archive,
+data/processed/overview/world_countries_110m.npz:
+
+    iso3, name              one entry per country
+    coords                  float32 (lon, lat) vertices of all rings
+    ring_offsets            start of every ring in coords (+ end)
+    country_offsets         first ring of every country in ring_offsets (+ end)
+    anchors                 float32 (lon, lat) label point of every country
+
+Geometry is simplified once when the archive is built and kept in plate
+carree (lon/lat degrees), the projection the map panel draws in, so loading
+needs neither geopandas nor network access and no per-run reprojection.
+Exteriors are counter-clockwise and holes clockwise, so each country is a
+single compound matplotlib Path and the whole map one PathCollection.
+
+Usage:
+    from common.geo import draw_countries, load_world
+    world = load_world()
+    draw_countries(ax, world, facecolors)      # one colour per world.iso3
+
+Rebuild the archive from a Natural Earth admin-0 file (run from code/):
+    python -m common.geo ne_110m_admin_0_countries.zip
+"""
+
+import argparse
+import os
+from dataclasses import dataclass
+from pathlib import Path
+
+import numpy as np
+from matplotlib.collections import PathCollection
+from matplotlib.path import Path as MplPath
+
+from common.data_access import PROCESSED_DIR
+
+WORLD_PATH = PROCESSED_DIR / 'overview' / 'world_countries_110m.npz'
+
+# Simplification tolerance in degrees used when building the archive
+SIMPLIFY_TOLERANCE = 0.05
+
+# Natural Earth marks some countries with ISO_A3 = -99; the low-resolution
+# file has no ADM0_A3 column to fall back on, so these are set by name
+# (ADM0_A3 codes for the entities without an ISO code)
+ISO3_OVERRIDES = {
+    'France': 'FRA', 'Norway': 'NOR', 'Kosovo': 'XKX',
+    'N. Cyprus': 'CYN', 'Somaliland': 'SOL',
+}
+
+# Label anchors (lon, lat) of countries and territories too small for the
+# 1:110m geometry
+EXTRA_ANCHORS = {
+    'HKG': (114.17, 22.32), 'MAC': (113.55, 22.17), 'SGP': (103.82, 1.35),
+    'BHR': (50.56, 26.07), 'MUS': (57.55, -20.25), 'MLT': (14.45, 35.90),
+    'MDV': (73.50, 3.20), 'FRO': (-6.90, 62.00), 'AND': (1.60, 42.55),
+    'MCO': (7.42, 43.74), 'LIE': (9.55, 47.15), 'BRB': (-59.55, 13.17),
+    'SYC': (55.45, -4.65), 'CPV': (-23.60, 15.10),
+}
+
+
+@dataclass
+class CountryGeometry:
+    """Flat ring arrays of all countries, see the module docstring"""
+    iso3: np.ndarray
+    name: np.ndarray
+    coords: np.ndarray
+    ring_offsets: np.ndarray
+    country_offsets: np.ndarray
+    anchors: np.ndarray
+
+    def __len__(self):
+        return len(self.iso3)
+
+    def index(self):
+        """ISO3 code -> position"""
+        return {code: i for i, code in enumerate(self.iso3)}
+
+    def anchor_points(self, codes):
+        """Label anchor (lon, lat) per ISO3 code, NaN for countries not on the map"""
+        index = self.index()
+        points = [self.anchors[index[c]] if c in index else EXTRA_ANCHORS.get(c, (np.nan, np.nan))
+                  for c in codes]
+        return np.array(points, dtype=float).reshape(-1, 2)
+
+    def paths(self):
+        """One compound Path per country (rings closed with CLOSEPOLY)"""
+        codes = np.full(len(self.coords), MplPath.LINETO, dtype=MplPath.code_type)
+        codes[self.ring_offsets[:-1]] = MplPath.MOVETO
+        codes[self.ring_offsets[1:] - 1] = MplPath.CLOSEPOLY
+        bounds = self.ring_offsets[self.country_offsets]
+        return [MplPath(self.coords[a:b], codes[a:b]) for a, b in zip(bounds[:-1], bounds[1:])]
+
+
+def load_world(path=WORLD_PATH):
+    """Country geometry from the bundled archive"""
+    with np.load(path) as archive:
+        return CountryGeometry(**{key: archive[key] for key in CountryGeometry.__dataclass_fields__})
+
+
+@dataclass
+class LandMask:
+    """Raster of the land area in lon/lat cells, row 0 at -90 degrees"""
+    mask: np.ndarray
+    resolution: float
+
+    def contains(self, points):
+        """Whether each (lon, lat) point lies on land"""
+        points = np.asarray(points, dtype=float).reshape(-1, 2)
+        n_lat, n_lon = self.mask.shape
+        ix = np.clip(((points[:, 0] + 180) / self.resolution).astype(int), 0, n_lon - 1)
+        iy = np.clip(((points[:, 1] + 90) / self.resolution).astype(int), 0, n_lat - 1)
+        return self.mask[iy, ix]
+
+
+def land_mask(world, resolution=1.0):
+    """Land raster from the country paths, each tested only on the cells of its extent"""
+    lon = np.arange(-180, 180, resolution) + resolution / 2
+    lat = np.arange(-90, 90, resolution) + resolution / 2
+    mask = np.zeros((len(lat), len(lon)), dtype=bool)
+    for path in world.paths():
+        ext = path.get_extents()
+        cols = np.nonzero((lon >= ext.x0) & (lon <= ext.x1))[0]
+        rows = np.nonzero((lat >= ext.y0) & (lat <= ext.y1))[0]
+        if len(cols) and len(rows):
+            grid = np.stack(np.meshgrid(lon[cols], lat[rows]), axis=-1).reshape(-1, 2)
+            inside = path.contains_points(grid).reshape(len(rows), len(cols))
+            mask[np.ix_(rows, cols)] |= inside
+    return LandMask(mask, resolution)
+
+
+def draw_countries(ax, world, facecolors, edgecolors='#cccccc', linewidths=0.2, order=None,
+                   zorder=1):
+    """Every country as one PathCollection; colours are per country or single values
+
+    order (indices into world) selects and orders the countries drawn, e.g.
+    to put highlighted countries above the rest.
+    """
+    paths = world.paths()
+    order = np.arange(len(world)) if order is None else np.asarray(order)
+
+    def pick(values):
+        values = np.asarray(values, dtype=object if isinstance(values, str) else None)
+        return values[order] if values.ndim and len(values) == len(world) else values
+
+    countries = PathCollection([paths[i] for i in order], facecolors=pick(facecolors),
+                               edgecolors=pick(edgecolors), linewidths=pick(linewidths),
+                               zorder=zorder)
+    ax.add_collection(countries, autolim=False)
+    return countries
+
+
+def build_world(source, out=WORLD_PATH, tolerance=SIMPLIFY_TOLERANCE):
+    """Simplify a Natural Earth admin-0 file and write the geometry archive"""
+    import geopandas as gpd
+    import shapely
+
+    world = gpd.read_file(source).to_crs(4326)
+    columns = {c.lower(): c for c in world.columns}
+    name = world[columns['name']].astype(str)
+
+    # ISO3: name-based overrides first, then the first usable code column
+    iso3 = name.map(ISO3_OVERRIDES)
+    for col in ('iso_a3_eh', 'iso_a3', 'adm0_a3'):
+        if col in columns:
+            codes = world[columns[col]].astype(str)
+            iso3 = iso3.fillna(codes.where(codes.str.fullmatch('[A-Z]{3}')))
+    keep = iso3.notna().to_numpy()
+    if not keep.all():
+        print(f"Skipping countries without ISO3 code: {', '.join(name[~keep])}")
+
+    geometry = shapely.orient_polygons(
+        shapely.simplify(world.geometry.to_numpy()[keep], tolerance, preserve_topology=True))
+    parts = [shapely.get_parts(g) for g in geometry]
+
+    rings, ring_counts, anchors = [], [], []
+    for polygons in parts:
+        country_rings = [ring for p in polygons
+                         for ring in (p.exterior, *p.interiors)]
+        rings.extend(np.asarray(r.coords, dtype=np.float32) for r in country_rings)
+        ring_counts.append(len(country_rings))
+        # Label point on the largest part, so islands and exclaves do not pull it away
+        largest = polygons[np.argmax(shapely.area(polygons))]
+        anchor = largest.centroid if largest.contains(largest.centroid) else largest.point_on_surface()
+        anchors.append(anchor.coords[0])
+
+    archive = {
+        'iso3': np.asarray(iso3[keep], dtype='<U3'),
+        'name': np.asarray(name[keep], dtype=str),
+        'coords': np.concatenate(rings),
+        'ring_offsets': np.concatenate([[0], np.cumsum([len(r) for r in rings])]).astype(np.int32),
+        'country_offsets': np.concatenate([[0], np.cumsum(ring_counts)]).astype(np.int32),
+        'anchors': np.asarray(anchors, dtype=np.float32),
+    }
+    out = Path(out)
+    tmp = out.with_name(f'{out.stem}.{os.getpid()}.tmp.npz')
+    np.savez_compressed(tmp, **archive)
+    os.replace(tmp, out)
+    return CountryGeometry(**archive)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('source', help='Natural Earth admin-0 countries file (.shp, .zip, .geojson)')
+    parser.add_argument('--tolerance', type=float, default=SIMPLIFY_TOLERANCE,
+                        help=f'simplification tolerance in degrees (default {SIMPLIFY_TOLERANCE})')
+    parser.add_argument('--out', type=Path, default=WORLD_PATH)
+    args = parser.parse_args(argv)
+
+    world = build_world(args.source, args.out, args.tolerance)
+    print(f"Wrote {len(world)} countries, {len(world.coords):,} vertices "
+          f"({args.out.stat().st_size / 1024:.0f} KB) to {args.out}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,107 @@
+"""
+Batched rendering helpers for the count heatmaps
+
+The heatmap scripts draw every cell as its own Rectangle and compute each
+cell's colour in Python. These helpers draw the cells and colour bars with a
+constant number of artists:
+- colours for the whole matrix are computed with NumPy,
+- all cells are one PolyCollection (vertices built as an array),
+- colour bar gradients are one pcolormesh.
+Cell labels are not batched: their text, colours and font weights are
+computed as arrays, but each label is still one Text artist, so the PDFs
+keep editable labels (a single path collection would outline the text).
+
+Geometry follows the scripts' convention: cell (i, j) spans
+[x0 + j*width, x0 + (j+1)*width] x [y0 + i*height, y0 + (i+1)*height],
+with the y axis usually inverted.
+"""
+
+import numpy as np
+from matplotlib.collections import PolyCollection
+from matplotlib.colors import to_rgba, to_rgba_array
+
+
+def log_scale(values, vmax=None):
+    """log10(v + 1) / log10(vmax + 1), the colour scale of the count heatmaps"""
+    values = np.asarray(values, dtype=float)
+    vmax = np.nanmax(values) if vmax is None else vmax
+    if not vmax > 0:
+        return np.zeros_like(values)
+    return np.log10(values + 1) / np.log10(vmax + 1)
+
+
+def cell_colors(norm, cmap, zero_mask=None, zero_color='#F5F5F5'):
+    """RGBA array (n_rows, n_cols, 4) from normalised values, zero cells in zero_color"""
+    colors = cmap(np.nan_to_num(np.asarray(norm, dtype=float)))
+    if zero_mask is not None:
+        colors[np.asarray(zero_mask)] = to_rgba(zero_color)
+    return colors
+
+
+def cell_vertices(n_rows, n_cols, x0=0, y0=0, width=1, height=1):
+    """Corner coordinates of every cell, shape (n_rows * n_cols, 4, 2), row-major"""
+    jj, ii = np.meshgrid(np.arange(n_cols), np.arange(n_rows))
+    left = (x0 + jj * width).ravel()
+    top = (y0 + ii * height).ravel()
+    xs = np.stack([left, left + width, left + width, left], axis=1)
+    ys = np.stack([top, top, top + height, top + height], axis=1)
+    return np.stack([xs, ys], axis=2)
+
+
+def draw_cells(ax, facecolors, x0=0, y0=0, width=1, height=1,
+               edgecolor='white', linewidth=1.5, zorder=1):
+    """Draw a (n_rows, n_cols) grid of coloured cells as one collection"""
+    facecolors = np.asarray(facecolors)
+    n_rows, n_cols = facecolors.shape[:2]
+    flat = facecolors.reshape(n_rows * n_cols, -1) if facecolors.ndim == 3 else facecolors.ravel()
+    cells = PolyCollection(cell_vertices(n_rows, n_cols, x0, y0, width, height),
+                           facecolors=to_rgba_array(flat), edgecolors=edgecolor,
+                           linewidths=linewidth, zorder=zorder)
+    ax.add_collection(cells, autolim=False)
+    return cells
+
+
+def annotate_cells(ax, labels, x0=0, y0=0, width=1, height=1, colors='#333333',
+                   fontweights='normal', **text_kw):
+    """Centre a label in every cell; colors and fontweights may be per-cell arrays
+
+    Adds one Text artist per non-empty label. Remaining keyword arguments
+    are passed to every Text (fontsize, linespacing, ...).
+    """
+    labels = np.asarray(labels, dtype=object)
+    n_rows, n_cols = labels.shape
+    colors = np.broadcast_to(np.asarray(colors, dtype=object), labels.shape)
+    fontweights = np.broadcast_to(np.asarray(fontweights, dtype=object), labels.shape)
+    xs = x0 + (np.arange(n_cols) + 0.5) * width
+    ys = y0 + (np.arange(n_rows) + 0.5) * height
+    text_kw = {'ha': 'center', 'va': 'center', **text_kw}
+
+    texts = []
+    for i, j in zip(*np.nonzero(labels != '')):
+        texts.append(ax.text(xs[j], ys[i], labels[i, j], color=colors[i, j],
+                             fontweight=fontweights[i, j], **text_kw))
+    return texts
+
+
+def count_labels(values):
+    """Integer labels of a count matrix ('0' for empty cells)"""
+    return np.vectorize(lambda v: f'{int(v)}', otypes=[object])(np.asarray(values))
+
+
+def count_share_labels(values, shares, thousands=True):
+    """'count\\n(share%)' labels; shares get one decimal below 100 articles, '0' for empty cells"""
+    def label(v, p):
+        if v <= 0:
+            return '0'
+        count = f'{int(v):,}' if thousands else f'{int(v)}'
+        return f'{count}\n({p:.0f}%)' if v >= 100 else f'{count}\n({p:.1f}%)'
+    return np.vectorize(label, otypes=[object])(np.asarray(values), np.asarray(shares))
+
+
+def draw_gradient(ax, cmap, x, y, width, height, n_segments=100, zorder=1):
+    """Horizontal colour bar gradient over [x, x + width] as one pcolormesh"""
+    edges_x = np.linspace(x, x + width, n_segments + 1)
+    edges_y = np.array([y, y + height])
+    values = np.arange(n_segments)[None, :] / n_segments
+    return ax.pcolormesh(edges_x, edges_y, values, cmap=cmap, vmin=0, vmax=1,
+                         shading='flat', edgecolors='none', antialiased=False, zorder=zorder)
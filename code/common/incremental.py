@@ -0,0 +1,237 @@
+"""
+Incremental update of the coded datasets and aggregate tables from a new export
+
+When a new (or corrected) <year>_research.csv arrives, rows are matched to
+the previous snapshot of the corpus by EID:
+- added rows (new EID, relevant == 'Yes') count +1
+- changed rows (same EID, different content) count -1 for the old version
+  and +1 for the new one
+- removed rows (EID now coded relevant == 'No') count -1
+
+Only those signed rows are cross-tabulated and folded into the existing
+tables in data/processed/ as deltas. The merged counts are laid out by
+common.crosstab (row/column order, Total row/column, BOM), so an updated
+table is byte-identical to a full rebuild. The coded datasets are updated in
+place, then common.build reruns the tables and figures whose inputs changed.
+
+Tables that are not simple crosstabs of two coded columns (SDG/sustainability,
+funder and country tables, hierarchy) are not covered; common.build rebuilds
+the SDG tables from the updated datasets. Neither are the curated AI method
+and AI task tables, whose rows are consolidated method and task names rather
+than coded values: a delta of raw values would add rows outside their layout.
+
+Usage (from code/):
+    python -m common.incremental --init                      # snapshot current corpus
+    python -m common.incremental ../data/raw/2026_research.csv
+    python -m common.incremental ../data/raw/2026_research.csv --dry-run
+"""
+
+import argparse
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from common.build import build
+from common.crosstab import TABLES, assemble_table, count_blocks, encode, layout, table_bytes
+from common.data_access import CACHE_DIR, DATASETS, PROCESSED_DIR, read_raw_csv, subset_mask
+from common.schema import CODED_FIELDS
+
+SNAPSHOT_PATH = CACHE_DIR / 'incremental' / 'snapshot.pkl'
+
+# Columns whose change marks a row as changed
+HASH_COLUMNS = ['Title', 'Year', 'DOI', 'Abstract'] + CODED_FIELDS
+
+# Coded columns whose tables are curated (consolidated names), never updated
+# from raw values
+CURATED_DIMENSIONS = {'ai_method', 'ai_task'}
+
+# Two-dimension crosstab tables from common.crosstab are maintained by
+# deltas. Tables cut to their top rows are not: the counts of the categories
+# left out are not in the file, so a delta cannot promote them.
+TABLE_SPECS = {rel: spec for rel, spec in TABLES.items()
+               if isinstance(spec['cols'], str) and not layout(spec)['top']
+               and not CURATED_DIMENSIONS & {spec['rows'], spec['cols']}}
+
+
+def row_hashes(df):
+    """Stable 64-bit hash of each row's content columns"""
+    cols = [c for c in HASH_COLUMNS if c in df.columns]
+    return pd.util.hash_pandas_object(df[cols].astype(str), index=False).values
+
+
+def make_snapshot(df):
+    """EID-indexed copy of the coded columns plus a content hash per row"""
+    cols = ['EID'] + [c for c in CODED_FIELDS if c in df.columns]
+    snapshot = df[cols].astype(object).copy()
+    snapshot['row_hash'] = row_hashes(df)
+    return snapshot.set_index('EID')
+
+
+def save_snapshot(snapshot):
+    SNAPSHOT_PATH.parent.mkdir(parents=True, exist_ok=True)
+    snapshot.to_pickle(SNAPSHOT_PATH)
+
+
+def load_snapshot():
+    """Previous snapshot, or one built from the current full dataset"""
+    if SNAPSHOT_PATH.exists():
+        return pd.read_pickle(SNAPSHOT_PATH)
+    print("No snapshot found; building one from the current dataset...")
+    snapshot = make_snapshot(read_raw_csv(DATASETS['full']))
+    save_snapshot(snapshot)
+    return snapshot
+
+
+def diff_export(snapshot, export):
+    """Split an export into added, changed and removed rows relative to the snapshot"""
+    export = export.drop_duplicates('EID', keep='last').copy()
+    export['row_hash'] = row_hashes(export)
+    relevant = export['relevant'].astype(str).str.strip().eq('Yes')
+    known = export['EID'].isin(snapshot.index)
+
+    added = export[relevant & ~known]
+    candidates = export[relevant & known]
+    old_hash = snapshot.loc[candidates['EID'], 'row_hash'].values
+    changed = candidates[candidates['row_hash'].values != old_hash]
+    removed = export[~relevant & known]
+    return added, changed, removed
+
+
+def signed_rows(snapshot, added, changed, removed):
+    """Rows with +1 / -1 weights whose crosstab is the change in every table"""
+    old_eids = pd.Index(changed['EID']).append(pd.Index(removed['EID']))
+    old = snapshot.loc[old_eids].reset_index()
+    new = pd.concat([added, changed], ignore_index=True)
+    rows = pd.concat([new.astype(object), old], ignore_index=True)
+    weights = [1] * len(new) + [-1] * len(old)
+    rows['weight'] = weights
+    return rows
+
+
+def crosstab_delta(rows, spec):
+    """Signed rows x cols counts for one table spec, encoded as common.crosstab does"""
+    rows = rows[subset_mask(rows, spec['subset'])]
+    block = (spec['rows'], spec['cols'])
+    encoded = encode(rows, block)
+    counts = count_blocks(encoded, [block], weights=rows['weight'].to_numpy(np.int64))
+    delta = pd.DataFrame(counts[block], index=encoded[block[0]][1], columns=encoded[block[1]][1])
+    return delta.loc[(delta != 0).any(axis=1), (delta != 0).any(axis=0)]
+
+
+def apply_delta(path, spec, delta):
+    """Fold a count delta into a table CSV in its common.crosstab layout; return True if it changed
+
+    Categories that reach 0 are dropped and new ones take their sorted place,
+    as in a full rebuild.
+    """
+    table = pd.read_csv(path, index_col=0, encoding='utf-8-sig', keep_default_na=False)
+    table.index = table.index.astype(str)
+    body = table.drop(index='Total', columns='Total', errors='ignore')
+
+    rows = sorted(set(body.index) | set(delta.index))
+    cols = sorted(set(body.columns) | set(delta.columns))
+    merged = (body.reindex(index=rows, columns=cols, fill_value=0)
+              + delta.reindex(index=rows, columns=cols, fill_value=0))
+    merged = merged.loc[:, (merged != 0).any(axis=0)]
+
+    block = (spec['rows'], spec['cols'])
+    encoded = {block[0]: (None, merged.index), block[1]: (None, merged.columns)}
+    data = table_bytes(assemble_table(spec, encoded, {block: merged.to_numpy(np.int64)}), spec)
+    if path.read_bytes() == data:
+        return False
+    path.write_bytes(data)
+    return True
+
+
+def update_tables(rows, dry_run=False):
+    """Fold the signed rows into every maintained table; return the tables changed"""
+    changed = set()
+    for rel, spec in TABLE_SPECS.items():
+        path = PROCESSED_DIR / rel
+        if not path.exists():
+            continue
+        delta = crosstab_delta(rows, spec)
+        if dry_run:
+            if not delta.empty:
+                print(f"  {rel}: {int(delta.abs().values.sum())} cell updates")
+            continue
+        if apply_delta(path, spec, delta):
+            changed.add(rel)
+            print(f"  Updated {rel}")
+    return changed
+
+
+def update_datasets(added, changed, removed):
+    """Apply row changes to the coded dataset CSVs; return the names rewritten"""
+    drop = set(changed['EID']) | set(removed['EID'])
+    new = pd.concat([added, changed], ignore_index=True).drop(columns='row_hash')
+    updated = []
+    for name in ['full', 'empirical', 'non_empirical']:
+        path = DATASETS[name]
+        if not path.exists():
+            continue
+        df = read_raw_csv(path)
+        incoming = new[subset_mask(new, name)].reindex(columns=df.columns)
+        kept = df[~df['EID'].isin(drop)]
+        if len(kept) == len(df) and incoming.empty:
+            continue
+        pd.concat([kept, incoming], ignore_index=True).to_csv(path, index=False, encoding='utf-8-sig')
+        updated.append(name)
+    return updated
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('export', nargs='?', help='New or corrected <year>_research.csv')
+    parser.add_argument('--init', action='store_true',
+                        help='Snapshot the current full dataset and exit')
+    parser.add_argument('--dry-run', action='store_true',
+                        help='Report the changes without writing anything')
+    parser.add_argument('--no-figures', action='store_true',
+                        help='Update tables and datasets but do not run common.build')
+    args = parser.parse_args()
+
+    if args.init:
+        snapshot = make_snapshot(read_raw_csv(DATASETS['full']))
+        save_snapshot(snapshot)
+        print(f"Snapshot of {len(snapshot):,} articles written to {SNAPSHOT_PATH}")
+        return
+    if not args.export:
+        parser.error('an export file is required unless --init is given')
+
+    snapshot = load_snapshot()
+    export = read_raw_csv(args.export)
+    missing = [c for c in ['EID', 'relevant'] + CODED_FIELDS if c not in export.columns]
+    if missing:
+        sys.exit(f"Export is not coded yet (missing: {', '.join(missing)})")
+
+    added, changed, removed = diff_export(snapshot, export)
+    print(f"{Path(args.export).name}: {len(added):,} added, {len(changed):,} changed, "
+          f"{len(removed):,} removed")
+    if added.empty and changed.empty and removed.empty:
+        print("Nothing to do.")
+        return
+
+    rows = signed_rows(snapshot, added, changed, removed)
+    update_tables(rows, dry_run=args.dry_run)
+    if args.dry_run:
+        return
+
+    for name in update_datasets(added, changed, removed):
+        print(f"  Updated the {name} dataset")
+    snapshot = snapshot.drop(index=set(changed['EID']) | set(removed['EID']))
+    save_snapshot(pd.concat([snapshot, make_snapshot(pd.concat([added, changed]))]))
+
+    if not args.no_figures:
+        # The build hashes every declared input, so only nodes reading a
+        # changed dataset or table run
+        status = build()
+        if 'failed' in status.values():
+            sys.exit("Some tables or figures failed to build (python -m common.build -v)")
+    print("Done!")
+
+
+if __name__ == "__main__":
+    main()
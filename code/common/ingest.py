@@ -0,0 +1,188 @@
+"""
+Parallel ingestion of the yearly Scopus exports
+
+Parses every data/raw/<year>_research.csv concurrently in a process pool,
+validates each file against the Scopus schema (METHODOLOGY §5.1) plus the
+coded variables, and writes one combined dataset:
+- data/raw/combined_research_ingested.csv, next to the combined_research.csv
+  assembled by hand; that tracked file is only replaced when it is named
+  with --output
+- its typed Parquet cache in data/cache/, so figures load it without re-parsing
+
+Records exported in more than one year are merged (common.dedup) unless
+--keep-duplicates is given; the merge report is written next to the output
+as <output>_duplicates.csv.
+
+Usage (from code/):
+    python -m common.ingest
+    python -m common.ingest --workers 4 --strict
+    python -m common.ingest --keep-duplicates
+    python -m common.ingest --output ../data/raw/combined_research.csv   # replace it
+"""
+
+import argparse
+import os
+import re
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import pandas as pd
+
+from common.data_access import (RAW_DIR, REPO_ROOT, apply_dtypes, cache_path,
+                                content_hash, read_raw_csv, write_cache)
+from common.dedup import THRESHOLD, deduplicate, summarize
+from common.schema import CODED_FIELDS, SCOPUS_FIELDS
+
+EXPORT_PATTERN = re.compile(r'^(\d{4})_research\.csv$')
+COMBINED_PATH = RAW_DIR / 'combined_research.csv'
+# Default output, so a run never overwrites the tracked combined CSV by accident
+INGESTED_PATH = RAW_DIR / 'combined_research_ingested.csv'
+
+
+def find_exports(raw_dir=RAW_DIR):
+    """Yearly export files in raw_dir, oldest first"""
+    return sorted(p for p in Path(raw_dir).iterdir() if EXPORT_PATTERN.match(p.name))
+
+
+def validate_export(df, year=None):
+    """Check an export against the expected schema; return a list of problems"""
+    problems = []
+
+    missing = [col for col in SCOPUS_FIELDS + CODED_FIELDS if col not in df.columns]
+    if missing:
+        problems.append(f"missing columns: {', '.join(missing)}")
+
+    if 'EID' in df.columns:
+        if df['EID'].isna().any():
+            problems.append(f"{int(df['EID'].isna().sum())} rows without EID")
+        dup = df['EID'].dropna().duplicated().sum()
+        if dup:
+            problems.append(f"{int(dup)} duplicate EIDs")
+
+    if 'Year' in df.columns:
+        years = pd.to_numeric(df['Year'], errors='coerce')
+        if years.isna().any():
+            problems.append(f"{int(years.isna().sum())} rows with non-numeric Year")
+        if year is not None:
+            off = int((years.dropna() != year).sum())
+            if off:
+                problems.append(f"{off} rows with Year != {year}")
+
+    return problems
+
+
+def parse_export(path):
+    """Parse and validate one yearly export (runs in a worker process)"""
+    path = Path(path)
+    start = time.perf_counter()
+    df = read_raw_csv(path)
+    year = int(EXPORT_PATTERN.match(path.name).group(1))
+    stats = {
+        'file': path.name,
+        'rows': len(df),
+        'columns': df.shape[1],
+        'seconds': time.perf_counter() - start,
+        'problems': validate_export(df, year),
+    }
+    return df, stats
+
+
+def combine_exports(frames):
+    """Concatenate yearly frames in schema column order and apply dtypes"""
+    combined = pd.concat(frames, ignore_index=True)
+    ordered = [col for col in SCOPUS_FIELDS + CODED_FIELDS if col in combined.columns]
+    extra = [col for col in combined.columns if col not in ordered]
+    return apply_dtypes(combined[ordered + extra])
+
+
+def parse_exports(paths, workers=None):
+    """Parse and validate exports in a process pool; return (frames, stats)"""
+    workers = workers or min(len(paths), os.cpu_count() or 1)
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        results = list(pool.map(parse_export, paths))
+    return [df for df, _ in results], [s for _, s in results]
+
+
+def report_path(output):
+    """Merge report written next to a combined CSV"""
+    output = Path(output)
+    return output.with_name(f'{output.stem}_duplicates.csv')
+
+
+def write_combined(frames, output=INGESTED_PATH, dedup=True, threshold=THRESHOLD):
+    """Write the combined CSV and prime its typed cache; returns (combined, merge report)
+
+    The report is None when dedup is False.
+    """
+    combined = combine_exports(frames)
+    output = Path(output)
+    report = None
+    if dedup:
+        combined, report = deduplicate(combined, threshold)
+        report.to_csv(report_path(output), index=False, encoding='utf-8-sig')
+    combined.to_csv(output, index=False, encoding='utf-8-sig')
+
+    # Prime the typed cache directly instead of re-parsing the CSV we just wrote
+    write_cache(combined, cache_path(output, content_hash(output)))
+    return combined, report
+
+
+def print_report(stats, combined, output, elapsed, report=None):
+    """Per-file row counts, parse times and validation problems"""
+    print(f"\n{'File':<24}{'Rows':>8}{'Cols':>6}{'Parse (s)':>11}  Status")
+    for s in stats:
+        status = 'ok' if not s['problems'] else '; '.join(s['problems'])
+        print(f"{s['file']:<24}{s['rows']:>8,}{s['columns']:>6}{s['seconds']:>11.2f}  {status}")
+    print(f"{'Combined':<24}{len(combined):>8,}{combined.shape[1]:>6}")
+    if report is not None:
+        print(f"\nDuplicates: {summarize(report)}")
+        print(f"Merge report: {report_path(output)}")
+    print(f"\nWrote {output} in {elapsed:.2f}s")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--raw-dir', default=str(RAW_DIR),
+                        help='Directory holding the <year>_research.csv exports')
+    parser.add_argument('--output', default=str(INGESTED_PATH),
+                        help='Combined CSV to write (default: '
+                             'data/raw/combined_research_ingested.csv)')
+    parser.add_argument('--workers', type=int, default=None,
+                        help='Worker processes (default: one per file, up to CPU count)')
+    parser.add_argument('--strict', action='store_true',
+                        help='Abort without writing if any export fails validation')
+    parser.add_argument('--keep-duplicates', action='store_true',
+                        help='Write every exported record without merging duplicates')
+    parser.add_argument('--threshold', type=float, default=THRESHOLD,
+                        help=f'Estimated Jaccard similarity of near duplicates '
+                             f'(default: {THRESHOLD})')
+    args = parser.parse_args()
+
+    paths = find_exports(args.raw_dir)
+    if not paths:
+        sys.exit(f"No <year>_research.csv exports found in {args.raw_dir}")
+
+    print(f"Ingesting {len(paths)} exports from {args.raw_dir}...")
+    start = time.perf_counter()
+
+    frames, stats = parse_exports(paths, args.workers)
+    if args.strict and any(s['problems'] for s in stats):
+        for s in stats:
+            if s['problems']:
+                print(f"  {s['file']}: {'; '.join(s['problems'])}")
+        sys.exit("Validation failed; nothing written")
+
+    combined, report = write_combined(frames, args.output, dedup=not args.keep_duplicates,
+                                      threshold=args.threshold)
+    output = Path(args.output).resolve()
+    try:
+        output = output.relative_to(REPO_ROOT)
+    except ValueError:
+        pass
+    print_report(stats, combined, output, time.perf_counter() - start, report)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,220 @@
+"""
+Correspondence analysis and detrended correspondence analysis (DCA)
+
+Articles are described by a sparse presence/absence matrix over their coded
+features (AI methods, AI tasks, SDGs, sustainability level) and the terms
+of their abstracts (from the cached common.terms matrix). The ordination
+works directly on that sparse matrix:
+
+- CA: truncated SVD (scipy.sparse.linalg.svds) of the standardised residuals
+  D_r^-1/2 (P - r c^T) D_c^-1/2. The residual matrix is dense, so it is never
+  formed; it is applied as a LinearOperator (sparse product minus a rank-one
+  correction).
+- DCA (Hill & Gauch 1980): the first axis is the CA axis. Higher axes are
+  found by reciprocal averaging, detrending the article scores against the
+  previous axes by segments after every iteration, which removes the arch
+  effect. Axes are rescaled so that the average within-article standard
+  deviation of feature scores is 1 (scores in SD units of turnover).
+
+Usage:
+    from common.ordination import feature_matrix, dca
+    from common.terms import TermMatrix
+    X, features = feature_matrix(df, TermMatrix.load('empirical'))
+    result = dca(X)
+    result.row_scores      # (n_articles, n_axes)
+"""
+
+import re
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+from scipy import sparse
+from scipy.sparse.linalg import LinearOperator, svds
+
+# Coded columns used as features; multi-valued entries are split on , and ;
+FEATURE_COLUMNS = ['ai_method', 'ai_task', 'sdg_alignment', 'level_of_sustainability']
+
+SDG_PATTERN = re.compile(r'SDG\s*(\d{1,2})')
+
+
+@dataclass
+class Ordination:
+    """Scores and eigenvalues of a CA or DCA"""
+    row_scores: np.ndarray
+    col_scores: np.ndarray
+    eigenvalues: np.ndarray
+
+
+def split_values(value):
+    """Individual entries of a multi-valued coded cell"""
+    return [v.strip() for v in re.split(r'[,;]', value) if v.strip()]
+
+
+def coded_tokens(column, values):
+    """Feature tokens of one coded column per article, e.g. 'ai_method=CNN'"""
+    tokens = []
+    for value in values:
+        if pd.isna(value):
+            tokens.append([])
+        elif column == 'sdg_alignment':
+            tokens.append([f'sdg={n}' for n in dict.fromkeys(SDG_PATTERN.findall(str(value)))])
+        else:
+            tokens.append([f'{column}={v}' for v in dict.fromkeys(split_values(str(value)))])
+    return tokens
+
+
+def incidence_matrix(token_lists, min_df=1, max_df=1.0):
+    """Sparse presence/absence matrix and feature names from per-row token lists
+
+    Features present in fewer than min_df rows or in more than a max_df
+    fraction of rows are dropped.
+    """
+    lengths = np.fromiter((len(t) for t in token_lists), dtype=np.int64, count=len(token_lists))
+    flat = [tok for tokens in token_lists for tok in tokens]
+    codes, names = pd.factorize(pd.Index(flat, dtype=object))
+    rows = np.repeat(np.arange(len(token_lists)), lengths)
+    matrix = sparse.csr_matrix((np.ones(len(codes), dtype=np.float64), (rows, codes)),
+                               shape=(len(token_lists), len(names)))
+    matrix.data[:] = 1.0
+
+    doc_freq = np.diff(matrix.tocsc().indptr)
+    keep = (doc_freq >= min_df) & (doc_freq <= max_df * len(token_lists))
+    return matrix[:, keep].tocsr(), np.asarray(names, dtype=object)[keep]
+
+
+def feature_matrix(df, terms=None, columns=FEATURE_COLUMNS, min_df=5, max_df=0.5):
+    """Article x feature incidence matrix from coded columns and abstract terms
+
+    terms is the TermMatrix of the dataset df was loaded from (rows are
+    matched by df's row positions). Coded features are kept whenever they
+    occur; terms must occur in at least min_df and at most a max_df fraction
+    of the articles, which drops hapaxes and generic words without a
+    stopword list.
+    """
+    rows = [[] for _ in range(len(df))]
+    for column in columns:
+        if column in df.columns:
+            for tokens, extra in zip(rows, coded_tokens(column, df[column])):
+                tokens.extend(extra)
+    coded, coded_names = incidence_matrix(rows)
+    if terms is None:
+        return coded, coded_names
+
+    present = (terms.counts[df.index.to_numpy()] > 0).astype(np.float64).tocsr()
+    doc_freq = np.diff(present.tocsc().indptr)
+    keep = (doc_freq >= min_df) & (doc_freq <= max_df * len(df))
+    return (sparse.hstack([coded, present[:, keep]], format='csr'),
+            np.concatenate([coded_names, terms.vocabulary[keep]]))
+
+
+def _drop_empty(X):
+    """Remove all-zero rows and columns; return the matrix and the kept masks"""
+    X = sparse.csr_matrix(X, dtype=np.float64)
+    row_keep = np.asarray(X.sum(axis=1)).ravel() > 0
+    col_keep = np.asarray(X.sum(axis=0)).ravel() > 0
+    return X[row_keep][:, col_keep], row_keep, col_keep
+
+
+def _expand(scores, keep):
+    """Put scores of kept rows back in place, NaN for dropped rows"""
+    full = np.full((len(keep), scores.shape[1]), np.nan)
+    full[keep] = scores
+    return full
+
+
+def correspondence_analysis(X, n_axes=2):
+    """Correspondence analysis of a sparse contingency matrix via truncated SVD"""
+    X, row_keep, col_keep = _drop_empty(X)
+    P = X / X.sum()
+    r = np.asarray(P.sum(axis=1)).ravel()
+    c = np.asarray(P.sum(axis=0)).ravel()
+    r_isqrt, c_isqrt = 1 / np.sqrt(r), 1 / np.sqrt(c)
+    Ps = sparse.diags(r_isqrt) @ P @ sparse.diags(c_isqrt)
+    sr, sc = np.sqrt(r), np.sqrt(c)
+
+    # Standardised residuals S = Ps - sqrt(r) sqrt(c)^T, applied implicitly
+    S = LinearOperator(
+        P.shape, dtype=np.float64,
+        matvec=lambda v: Ps @ v - sr * (sc @ v),
+        rmatvec=lambda v: Ps.T @ v - sc * (sr @ v),
+        matmat=lambda V: Ps @ V - np.outer(sr, sc @ V),
+        rmatmat=lambda V: Ps.T @ V - np.outer(sc, sr @ V))
+    U, s, Vt = svds(S, k=n_axes, random_state=0)
+    order = np.argsort(s)[::-1]
+    U, s, Vt = U[:, order], s[order], Vt[order]
+
+    # Principal row coordinates, standard column coordinates
+    row_scores = (r_isqrt[:, None] * U) * s
+    col_scores = c_isqrt[:, None] * Vt.T
+    return Ordination(_expand(row_scores, row_keep), _expand(col_scores, col_keep), s ** 2)
+
+
+def detrend_by_segments(scores, axis, weights, n_segments=26):
+    """Subtract the weighted segment means of scores along a previous axis"""
+    edges = np.linspace(axis.min(), axis.max(), n_segments + 1)
+    segment = np.clip(np.searchsorted(edges, axis, side='right') - 1, 0, n_segments - 1)
+    sums = np.bincount(segment, weights=weights * scores, minlength=n_segments)
+    totals = np.bincount(segment, weights=weights, minlength=n_segments)
+    means = np.divide(sums, totals, out=np.zeros(n_segments), where=totals > 0)
+
+    # Smooth segment means with a running average of three, as in DECORANA
+    padded = np.concatenate([[means[0]], means, [means[-1]]])
+    smoothed = (padded[:-2] + padded[1:-1] + padded[2:]) / 3
+    return scores - smoothed[segment]
+
+
+def _rescale(row_scores, col_scores, X, r_sums):
+    """Rescale an axis so the mean within-row SD of column scores is 1"""
+    mean = (X @ col_scores) / r_sums
+    var = (X @ col_scores ** 2) / r_sums - mean ** 2
+    sd = np.sqrt(np.average(np.clip(var, 0, None), weights=r_sums))
+    if sd <= 0:
+        return row_scores, col_scores
+    offset = col_scores.min()
+    return (row_scores - offset) / sd, (col_scores - offset) / sd
+
+
+def dca(X, n_axes=2, n_segments=26, max_iter=200, tol=1e-8):
+    """Detrended correspondence analysis of a sparse contingency matrix
+
+    Returns article (row) and feature (column) scores in SD units, with NaN
+    for articles without features.
+    """
+    X, row_keep, col_keep = _drop_empty(X)
+    r_sums = np.asarray(X.sum(axis=1)).ravel()
+    c_sums = np.asarray(X.sum(axis=0)).ravel()
+    Xt = X.T.tocsr()
+
+    ca = correspondence_analysis(X, n_axes=n_axes)
+    rows = np.empty((X.shape[0], n_axes))
+    cols = np.empty((X.shape[1], n_axes))
+    eigenvalues = np.empty(n_axes)
+
+    def normalize(x):
+        x = x - np.average(x, weights=r_sums)
+        norm = np.sqrt(np.average(x ** 2, weights=r_sums))
+        return x / norm, norm
+
+    for k in range(n_axes):
+        # Reciprocal averaging from the CA axis, which already is the
+        # solution for axis 1; higher axes are detrended every iteration
+        x, _ = normalize(ca.row_scores[:, k])
+        for _ in range(max_iter if k else 1):
+            y = (Xt @ x) / c_sums
+            x_new = (X @ y) / r_sums
+            for j in range(k):
+                x_new = detrend_by_segments(x_new, rows[:, j], r_sums, n_segments)
+            x_new, eigenvalues[k] = normalize(x_new)
+            converged = np.abs(x_new - x).max() < tol
+            x = x_new
+            if converged:
+                break
+
+        # Final scores: features at the weighted average of their articles,
+        # articles at the weighted average of their features
+        y = (Xt @ x) / c_sums
+        x = (X @ y) / r_sums
+        rows[:, k], cols[:, k] = _rescale(x, y, X, r_sums)
+
+    return Ordination(_expand(rows, row_keep), _expand(cols, col_keep), eigenvalues)
@@ -0,0 +1,295 @@
+"""
+One-load figure pipeline for article subsets
+
+The empirical and non-empirical analyses draw the same figure family (DCA
+plot, AI methods heatmap, SDG heatmap and taxonomy dendrogram) with
+different titles, output names and fonts. The drawing code lives in
+common.*_figure and SUBSET_SPECS holds what differs between subsets.
+
+The pipeline loads the columns the figures need from the full coded corpus
+once (plus its abstract term matrix for the DCA plot), selects every
+subset's rows in memory and then renders the (subset, figure) pairs in
+worker processes forked from the loading process, so all workers share the
+loaded data. The heatmaps and dendrogram of the named subsets are drawn from
+the curated tables in data/processed/. Any filter on coded columns can be a
+subset; its figures go to --out. A custom subset has no curated tables, so
+its SDG heatmap counts its rows with common.crosstab; the AI methods heatmap
+needs the curated method consolidation and is not drawn for it.
+
+Usage (from code/):
+    python -m common.pipeline                                  # both subsets
+    python -m common.pipeline non_empirical --figures dca sdg_heatmap
+    python -m common.pipeline --where article_type=Review/Survey --name reviews \\
+        --label Review --out ../figures/reviews
+"""
+
+import argparse
+import contextlib
+import io
+import multiprocessing
+import os
+import time
+import traceback
+import warnings
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+
+import matplotlib.pyplot as plt
+import pandas as pd
+
+from common import ai_methods_figure, dca_figure, dendrogram_figure, sdg_figure
+from common.crosstab import TABLES, build_tables, source_columns, table_blocks
+from common.data_access import PROCESSED_DIR, REPO_ROOT, SUBSETS, load_dataset
+from common.dendrogram import read_taxonomy
+from common.terms import STOPWORDS, TermMatrix
+
+CODE_DIR = REPO_ROOT / 'code'
+
+# Review and survey vocabulary is generic in non-empirical abstracts
+NON_EMPIRICAL_STOPWORDS = STOPWORDS | {'review', 'survey', 'literature', 'framework', 'technique',
+                                       'techniques'}
+
+# Per subset: row filter ({column: values}), label used in titles, output
+# directory, taxonomy for the dendrogram, the tables of its figures (curated
+# files under data/processed/ in 'tables', or crosstab layouts counted from
+# the subset's rows in 'counts') and the parameters of every figure (font is
+# applied as font.family)
+SUBSET_SPECS = {
+    'empirical': {
+        'where': {'article_type': SUBSETS['empirical']},
+        'label': 'Empirical',
+        'out_dir': CODE_DIR / 'empirical_analysis',
+        'taxonomy': 'empirical/hierarchy_taxonomy.csv',
+        'tables': {'ai_methods': 'empirical/ai_method_megatrend_table.csv',
+                   'sdg_heatmap': 'empirical/megatrend_sdg_sustainability_table.csv'},
+        'figures': {
+            'dca': {'stem': 'dca_plot_v2', 'font': 'Arial'},
+            'ai_methods': {'stem': 'ai_methods_heatmap', 'font': 'DejaVu Sans',
+                           'title': 'Distribution of AI Methods Across Megatrends',
+                           'formats': ('pdf', 'png', 'svg')},
+            'sdg_heatmap': {'stem': 'sdg_heatmap_combined', 'font': 'Liberation Sans',
+                            'title': 'Megatrend Alignment with Sustainable Development Goals'},
+            'dendrogram': {'stem': 'dendrogram_final', 'font': 'Liberation Sans',
+                           'root_label': 'AI in Urban Studies',
+                           'title': 'Hierarchical Taxonomy of AI in Urban Studies Research'},
+        },
+    },
+    'non_empirical': {
+        'where': {'article_type': SUBSETS['non_empirical']},
+        'label': 'Non-Empirical',
+        'out_dir': CODE_DIR / 'non_empirical_analysis',
+        'taxonomy': 'non_empirical/hierarchy_taxonomy.csv',
+        'tables': {'ai_methods': 'non_empirical/ai_method_megatrend_table.csv',
+                   'sdg_heatmap': 'non_empirical/megatrend_sdg_sustainability_table.csv'},
+        'figures': {
+            'dca': {'stem': 'dca_plot_non_empirical', 'font': 'Arial',
+                    'stopwords': NON_EMPIRICAL_STOPWORDS},
+            'ai_methods': {'stem': 'ai_methods_heatmap', 'font': 'Arial',
+                           'title': 'Non-Empirical Research: AI Methods Across Megatrends',
+                           'megatrend_order': ai_methods_figure.MEGATREND_ORDER_BY_COUNT,
+                           'font_sizes': {'cell': 14, 'header': 12, 'label': 14, 'total': 14,
+                                          'title': 18, 'colorbar': 11},
+                           'left_margin': 6.0},
+            'sdg_heatmap': {'stem': 'sdg_heatmap_non_empirical', 'font': 'Arial',
+                            'title': 'Non-Empirical Research: Megatrend Alignment with SDGs'},
+            'dendrogram': {'stem': 'dendrogram_non_empirical', 'font': 'Arial',
+                           'root_label': 'Non-Empirical AI\nin Urban Studies',
+                           'title': ('Hierarchical Taxonomy of Non-Empirical AI in Urban '
+                                     'Studies Research'),
+                           'sort': False, 'trend_gap': 0.36, 'megatrend_gap': 1.36,
+                           'font_sizes': (9, 10, 11), 'legend_gap': 3},
+        },
+    },
+}
+
+FIGURES = ['dca', 'ai_methods', 'sdg_heatmap', 'dendrogram']
+
+# Loaded corpus and per-subset data, set by prepare() before workers are forked
+_STATE = {}
+
+
+def custom_spec(name, where, label=None, out_dir=None):
+    """Spec of an ad-hoc subset: the DCA plot and SDG heatmap with the empirical layouts"""
+    label = label or name
+    return {
+        'where': where,
+        'label': label,
+        'out_dir': Path(out_dir or '.').resolve(),
+        'counts': {'sdg_heatmap': 'empirical/megatrend_sdg_sustainability_table.csv'},
+        'figures': {
+            'dca': {'stem': f'dca_plot_{name}', 'font': 'Arial'},
+            'sdg_heatmap': {'stem': f'sdg_heatmap_{name}', 'font': 'Liberation Sans',
+                            'title': f'{label} Research: Megatrend Alignment with SDGs'},
+        },
+    }
+
+
+def parse_where(items):
+    """{column: [values]} from 'column=value' arguments; repeated columns are alternatives"""
+    where = {}
+    for item in items:
+        column, sep, value = item.partition('=')
+        if not sep:
+            raise ValueError(f"expected column=value, got '{item}'")
+        where.setdefault(column.strip(), []).append(value.strip())
+    return where
+
+
+def where_mask(df, where):
+    """Rows whose every filtered column takes one of its listed values"""
+    mask = True
+    for column, values in where.items():
+        mask = mask & df[column].astype('string').isin([str(v) for v in values]).to_numpy()
+    return mask
+
+
+def read_table(rel):
+    """A curated table of data/processed/, indexed by its first column"""
+    return pd.read_csv(PROCESSED_DIR / rel, encoding='utf-8-sig', index_col=0)
+
+
+def count_specs(name, spec):
+    """crosstab specs of the tables counted from a subset's rows, keyed by figure"""
+    return {figure: {**TABLES[rel], 'subset': name}
+            for figure, rel in spec.get('counts', {}).items()}
+
+
+def prepare(specs, figures):
+    """Load the corpus once and build every subset's frame and tables"""
+    dims = {d for name, spec in specs.items()
+            for table in count_specs(name, spec).values() for block in table_blocks(table)
+            for d in block if d is not None}
+    columns = set(source_columns(dims)) | set(dca_figure.COLUMNS)
+    columns |= {c for spec in specs.values() for c in spec['where']}
+    # Rows keep their RangeIndex positions, which index the term matrix
+    full = load_dataset('full', columns=sorted(columns))
+    _STATE['terms'] = TermMatrix.load('full') if 'dca' in figures else None
+
+    for name, spec in specs.items():
+        frame = full[where_mask(full, spec['where'])]
+        tables = {figure: read_table(rel) for figure, rel in spec.get('tables', {}).items()}
+        tables.update(build_tables(count_specs(name, spec), frames={name: frame}))
+        _STATE[name] = {'spec': spec, 'frame': frame, 'tables': tables}
+
+
+def draw(name, figure):
+    """Draw one figure of a prepared subset"""
+    data = _STATE[name]
+    spec = data['spec']
+    params = dict(spec['figures'][figure])
+    font = params.pop('font')
+    stem = spec['out_dir'] / params.pop('stem')
+
+    if figure == 'dca':
+        module = dca_figure
+        args = (data['frame'][dca_figure.COLUMNS], _STATE['terms'], spec['label'], stem)
+    elif figure == 'ai_methods':
+        module = ai_methods_figure
+        args = (data['tables']['ai_methods'], params.pop('title'), stem)
+    elif figure == 'sdg_heatmap':
+        module = sdg_figure
+        args = (data['tables']['sdg_heatmap'], params.pop('title'), stem)
+    else:
+        module = dendrogram_figure
+        taxonomy = read_taxonomy(PROCESSED_DIR / spec['taxonomy'])
+        # Megatrend sizes are all articles of the megatrend, not only the listed clusters
+        totals = data['tables']['sdg_heatmap']['Total'].drop('Total', errors='ignore')
+        args = (taxonomy, totals, params.pop('root_label'), params.pop('title'), stem)
+
+    spec['out_dir'].mkdir(parents=True, exist_ok=True)
+    with plt.rc_context({**module.RC_PARAMS, 'font.family': font}):
+        try:
+            FIGURE_FUNCTIONS[figure](*args, **params)
+        finally:
+            plt.close('all')
+
+
+FIGURE_FUNCTIONS = {
+    'dca': dca_figure.create_dca_plot,
+    'ai_methods': ai_methods_figure.create_heatmap,
+    'sdg_heatmap': sdg_figure.create_combined_visualization,
+    'dendrogram': dendrogram_figure.create_dendrogram,
+}
+
+
+def render(task):
+    """Draw one (subset, figure) pair; returns (task, ok, seconds, captured output)"""
+    start = time.perf_counter()
+    log = io.StringIO()
+    try:
+        with contextlib.redirect_stdout(log), contextlib.redirect_stderr(log), \
+                warnings.catch_warnings():
+            warnings.simplefilter('ignore')
+            draw(*task)
+        ok = True
+    except Exception:
+        log.write(traceback.format_exc())
+        ok = False
+    return task, ok, time.perf_counter() - start, log.getvalue()
+
+
+def run(specs, figures=FIGURES, jobs=None, verbose=True):
+    """Render the figures of every subset; returns {(subset, figure): ok}"""
+    start = time.perf_counter()
+    prepare(specs, figures)
+    print(f"Loaded {sum(len(_STATE[n]['frame']) for n in specs):,} articles in "
+          f"{len(specs)} subset(s) ({time.perf_counter() - start:.2f}s)")
+
+    tasks = [(name, figure) for name, spec in specs.items() for figure in figures
+             if figure in spec['figures']]
+    jobs = min(jobs or os.cpu_count() or 1, len(tasks))
+    # Workers inherit the prepared data by forking; without fork, render in-process
+    if jobs > 1 and 'fork' in multiprocessing.get_all_start_methods():
+        with ProcessPoolExecutor(max_workers=jobs,
+                                 mp_context=multiprocessing.get_context('fork')) as pool:
+            results = [future.result()
+                       for future in as_completed(pool.submit(render, t) for t in tasks)]
+    else:
+        results = [render(task) for task in tasks]
+
+    status = {}
+    for (name, figure), ok, seconds, output in results:
+        status[(name, figure)] = ok
+        print(f"  {name}/{figure}: {'done' if ok else 'FAILED'} ({seconds:.1f}s)")
+        if verbose or not ok:
+            print('    ' + output.strip().replace('\n', '\n    '))
+    print(f"{len(tasks)} figures in {time.perf_counter() - start:.2f}s")
+    return status
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('subsets', nargs='*',
+                        help=f"named subsets to draw: {', '.join(SUBSET_SPECS)} "
+                             "(default: all, or none with --where)")
+    parser.add_argument('--figures', nargs='+', choices=FIGURES, default=FIGURES,
+                        help='figures to draw (default: all)')
+    parser.add_argument('--where', action='append', default=[], metavar='COLUMN=VALUE',
+                        help='filter of a custom subset; repeat a column for alternatives')
+    parser.add_argument('--name', default='custom', help='name of the custom subset')
+    parser.add_argument('--label', help='label of the custom subset in titles (default: name)')
+    parser.add_argument('--out', help='output directory of the custom subset (default: .)')
+    parser.add_argument('-j', '--jobs', type=int, default=None,
+                        help='worker processes (default: number of CPUs)')
+    parser.add_argument('-q', '--quiet', action='store_true',
+                        help="only print the figures' output when they fail")
+    args = parser.parse_args(argv)
+
+    unknown = [name for name in args.subsets if name not in SUBSET_SPECS]
+    if unknown:
+        parser.error(f"unknown subset(s): {', '.join(unknown)}")
+    names = args.subsets or ([] if args.where else list(SUBSET_SPECS))
+    specs = {name: SUBSET_SPECS[name] for name in names}
+    if args.where:
+        try:
+            where = parse_where(args.where)
+        except ValueError as error:
+            parser.error(str(error))
+        specs[args.name] = custom_spec(args.name, where, args.label, args.out)
+
+    status = run(specs, args.figures, jobs=args.jobs, verbose=not args.quiet)
+    return 0 if all(status.values()) else 1
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
@@ -0,0 +1,131 @@
+"""
+Automatic callout placement around map anchors
+
+A callout (a donut with its label underneath, joined to its country by a
+leader line) is an axis-aligned box around its centre. Callouts are placed
+greedily in priority order (largest first): each tries candidate centres
+on rings around its anchor and takes the one with the lowest cost
+
+    leader length + overlap with boxes already placed + share on land,
+
+where candidates leaving the bounds are not allowed. Boxes already placed
+and fixed obstacles (the anchors themselves) are kept in a grid hash, so a
+candidate only tests the boxes in the cells it covers and placing dozens
+of callouts takes milliseconds.
+
+Usage:
+    from common.placement import place_callouts
+    centers = place_callouts(anchors, boxes, bounds=(-180, 180, -60, 85),
+                             distances=radius * np.array([2, 3, 4.5, 6]),
+                             land=land_mask.contains)
+"""
+
+from collections import defaultdict
+
+import numpy as np
+from matplotlib.font_manager import FontProperties
+from matplotlib.textpath import TextPath
+
+
+class BoxGrid:
+    """Grid hash of axis-aligned boxes (x0, x1, y0, y1) for overlap queries"""
+
+    def __init__(self, cell):
+        self.cell = float(cell)
+        self.cells = defaultdict(list)
+        self.boxes = []
+
+    def _cells(self, box):
+        x0, x1, y0, y1 = np.floor(np.asarray(box) / self.cell).astype(int)
+        return [(i, j) for i in range(x0, x1 + 1) for j in range(y0, y1 + 1)]
+
+    def add(self, box):
+        """Insert a box"""
+        for key in self._cells(box):
+            self.cells[key].append(len(self.boxes))
+        self.boxes.append(tuple(box))
+
+    def overlap(self, boxes):
+        """Area of every query box covered by stored boxes (summed over stored boxes)"""
+        boxes = np.asarray(boxes, dtype=float).reshape(-1, 4)
+        hull = (boxes[:, 0].min(), boxes[:, 1].max(), boxes[:, 2].min(), boxes[:, 3].max())
+        near = sorted({i for key in self._cells(hull) for i in self.cells.get(key, ())})
+        if not near:
+            return np.zeros(len(boxes))
+        stored = np.array([self.boxes[i] for i in near])
+        dx = (np.minimum(boxes[:, None, 1], stored[None, :, 1])
+              - np.maximum(boxes[:, None, 0], stored[None, :, 0]))
+        dy = (np.minimum(boxes[:, None, 3], stored[None, :, 3])
+              - np.maximum(boxes[:, None, 2], stored[None, :, 2]))
+        return (np.clip(dx, 0, None) * np.clip(dy, 0, None)).sum(axis=1)
+
+
+def ring_candidates(anchor, distances, n_angles=16):
+    """Candidate centres on rings around an anchor, shape (len(distances) * n_angles, 2)"""
+    angles = np.linspace(0, 2 * np.pi, n_angles, endpoint=False)
+    radii = np.repeat(np.asarray(distances, dtype=float), n_angles)
+    angles = np.tile(angles, len(distances))
+    return np.asarray(anchor, dtype=float) + radii[:, None] * np.stack([np.cos(angles),
+                                                                        np.sin(angles)], axis=1)
+
+
+def place_callouts(anchors, boxes, bounds, distances, priority=None, obstacles=(), land=None,
+                   n_angles=16, overlap_weight=10.0, land_weight=1.0):
+    """Centre of every callout; boxes are (left, right, bottom, top) offsets from the centre
+
+    bounds is (x0, x1, y0, y1); obstacles are extra fixed boxes in data
+    coordinates; land(points) -> bool array marks points on land. Callouts
+    are placed in order of descending priority (default: input order).
+    """
+    anchors = np.asarray(anchors, dtype=float).reshape(-1, 2)
+    boxes = np.asarray(boxes, dtype=float).reshape(-1, 4)
+    x0, x1, y0, y1 = bounds
+    order = np.arange(len(anchors)) if priority is None else np.argsort(-np.asarray(priority),
+                                                                        kind='stable')
+    size = np.max(np.stack([boxes[:, 1] - boxes[:, 0], boxes[:, 3] - boxes[:, 2]]), initial=1.0)
+    grid = BoxGrid(size)
+    for box in obstacles:
+        grid.add(box)
+
+    # Points sampled in a box (corners, edge midpoints, centre) for the land share
+    fx, fy = np.meshgrid([0.0, 0.5, 1.0], [0.0, 0.5, 1.0])
+    fx, fy = fx.ravel(), fy.ravel()
+
+    centers = np.full_like(anchors, np.nan)
+    for i in order:
+        cand = ring_candidates(anchors[i], distances, n_angles)
+        cand_boxes = np.column_stack([cand[:, 0] + boxes[i, 0], cand[:, 0] + boxes[i, 1],
+                                      cand[:, 1] + boxes[i, 2], cand[:, 1] + boxes[i, 3]])
+        inside = ((cand_boxes[:, 0] >= x0) & (cand_boxes[:, 1] <= x1)
+                  & (cand_boxes[:, 2] >= y0) & (cand_boxes[:, 3] <= y1))
+        if not inside.any():
+            continue
+        cand, cand_boxes = cand[inside], cand_boxes[inside]
+
+        area = (boxes[i, 1] - boxes[i, 0]) * (boxes[i, 3] - boxes[i, 2])
+        cost = np.linalg.norm(cand - anchors[i], axis=1) / np.max(distances)
+        cost += overlap_weight * grid.overlap(cand_boxes) / area
+        if land is not None:
+            px = cand_boxes[:, [0]] + fx * (cand_boxes[:, [1]] - cand_boxes[:, [0]])
+            py = cand_boxes[:, [2]] + fy * (cand_boxes[:, [3]] - cand_boxes[:, [2]])
+            on_land = land(np.column_stack([px.ravel(), py.ravel()])).reshape(px.shape)
+            cost += land_weight * on_land.mean(axis=1)
+
+        best = np.argmin(cost)
+        centers[i] = cand[best]
+        grid.add(cand_boxes[best])
+    return centers
+
+
+def text_widths(texts, fontsize, fontweight='normal'):
+    """Rendered width of every text in points"""
+    prop = FontProperties(size=fontsize, weight=fontweight)
+    return np.array([TextPath((0, 0), str(t), prop=prop).get_extents().width for t in texts])
+
+
+def data_per_point(ax, xlim, ylim):
+    """Data units per typographic point of an equal-aspect axes showing xlim x ylim"""
+    fig_w, fig_h = ax.figure.get_size_inches()
+    pos = ax.get_position()
+    return max((xlim[1] - xlim[0]) / (pos.width * fig_w * 72),
+               (ylim[1] - ylim[0]) / (pos.height * fig_h * 72))
@@ -0,0 +1,188 @@
+"""
+N-stage Sankey diagrams over the coded dimensions
+
+A Sankey is described by an ordered list of stages, each a coded column and
+the categories to show (a list, a top-N count, or None for all categories
+by frequency), e.g.
+
+    [('subject_megatrend', None), ('ai_method', 8), ('ai_task', 8), ('sdg_alignment', 6)]
+
+Rows outside the selected categories of any stage are dropped. Every column
+is integer-coded once; node counts and the flows of all adjacent stage
+pairs then come from a single bincount over combined codes. Nodes are
+stacked top to bottom in category order, and the flows leaving (entering)
+a node are stacked in the order of the nodes they go to (come from), so the
+band positions of all flows follow from cumulative sums of the flow
+matrices. Each stage's bands are drawn as one PathCollection of cubic
+Bezier ribbons and all nodes as one PolyCollection.
+
+Usage:
+    from common.sankey import draw_sankey, sankey_layout
+    layout = sankey_layout(df, stages)
+    draw_sankey(ax, layout, colors={'article_type': {...}, ...})
+"""
+
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+from matplotlib.collections import PathCollection, PolyCollection
+from matplotlib.colors import to_rgba
+from matplotlib.path import Path
+
+DEFAULT_COLOR = '#888888'
+
+# One ribbon: top curve left to right, right edge, bottom curve back, close
+RIBBON_CODES = np.array([Path.MOVETO, Path.CURVE4, Path.CURVE4, Path.CURVE4,
+                         Path.LINETO, Path.CURVE4, Path.CURVE4, Path.CURVE4, Path.CLOSEPOLY],
+                        dtype=Path.code_type)
+
+
+@dataclass
+class SankeyLayout:
+    """Node and flow geometry of a Sankey, y in axes units growing upwards"""
+    stages: list               # column names
+    categories: list           # shown categories per stage
+    x: np.ndarray              # node centre x per stage
+    nodes: pd.DataFrame        # stage, name, count, y_top, height (nodes with articles)
+    flows: pd.DataFrame        # stage (left), source, target, count, y0/y1 top and bottom
+    total: int                 # rows in the diagram
+
+
+def stage_categories(df, column, selection):
+    """Categories shown for a stage: a list as given, or the (top N) values by count"""
+    if selection is None or isinstance(selection, (int, np.integer)):
+        counts = df[column].value_counts()
+        counts = counts[counts > 0]
+        return counts.index.tolist()[:selection]
+    return list(selection)
+
+
+def sankey_layout(df, stages, x=None, total_height=0.75, start_y=0.88, gap=0.015,
+                  min_height=0.03):
+    """Node positions and band positions of every flow between adjacent stages
+
+    stages is a list of (column, categories); see stage_categories. Node
+    heights are proportional to their counts (at least min_height) and flow
+    bands are proportional within their node.
+    """
+    columns = [column for column, _ in stages]
+    categories = [stage_categories(df, column, sel) for column, sel in stages]
+    sizes = np.array([len(c) for c in categories])
+
+    # Integer codes per stage, -1 outside the shown categories
+    codes = np.column_stack([pd.Categorical(df[column], categories=cats).codes
+                             for column, cats in zip(columns, categories)]).astype(np.int64)
+    codes = codes[(codes >= 0).all(axis=1)]
+    total = len(codes)
+
+    # Node counts and all adjacent-pair flow counts from one bincount
+    node_offsets = np.concatenate([[0], np.cumsum(sizes)])
+    pair_sizes = sizes[:-1] * sizes[1:]
+    pair_offsets = node_offsets[-1] + np.concatenate([[0], np.cumsum(pair_sizes)])
+    keys = [codes + node_offsets[:-1]]
+    if len(stages) > 1:
+        keys.append(codes[:, :-1] * sizes[1:] + codes[:, 1:] + pair_offsets[:-1])
+    counts = np.bincount(np.concatenate(keys, axis=1).ravel(), minlength=pair_offsets[-1])
+
+    # Nodes: stacked downwards from start_y, empty categories skipped
+    node_rows, heights, tops = [], [], []
+    for s, cats in enumerate(categories):
+        c = counts[node_offsets[s]:node_offsets[s + 1]].astype(float)
+        h = np.where(c > 0, np.maximum(c / max(total, 1) * total_height, min_height), 0.0)
+        step = np.where(c > 0, h + gap, 0.0)
+        top = start_y - (np.cumsum(step) - step)
+        heights.append(h), tops.append(top)
+        node_rows.extend((s, name, int(n), t, hh) for name, n, t, hh in zip(cats, c, top, h) if n > 0)
+    nodes = pd.DataFrame(node_rows, columns=['stage', 'name', 'count', 'y_top', 'height'])
+
+    # Flows: bands stacked within their source node by target order and
+    # within their target node by source order
+    flow_frames = []
+    for s in range(len(stages) - 1):
+        f = counts[pair_offsets[s]:pair_offsets[s + 1]].reshape(sizes[s], sizes[s + 1]).astype(float)
+        n_left = counts[node_offsets[s]:node_offsets[s + 1]].astype(float)
+        n_right = counts[node_offsets[s + 1]:node_offsets[s + 2]].astype(float)
+        share_left = np.divide(f, n_left[:, None], out=np.zeros_like(f), where=n_left[:, None] > 0)
+        share_right = np.divide(f, n_right, out=np.zeros_like(f), where=n_right > 0)
+        h_left, h_right = share_left * heights[s][:, None], share_right * heights[s + 1]
+        y0_top = tops[s][:, None] - (np.cumsum(h_left, axis=1) - h_left)
+        y1_top = tops[s + 1] - (np.cumsum(h_right, axis=0) - h_right)
+        i, j = np.nonzero(f)
+        flow_frames.append(pd.DataFrame({
+            'stage': s, 'source': np.asarray(categories[s], dtype=object)[i],
+            'target': np.asarray(categories[s + 1], dtype=object)[j], 'count': f[i, j].astype(int),
+            'y0_top': y0_top[i, j], 'y0_bottom': y0_top[i, j] - h_left[i, j],
+            'y1_top': y1_top[i, j], 'y1_bottom': y1_top[i, j] - h_right[i, j]}))
+    flows = (pd.concat(flow_frames, ignore_index=True) if flow_frames else
+             pd.DataFrame(columns=['stage', 'source', 'target', 'count',
+                                   'y0_top', 'y0_bottom', 'y1_top', 'y1_bottom']))
+
+    x = np.linspace(0.15, 0.85, len(stages)) if x is None else np.asarray(x, dtype=float)
+    return SankeyLayout(columns, categories, x, nodes, flows, total)
+
+
+def ribbon_vertices(x0, x1, y0_top, y0_bottom, y1_top, y1_bottom):
+    """Vertices of every flow ribbon, shape (n, 9, 2), matching RIBBON_CODES"""
+    x0, x1, y0_top, y0_bottom, y1_top, y1_bottom = np.broadcast_arrays(
+        *(np.asarray(v, dtype=float) for v in (x0, x1, y0_top, y0_bottom, y1_top, y1_bottom)))
+    xc = (x0 + x1) / 2
+    xs = np.stack([x0, xc, xc, x1, x1, xc, xc, x0, x0], axis=-1)
+    ys = np.stack([y0_top, y0_top, y1_top, y1_top, y1_bottom, y1_bottom, y0_bottom, y0_bottom,
+                   y0_top], axis=-1)
+    return np.stack([xs, ys], axis=-1)
+
+
+def flow_collections(layout, colors, node_width=0.06, alpha=0.35, color_by='source', zorder=1):
+    """One PathCollection per stage pair, each band coloured by its source (or target) node"""
+    collections = []
+    for s, flows in layout.flows.groupby('stage', sort=True):
+        verts = ribbon_vertices(layout.x[s] + node_width / 2, layout.x[s + 1] - node_width / 2,
+                                flows['y0_top'], flows['y0_bottom'],
+                                flows['y1_top'], flows['y1_bottom'])
+        stage = s if color_by == 'source' else s + 1
+        palette = colors.get(layout.stages[stage], {})
+        facecolors = [to_rgba(palette.get(name, DEFAULT_COLOR), alpha) for name in flows[color_by]]
+        collections.append(PathCollection([Path(v, RIBBON_CODES) for v in verts],
+                                          facecolors=facecolors, edgecolors='none', zorder=zorder))
+    return collections
+
+
+def draw_sankey(ax, layout, colors, node_width=0.06, alpha=0.35, headers=None,
+                label_sides=None, fontsize=7, header_y=0.95):
+    """Flows, nodes, node labels and stage headers of a laid-out Sankey
+
+    colors maps column -> {category: colour}. Labels sit left of the first
+    stage, right of the last and inside the nodes in between, unless
+    label_sides gives 'left' / 'right' / 'center' per stage.
+    """
+    for flows in flow_collections(layout, colors, node_width, alpha):
+        ax.add_collection(flows, autolim=False)
+
+    nodes = layout.nodes
+    x = layout.x[nodes['stage'].to_numpy()]
+    left, right = x - node_width / 2, x + node_width / 2
+    top = nodes['y_top'].to_numpy()
+    bottom = top - nodes['height'].to_numpy()
+    rects = np.stack([np.stack([left, right, right, left], axis=-1),
+                      np.stack([bottom, bottom, top, top], axis=-1)], axis=-1)
+    facecolors = [colors.get(layout.stages[s], {}).get(name, DEFAULT_COLOR)
+                  for s, name in nodes[['stage', 'name']].itertuples(index=False)]
+    ax.add_collection(PolyCollection(rects, facecolors=facecolors, edgecolors='black',
+                                     linewidths=0.5, zorder=3), autolim=False)
+
+    n = len(layout.stages)
+    sides = label_sides or (['left'] + ['center'] * (n - 2) + ['right'] if n > 1 else ['left'])
+    for (s, name), xl, xr, y in zip(nodes[['stage', 'name']].itertuples(index=False),
+                                    left, right, (top + bottom) / 2):
+        if sides[s] == 'left':
+            ax.text(xl - 0.01, y, name, ha='right', va='center', fontsize=fontsize, zorder=4)
+        elif sides[s] == 'right':
+            ax.text(xr + 0.01, y, name, ha='left', va='center', fontsize=fontsize, zorder=4)
+        else:
+            ax.text((xl + xr) / 2, y, name, ha='center', va='center', fontsize=fontsize - 1,
+                    fontweight='bold', color='white', zorder=4)
+
+    for x_stage, header in zip(layout.x, headers or layout.stages):
+        ax.text(x_stage, header_y, header, ha='center', va='bottom', fontsize=10,
+                fontweight='bold')
@@ -0,0 +1,104 @@
+"""
+Column schema for the Scopus exports and the coded research datasets
+(see docs/DATA_DICTIONARY.md and METHODOLOGY §5.1 / §6).
+"""
+
+# Scopus metadata fields (METHODOLOGY Table 5, 23 fields)
+SCOPUS_FIELDS = [
+    'Authors',
+    'Author full names',
+    'Author(s) ID',
+    'Title',
+    'Year',
+    'Source title',
+    'Volume',
+    'Issue',
+    'Art. No.',
+    'Page start',
+    'Page end',
+    'Cited by',
+    'DOI',
+    'Link',
+    'Affiliations',
+    'Authors with affiliations',
+    'Abstract',
+    'Funding Texts',
+    'Document Type',
+    'Publication Stage',
+    'Open Access',
+    'Source',
+    'EID',
+]
+
+# Coded variables (METHODOLOGY Table 6, 15 variables)
+CODED_FIELDS = [
+    'relevant',
+    'country_first_author',
+    'subject_category',
+    'subject_cluster',
+    'subject_megatrend',
+    'ai_method',
+    'ai_task',
+    'main_goal',
+    'sdg_alignment',
+    'article_type',
+    'methodological_approach',
+    'spatial_scale',
+    'temporal_scale',
+    'temporal_focus',
+    'level_of_sustainability',
+]
+
+# Older exports use different headers for some coded variables
+COLUMN_ALIASES = {
+    'sustainability_level': 'level_of_sustainability',
+}
+
+# Low-cardinality columns stored as pandas categoricals in the cache
+CATEGORICAL_FIELDS = [
+    'relevant',
+    'country_first_author',
+    'subject_category',
+    'subject_cluster',
+    'subject_megatrend',
+    'ai_method',
+    'ai_task',
+    'sdg_alignment',
+    'article_type',
+    'methodological_approach',
+    'spatial_scale',
+    'temporal_scale',
+    'temporal_focus',
+    'level_of_sustainability',
+    'Source title',
+    'Document Type',
+    'Publication Stage',
+    'Open Access',
+    'Source',
+]
+
+INTEGER_FIELDS = ['Year', 'Cited by']
+
+# Identifier-like fields that pandas would otherwise infer as float in some
+# yearly exports and as text in others (e.g. Volume "9" vs "9A")
+STRING_FIELDS = ['Volume', 'Issue', 'Art. No.', 'Page start', 'Page end', 'DOI', 'EID']
+
+# Long free-text columns; figure scripts load these lazily, only when used
+TEXT_FIELDS = [
+    'Title',
+    'Abstract',
+    'Funding Texts',
+    'Authors with affiliations',
+    'Affiliations',
+    'Author full names',
+    'main_goal',
+]
+
+
+def normalize_columns(df):
+    """Rename aliased headers to their canonical coded-variable names"""
+    renames = {old: new for old, new in COLUMN_ALIASES.items()
+               if old in df.columns and new not in df.columns}
+    if renames:
+        df = df.rename(columns=renames)
+    return df
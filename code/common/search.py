@@ -0,0 +1,439 @@
+"""
+Positional inverted index and Scopus boolean query engine
+
+Replays a Scopus search string (METHODOLOGY.md section 2.2) against a local
+export, so the effect of editing the string on the retrieved and included
+records can be measured without querying Scopus again.
+
+Each searchable column is indexed from its token-ID store (common.tokens):
+the postings of a term are the corpus-wide positions of its tokens, sorted,
+so a phrase matches where the positions of word k are the positions of
+word 1 shifted by k. The postings are cached in the store directory.
+
+Supported syntax:
+    AND, OR, AND NOT (precedence OR > AND > AND NOT, as in Scopus), brackets,
+    adjacent terms (implicit AND), "loose phrases" (plurals included),
+    {exact phrases}, wildcards * (any characters) and ? (one character),
+    TITLE(), ABS(), KEY(), TITLE-ABS(), TITLE-ABS-KEY(),
+    PUBYEAR >, <, =, >=, <=, IS, AFT, BEF, DOCTYPE(ar|re|cp|...), LANGUAGE()
+
+The exports carry no keyword or language columns: KEY searches keyword
+columns only where an export has them, TITLE-ABS-KEY then falls back to
+Title and Abstract, and LANGUAGE() matches every record.
+
+    from common.search import SearchIndex
+    index = SearchIndex.load('combined_raw')
+    mask = index.search('TITLE-ABS-KEY("deep learning" AND urban*)')
+
+Compare a revised search string with the published one (from code/):
+    python -m common.search --query 'TITLE-ABS-KEY(("AI" OR "GPT") AND "smart cit*")'
+    python -m common.search --query-file revised.txt --show 10
+"""
+
+import argparse
+import os
+import re
+import time
+
+import numpy as np
+import pandas as pd
+
+from common.data_access import REPO_ROOT, cached_columns, ensure_cache, load_dataset
+from common.tokens import TOKEN_PATTERN, TokenStore
+
+METHODOLOGY_PATH = REPO_ROOT / 'docs' / 'METHODOLOGY.md'
+
+# Columns searched by each Scopus field code; keyword columns are used when present
+FIELD_COLUMNS = {
+    'TITLE': ['Title'],
+    'ABS': ['Abstract'],
+    'KEY': ['Author Keywords', 'Index Keywords'],
+    'TITLE-ABS': ['Title', 'Abstract'],
+    'TITLE-ABS-KEY': ['Title', 'Abstract', 'Author Keywords', 'Index Keywords'],
+    'ALL': ['Title', 'Abstract', 'Author Keywords', 'Index Keywords'],
+}
+DEFAULT_FIELD = 'TITLE-ABS-KEY'
+
+# Scopus DOCTYPE codes -> 'Document Type' values of the exports
+DOCTYPES = {
+    'ar': 'Article', 're': 'Review', 'cp': 'Conference Paper', 'ch': 'Book Chapter',
+    'bk': 'Book', 'le': 'Letter', 'ed': 'Editorial', 'no': 'Note', 'sh': 'Short Survey',
+    'er': 'Erratum', 'dp': 'Data Paper', 'cr': 'Conference Review',
+}
+
+YEAR_OPERATORS = {'>': np.greater, '<': np.less, '=': np.equal, '>=': np.greater_equal,
+                  '<=': np.less_equal, 'IS': np.equal, 'AFT': np.greater, 'BEF': np.less}
+
+QUERY_TOKEN = re.compile(r'''\s*(?:
+    (?P<open>\() | (?P<close>\)) |
+    "(?P<phrase>[^"]*)" | \{(?P<exact>[^}]*)\} |
+    (?P<compare><=|>=|<|>|=) |
+    (?P<word>[^\s(){}"<>=]+)
+)''', re.VERBOSE)
+
+
+class QuerySyntaxError(ValueError):
+    """A search string the compiler cannot parse"""
+
+
+# --- Query compiler ---------------------------------------------------------
+#
+# A compiled query is a tree of tuples:
+#   ('and', [nodes]), ('or', [nodes]), ('and_not', node, node),
+#   ('field', code, node), ('phrase', [word patterns], exact),
+#   ('year', operator, year), ('doctype', code), ('language', value)
+
+def lex(text):
+    """(kind, value) tokens of a search string"""
+    text = text.replace('“', '"').replace('”', '"')
+    tokens, pos = [], 0
+    while pos < len(text):
+        if text[pos:].strip() == '':
+            break
+        match = QUERY_TOKEN.match(text, pos)
+        if not match or match.end() == pos:
+            raise QuerySyntaxError(f"cannot read the search string at: {text[pos:pos + 20]!r}")
+        kind = match.lastgroup
+        tokens.append((kind, match.group(kind)))
+        pos = match.end()
+    return tokens
+
+
+class Parser:
+    """Recursive-descent parser for the Scopus boolean syntax"""
+
+    def __init__(self, text):
+        self.tokens = lex(text)
+        self.pos = 0
+
+    def peek(self, offset=0):
+        i = self.pos + offset
+        return self.tokens[i] if i < len(self.tokens) else (None, None)
+
+    def next(self):
+        token = self.peek()
+        self.pos += 1
+        return token
+
+    def expect(self, kind):
+        token_kind, value = self.next()
+        if token_kind != kind:
+            raise QuerySyntaxError(f"expected {kind}, got {value!r}")
+        return value
+
+    def is_word(self, *words, offset=0):
+        kind, value = self.peek(offset)
+        return kind == 'word' and value.upper() in words
+
+    def parse(self):
+        node = self.and_not()
+        if self.peek()[0] is not None:
+            raise QuerySyntaxError(f"unexpected {self.peek()[1]!r}")
+        return node
+
+    def and_not(self):
+        node = self.conjunction()
+        while self.is_word('AND') and self.is_word('NOT', offset=1):
+            self.pos += 2
+            node = ('and_not', node, self.conjunction())
+        return node
+
+    def conjunction(self):
+        nodes = [self.disjunction()]
+        while True:
+            if self.is_word('AND') and not self.is_word('NOT', offset=1):
+                self.pos += 1
+            elif not self.starts_operand():
+                break
+            # Adjacent operands without an operator are ANDed
+            nodes.append(self.disjunction())
+        return nodes[0] if len(nodes) == 1 else ('and', nodes)
+
+    def disjunction(self):
+        nodes = [self.operand()]
+        while self.is_word('OR'):
+            self.pos += 1
+            nodes.append(self.operand())
+        return nodes[0] if len(nodes) == 1 else ('or', nodes)
+
+    def starts_operand(self):
+        kind, _ = self.peek()
+        if kind in ('open', 'phrase', 'exact'):
+            return True
+        return kind == 'word' and not self.is_word('AND', 'OR')
+
+    def operand(self):
+        kind, value = self.next()
+        if kind == 'open':
+            node = self.and_not()
+            self.expect('close')
+            return node
+        if kind == 'phrase':
+            return ('phrase', query_words(value), False)
+        if kind == 'exact':
+            return ('phrase', query_words(value, wildcards=False), True)
+        if kind != 'word':
+            raise QuerySyntaxError(f"unexpected {value!r}")
+
+        code = value.upper()
+        if code == 'PUBYEAR':
+            operator = self.next()[1]
+            if operator is None or operator.upper() not in YEAR_OPERATORS:
+                raise QuerySyntaxError(f"PUBYEAR needs one of {', '.join(YEAR_OPERATORS)}")
+            year = self.expect('word')
+            if not year.isdigit():
+                raise QuerySyntaxError(f"PUBYEAR needs a year, got {year!r}")
+            return ('year', operator.upper(), int(year))
+        if self.peek()[0] == 'open' and code in ('DOCTYPE', 'LANGUAGE'):
+            self.pos += 1
+            argument = self.expect('word')
+            self.expect('close')
+            if code == 'DOCTYPE' and argument.lower() not in DOCTYPES:
+                raise QuerySyntaxError(f"unknown DOCTYPE {argument!r}")
+            return ('doctype', argument.lower()) if code == 'DOCTYPE' else ('language', argument)
+        if self.peek()[0] == 'open' and code in FIELD_COLUMNS:
+            self.pos += 1
+            node = self.and_not()
+            self.expect('close')
+            return ('field', code, node)
+        if self.peek()[0] == 'open' and re.fullmatch(r'[A-Z]+(?:-[A-Z]+)+|[A-Z]{3,}', value):
+            raise QuerySyntaxError(f"unsupported field code {code}")
+        if re.fullmatch(r'(?:W|PRE)/\d+', code):
+            raise QuerySyntaxError(f"proximity operator {value} is not supported")
+        # An unquoted term; several words (e.g. covid-19) are a loose phrase
+        return ('phrase', query_words(value), False)
+
+
+def query_words(text, wildcards=True):
+    """Lower-case word patterns of a term or phrase, tokenised like the corpus"""
+    pattern = r'[\w*?]+' if wildcards else TOKEN_PATTERN
+    words = re.findall(pattern, text.lower())
+    if not words:
+        raise QuerySyntaxError(f"empty term {text!r}")
+    return words
+
+
+def compile_query(text):
+    """Syntax tree of a Scopus search string"""
+    return Parser(text).parse()
+
+
+def methodology_query(path=METHODOLOGY_PATH):
+    """The published search string, read from METHODOLOGY.md section 2.2"""
+    text = path.read_text(encoding='utf-8')
+    match = re.search(r'### 2\.2 Search String.*?```\n(.*?)```', text, re.DOTALL)
+    if not match:
+        raise ValueError(f"no search string block in {path}")
+    return match.group(1)
+
+
+# --- Index and evaluation ---------------------------------------------------
+
+class PositionalIndex:
+    """Sorted corpus-wide token positions of every term of a token store"""
+
+    def __init__(self, store, postings, starts):
+        self.store = store
+        self.postings = postings      # token positions grouped by term id
+        self.starts = starts          # postings of term t: postings[starts[t]:starts[t + 1]]
+        self.doc_of_token = store.doc_of_token()
+        self.sorted_terms = None
+
+    @classmethod
+    def build(cls, store):
+        """Index a store, reusing postings cached in its directory"""
+        cached = store.path / 'postings.npy' if store.path is not None else None
+        if cached is not None and cached.exists():
+            return cls(store, np.load(cached, mmap_mode='r'),
+                       np.load(store.path / 'postings_starts.npy'))
+
+        ids = np.asarray(store.ids)
+        postings = np.argsort(ids, kind='stable').astype(np.int64)
+        starts = np.zeros(len(store.vocabulary) + 1, dtype=np.int64)
+        np.cumsum(np.bincount(ids, minlength=len(store.vocabulary)), out=starts[1:])
+        if cached is not None:
+            for name, array in [('postings_starts.npy', starts), ('postings.npy', postings)]:
+                tmp = store.path / f'{name}.{os.getpid()}.tmp'
+                with open(tmp, 'wb') as f:
+                    np.save(f, array)
+                os.replace(tmp, store.path / name)
+        return cls(store, postings, starts)
+
+    def term_ids(self, word, exact=False):
+        """Ids of the terms a word pattern matches
+
+        Wildcards expand over the vocabulary; loose words of 3+ letters also
+        match their plurals (s, es, y -> ies), as Scopus does.
+        """
+        vocabulary = self.store.vocabulary
+        if not exact and ('*' in word or '?' in word):
+            if self.sorted_terms is None:
+                order = np.argsort(vocabulary)
+                self.sorted_terms = order, vocabulary[order]
+            order, ordered = self.sorted_terms
+            prefix = re.split(r'[*?]', word, maxsplit=1)[0]
+            # Terms sharing the literal prefix, found by binary search
+            lo = np.searchsorted(ordered, prefix, side='left')
+            hi = np.searchsorted(ordered, prefix + '\uffff', side='left')
+            candidates = order[lo:hi]
+            if word == prefix + '*':
+                return candidates
+            regex = re.compile(re.escape(word).replace(r'\*', r'\w*').replace(r'\?', r'\w'))
+            return candidates[[regex.fullmatch(t) is not None for t in vocabulary[candidates]]]
+
+        variants = [word]
+        # Initials and acronyms such as A.I. or AI are not inflected
+        if not exact and len(word) > 2 and word.isalpha():
+            variants += [word + 's', word + 'es']
+            if word.endswith('y'):
+                variants.append(word[:-1] + 'ies')
+        index = self.store.index
+        return np.array([index[v] for v in variants if v in index], dtype=np.int64)
+
+    def positions(self, term_ids):
+        """Token positions of any of the terms"""
+        parts = [self.postings[self.starts[t]:self.starts[t + 1]] for t in term_ids]
+        return np.concatenate(parts) if parts else np.empty(0, dtype=np.int64)
+
+    def phrase(self, words, exact=False):
+        """Boolean document mask of the documents containing the phrase"""
+        positions = self.positions(self.term_ids(words[0], exact))
+        for k, word in enumerate(words[1:], 1):
+            following = self.positions(self.term_ids(word, exact))
+            positions = positions[np.isin(positions + k, following)]
+        # The whole phrase must lie inside one document
+        end = positions + len(words) - 1
+        positions = positions[self.doc_of_token[positions] == self.doc_of_token[end]]
+        mask = np.zeros(len(self.store), dtype=bool)
+        mask[self.doc_of_token[positions]] = True
+        return mask
+
+
+class SearchIndex:
+    """Positional indexes of a dataset's text columns plus its filter columns"""
+
+    def __init__(self, indexes, records):
+        self.indexes = indexes    # column -> PositionalIndex
+        self.records = records    # Year and Document Type per row
+        self._cache = {}
+
+    @classmethod
+    def load(cls, name_or_path='combined_raw', refresh=False):
+        """Index every searchable column the dataset has"""
+        available = set(cached_columns(ensure_cache(name_or_path)))
+        columns = [c for c in dict.fromkeys(c for cs in FIELD_COLUMNS.values() for c in cs)
+                   if c in available]
+        indexes = {c: PositionalIndex.build(TokenStore.load(name_or_path, c, refresh=refresh))
+                   for c in columns}
+        filters = [c for c in ['Year', 'Document Type', 'Language of Original Document']
+                   if c in available]
+        return cls(indexes, load_dataset(name_or_path, columns=filters))
+
+    def __len__(self):
+        return len(self.records)
+
+    def search(self, query):
+        """Boolean row mask of the records a search string retrieves"""
+        node = compile_query(query) if isinstance(query, str) else query
+        return self.evaluate(node, DEFAULT_FIELD)
+
+    def evaluate(self, node, field):
+        kind = node[0]
+        if kind == 'and':
+            return np.logical_and.reduce([self.evaluate(n, field) for n in node[1]])
+        if kind == 'or':
+            return np.logical_or.reduce([self.evaluate(n, field) for n in node[1]])
+        if kind == 'and_not':
+            return self.evaluate(node[1], field) & ~self.evaluate(node[2], field)
+        if kind == 'field':
+            return self.evaluate(node[2], node[1])
+        if kind == 'phrase':
+            return self.phrase(tuple(node[1]), node[2], field)
+        if kind == 'year':
+            years = self.records['Year'].astype('Float64').to_numpy(dtype=float, na_value=np.nan)
+            with np.errstate(invalid='ignore'):
+                return YEAR_OPERATORS[node[1]](years, node[2])
+        if kind == 'doctype':
+            return (self.records['Document Type'].astype('string')
+                    .eq(DOCTYPES[node[1]]).fillna(False).to_numpy(bool))
+        if kind == 'language':
+            if 'Language of Original Document' not in self.records:
+                return np.ones(len(self), dtype=bool)
+            return (self.records['Language of Original Document'].astype('string')
+                    .str.contains(node[1], case=False, regex=False).fillna(False).to_numpy(bool))
+        raise ValueError(f"unknown query node {kind!r}")
+
+    def phrase(self, words, exact, field):
+        """Phrase mask over the field's columns, memoised per query term"""
+        key = (words, exact, field)
+        if key not in self._cache:
+            columns = [c for c in FIELD_COLUMNS[field] if c in self.indexes]
+            if not columns:
+                raise ValueError(f"the dataset has no {field} columns "
+                                 f"({', '.join(FIELD_COLUMNS[field])})")
+            self._cache[key] = np.logical_or.reduce(
+                [self.indexes[c].phrase(list(words), exact) for c in columns])
+        return self._cache[key]
+
+
+def compare(index, baseline, revised):
+    """Records retrieved by either search string, with what changed"""
+    old, new = index.search(baseline), index.search(revised)
+    return pd.DataFrame({'baseline': old, 'revised': new,
+                         'added': new & ~old, 'removed': old & ~new})
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--dataset', default='combined_raw',
+                        help='Dataset name or export CSV (default: combined_raw)')
+    query = parser.add_mutually_exclusive_group()
+    query.add_argument('--query', help='Revised search string')
+    query.add_argument('--query-file', help='File holding the revised search string')
+    parser.add_argument('--baseline-file',
+                        help='Search string to compare against (default: METHODOLOGY.md 2.2)')
+    parser.add_argument('--show', type=int, default=0,
+                        help='List up to this many added and removed titles')
+    args = parser.parse_args()
+
+    baseline = (open(args.baseline_file, encoding='utf-8').read() if args.baseline_file
+                else methodology_query())
+    revised = args.query or (open(args.query_file, encoding='utf-8').read()
+                             if args.query_file else baseline)
+    try:
+        compile_query(baseline), compile_query(revised)
+    except QuerySyntaxError as error:
+        parser.error(str(error))
+
+    start = time.perf_counter()
+    index = SearchIndex.load(args.dataset)
+    loaded = time.perf_counter() - start
+    start = time.perf_counter()
+    result = compare(index, baseline, revised)
+    elapsed = time.perf_counter() - start
+
+    print(f"{len(index):,} records, indexed columns: {', '.join(index.indexes)} "
+          f"({loaded:.2f}s)")
+    print(f"Evaluated in {elapsed * 1000:.1f} ms")
+    counts = result.sum()
+    print(f"  baseline: {counts['baseline']:,}  revised: {counts['revised']:,}  "
+          f"added: {counts['added']:,}  removed: {counts['removed']:,}")
+
+    data = load_dataset(args.dataset, columns=[c for c in ['Title', 'relevant']
+                                               if c in cached_columns(ensure_cache(args.dataset))])
+    if 'relevant' in data:
+        included = data['relevant'].astype('string').str.strip().str.lower().eq('yes')
+        included = included.fillna(False).to_numpy(bool)
+        print(f"  included articles: {included.sum():,}, retrieved by the revision: "
+              f"{(included & result['revised']).sum():,}, lost: "
+              f"{(included & result['removed']).sum():,}")
+    for change in ['added', 'removed']:
+        rows = np.flatnonzero(result[change])[:args.show]
+        if len(rows):
+            print(f"\n{change.capitalize()}:")
+            for title in data['Title'].iloc[rows]:
+                print(f"  {title}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,166 @@
+"""
+Rule-based standardisation of free-text coded values
+
+A standardiser is an ordered rule table. Each rule names the category it
+assigns and the keyword groups a lower-cased value must contain: at least
+one keyword of every `all` group, none of the `none` keywords, or exactly
+one of the `equals` values. The first matching rule wins; a category of
+None drops the value.
+
+All keywords of a table are compiled into one regular expression. Matching a
+value runs that expression once to collect the keywords it contains, then
+walks the rules over that keyword set. Each distinct value is matched only
+once: a Series is factorised into categorical codes, the unique values are
+mapped and the result is broadcast back through the codes.
+
+Usage:
+    from common.standardize import standardize_ai_task
+    df['ai_task_descriptive'] = standardize_ai_task(df['ai_task'])
+"""
+
+import re
+from functools import lru_cache
+
+import pandas as pd
+
+# Descriptive AI task categories for the AI task x SDG table. Order matters:
+# e.g. 'prediction and classification' is dropped before the Classification
+# rule sees it.
+AI_TASK_RULES = (
+    # Non-informative categories
+    {'equals': ('not specified', 'not applicable/not specified', 'not coverage', 'other',
+                'not applicable', 'multiple'), 'category': None},
+
+    # Prediction/Forecasting; multi-task combinations are skipped
+    {'all': (('prediction', 'forecasting', 'forecast'), ('classification', 'pattern')),
+     'category': None},
+    {'all': (('prediction', 'forecasting', 'forecast'),), 'category': 'Prediction & Forecasting'},
+
+    # Classification (merge all classification types)
+    {'all': (('classification',),), 'none': ('object',), 'category': 'Classification'},
+    {'equals': ('image classification', 'image recognition and classification',
+                'image recognition'), 'category': 'Classification'},
+
+    # Object/Anomaly/Change Detection (comprehensive detection category)
+    {'all': (('object detection', 'anomaly detection', 'change detection',
+              'intrusion detection', 'fault detection', 'malware'),),
+     'category': 'Object/Anomaly/Change Detection'},
+    {'equals': ('detection',), 'category': 'Object/Anomaly/Change Detection'},
+    {'all': (('security',),), 'category': 'Object/Anomaly/Change Detection'},
+
+    # Optimization & Resource Allocation
+    {'all': (('optimization', 'scheduling', 'resource allocation', 'resource management',
+              'route'),), 'category': 'Optimization & Resource Allocation'},
+
+    # Analysis & Assessment, split by what is analysed
+    {'all': (('analysis', 'assessment', 'evaluation'), ('causal', 'impact')),
+     'category': 'Causal Inference'},
+    {'all': (('analysis', 'assessment', 'evaluation'), ('risk',)),
+     'category': 'Analysis & Assessment'},
+    {'all': (('analysis', 'assessment', 'evaluation'), ('feature', 'explainability')),
+     'category': 'Analysis & Assessment'},
+    {'all': (('analysis', 'assessment', 'evaluation'), ('spatial',)),
+     'category': 'Mapping/Spatial Analysis'},
+    {'all': (('analysis', 'assessment', 'evaluation'), ('text', 'nlp', 'sentiment')),
+     'category': 'NLP/Text Analysis'},
+    {'all': (('analysis', 'assessment', 'evaluation'), ('image', 'video')),
+     'category': 'Image/Video Processing'},
+    {'all': (('analysis', 'assessment', 'evaluation'),), 'category': 'Analysis & Assessment'},
+
+    {'all': (('segmentation',),), 'category': 'Segmentation'},
+    {'all': (('image', 'video', '3d reconstruction'),), 'category': 'Image/Video Processing'},
+    {'all': (('simulation', 'modeling', 'scenario'),), 'category': 'Simulation/Modeling'},
+    {'all': (('clustering',),), 'category': 'Clustering'},
+    # Pattern recognition is merged with classification as they're related
+    {'all': (('pattern', 'recognition'),), 'category': 'Classification'},
+    {'all': (('nlp', 'text', 'natural language', 'sentiment'),), 'category': 'NLP/Text Analysis'},
+    {'all': (('decision', 'planning', 'recommendation'),), 'category': 'Decision Support'},
+    {'all': (('generation', 'synthesis', 'augmentation'),), 'category': 'Generation'},
+    {'all': (('data',), ('processing', 'fusion', 'integration', 'collection', 'mining')),
+     'category': 'Data Processing'},
+    {'all': (('monitoring', 'tracking'),), 'category': 'Monitoring'},
+    {'all': (('mapping', 'spatial'),), 'category': 'Mapping/Spatial Analysis'},
+    {'all': (('causal',),), 'category': 'Causal Inference'},
+    {'all': (('control', 'navigation'),), 'category': 'Control/Navigation'},
+    {'all': (('regression', 'estimation', 'measurement'),), 'category': 'Regression'},
+    {'all': (('localization', 'identification', 're-identification'),),
+     'category': 'Object/Anomaly/Change Detection'},
+)
+
+
+class RuleMatcher:
+    """Ordered rule table compiled to a single keyword regex"""
+
+    def __init__(self, rules):
+        self.rules = [(frozenset(rule.get('equals', ())),
+                       [frozenset(group) for group in rule.get('all', ())],
+                       frozenset(rule.get('none', ())),
+                       rule['category'])
+                      for rule in rules]
+        keywords = sorted({kw for rule in rules for group in rule.get('all', ()) for kw in group}
+                          | {kw for rule in rules for kw in rule.get('none', ())},
+                          key=len, reverse=True)
+        # A zero-width lookahead tries every start position, so overlapping
+        # keywords are all found; longest first, so a hit also implies every
+        # keyword that is a prefix of it (e.g. 'forecasting' -> 'forecast').
+        self.pattern = re.compile('(?=(' + '|'.join(map(re.escape, keywords)) + '))')
+        self.implied = {kw: frozenset(k for k in keywords if kw.startswith(k)) for kw in keywords}
+        self.match = lru_cache(maxsize=None)(self._match)
+
+    def keywords_in(self, text):
+        """Every rule keyword that occurs in text as a substring"""
+        found = set()
+        for hit in self.pattern.finditer(text):
+            found |= self.implied[hit.group(1)]
+        return found
+
+    def _match(self, value):
+        """Category of one raw value (None if no rule assigns one)"""
+        if pd.isna(value):
+            return None
+        text = str(value).strip().lower()
+        found = self.keywords_in(text)
+        for equals, groups, none, category in self.rules:
+            if equals:
+                if text in equals:
+                    return category
+                continue
+            if all(group & found for group in groups) and not none & found:
+                return category
+        return None
+
+    def __call__(self, values):
+        """Standardise a Series, matching each distinct value once"""
+        codes, uniques = pd.factorize(values, use_na_sentinel=True)
+        mapped = pd.Categorical([self.match(v) for v in uniques])
+        row_codes = mapped.codes[codes]
+        row_codes[codes < 0] = -1
+        return pd.Series(pd.Categorical.from_codes(row_codes, mapped.categories),
+                         index=values.index, name=values.name)
+
+
+# Compiled matchers by rule table content, so repeated calls compile and
+# match only once, and a table edited in place is compiled again
+_COMPILED = {}
+
+
+def rules_key(rules):
+    """Hashable snapshot of a rule table's content"""
+    return tuple((tuple(rule.get('equals', ())),
+                  tuple(tuple(group) for group in rule.get('all', ())),
+                  tuple(rule.get('none', ())),
+                  rule['category'])
+                 for rule in rules)
+
+
+def compile_rules(rules):
+    """Compiled matcher for a rule table, reused across calls with the same rules"""
+    key = rules_key(rules)
+    if key not in _COMPILED:
+        _COMPILED[key] = RuleMatcher(rules)
+    return _COMPILED[key]
+
+
+def standardize_ai_task(values, rules=AI_TASK_RULES):
+    """Descriptive AI task category of each raw ai_task value"""
+    return compile_rules(rules)(values)
@@ -0,0 +1,207 @@
+"""
+Document x term count matrix with per-group keyword extraction
+
+The count matrix of a dataset column (Abstract by default) covers every
+lower-case word of 4+ letters. It is counted from the column's token-ID
+store (common.tokens), so the text is tokenised once per dataset version
+and never again by the figures. Stopwords are applied at query time, so
+different figures can use different lists.
+
+Keywords of any grouping come from one sparse product of a group indicator
+matrix with the count matrix:
+
+    from common.terms import STOPWORDS, TermMatrix
+    terms = TermMatrix.load('empirical')
+    terms.top_terms(df['subject_megatrend'], k=15, stopwords=STOPWORDS)
+    terms.top_terms(df['Year'], k=10, score='keyness')
+
+Scores: 'count' (term occurrences in the group), 'tfidf' (group term
+frequency x inverse document frequency) and 'keyness' (Dunning log-likelihood
+of the group against the rest of the corpus; only over-represented terms).
+
+Keyword table for a grouping (from code/):
+    python -m common.terms --dataset empirical --by subject_megatrend --score keyness
+"""
+
+import argparse
+
+import numpy as np
+import pandas as pd
+from scipy import sparse
+
+from common.data_access import load_dataset
+from common.tokens import TokenStore
+
+# Terms of the count matrix, a subset of the store's vocabulary
+TERM_PATTERN = r'[a-z]{4,}'
+
+# Generic academic and domain words left out of keyword panels
+STOPWORDS = frozenset({
+    'the', 'a', 'an', 'and', 'or', 'but', 'in', 'on', 'at', 'to', 'for',
+    'of', 'with', 'by', 'from', 'as', 'is', 'was', 'are', 'were', 'been',
+    'be', 'have', 'has', 'had', 'do', 'does', 'did', 'will', 'would',
+    'could', 'should', 'may', 'might', 'must', 'shall', 'can', 'need',
+    'this', 'that', 'these', 'those', 'it', 'its', 'we', 'our', 'they',
+    'their', 'which', 'what', 'where', 'when', 'who', 'how', 'all', 'each',
+    'every', 'both', 'few', 'more', 'most', 'other', 'some', 'such', 'no',
+    'not', 'only', 'same', 'so', 'than', 'too', 'very', 'just', 'also',
+    'into', 'over', 'after', 'before', 'between', 'under', 'again', 'then',
+    'once', 'here', 'there', 'any', 'during', 'through', 'above', 'below',
+    'up', 'down', 'out', 'off', 'about', 'while', 'based', 'using', 'used',
+    'paper', 'study', 'research', 'method', 'methods', 'results', 'data',
+    'analysis', 'model', 'models', 'approach', 'proposed', 'article',
+    'however', 'thus', 'therefore', 'furthermore', 'moreover', 'although',
+    'yet', 'still', 'even', 'much', 'well', 'many', 'new', 'first', 'two',
+    'three', 'one', 'use', 'high', 'low', 'different', 'important', 'show',
+    'shows', 'shown', 'found', 'including', 'provide', 'provides', 'present',
+    'presented', 'aims', 'aim', 'objective', 'objectives', 'work', 'works',
+    'being', 'make', 'made', 'like', 'within', 'without', 'among',
+    'across', 'along', 'toward', 'towards', 'upon', 'since', 'until',
+    'further', 'various', 'several', 'number', 'order', 'case', 'cases',
+    'example', 'examples', 'particular', 'general', 'specific', 'specifically',
+    'significantly', 'particularly', 'especially', 'mainly', 'primarily',
+    'overall', 'total', 'average', 'mean', 'value', 'values', 'level', 'levels',
+    'rate', 'rates', 'factor', 'factors', 'effect', 'effects', 'impact', 'impacts',
+    'result', 'change', 'changes', 'increase', 'increases', 'decrease', 'decreases',
+    'higher', 'lower', 'better', 'best', 'good', 'great', 'large', 'small',
+    'long', 'short', 'term', 'terms', 'time', 'times', 'year', 'years',
+    'type', 'types', 'form', 'forms', 'part', 'parts', 'system', 'systems',
+    'process', 'processes', 'feature', 'features', 'problem', 'problems',
+    'solution', 'solutions', 'information', 'knowledge', 'performance',
+    'accuracy', 'learning', 'neural', 'network', 'networks', 'deep', 'machine',
+    'urban', 'city', 'cities', 'area', 'areas', 'region', 'regions', 'local',
+    'national', 'global', 'world', 'country', 'countries', 'state', 'states',
+})
+
+
+class TermMatrix:
+    """Document x term counts of one text column, rows in dataset order"""
+
+    def __init__(self, counts, vocabulary, store=None, columns=None):
+        self.counts = counts.tocsr()
+        self.vocabulary = np.asarray(vocabulary, dtype=object)
+        self.store = store          # token store the counts come from, if any
+        self.columns = columns      # matrix column of every store token id, -1 if not a term
+
+    @classmethod
+    def from_store(cls, store, pattern=TERM_PATTERN):
+        """Counts of the store's terms that fully match pattern"""
+        keep = pd.Series(store.vocabulary, dtype=object).str.fullmatch(pattern).to_numpy(bool)
+        columns = np.full(len(keep), -1, dtype=np.int64)
+        columns[keep] = np.arange(int(keep.sum()))
+        return cls(*store.count_matrix(keep), store=store, columns=columns)
+
+    @classmethod
+    def from_texts(cls, texts):
+        return cls.from_store(TokenStore.from_texts(texts))
+
+    @classmethod
+    def load(cls, name_or_path='full', column='Abstract', refresh=False):
+        """Term matrix of a dataset column, counted from its cached token store"""
+        return cls.from_store(TokenStore.load(name_or_path, column, refresh=refresh))
+
+    def group_counts(self, groups):
+        """Summed term counts per group: (group labels, groups x terms matrix)
+
+        groups is a Series indexed by row position in the dataset (the
+        RangeIndex of a loaded dataset, or any subset of it).
+        """
+        groups = groups.dropna()
+        codes, labels = pd.factorize(groups, sort=True)
+        rows = groups.index.to_numpy()
+        indicator = sparse.csr_matrix((np.ones(len(rows)), (codes, rows)),
+                                      shape=(len(labels), self.counts.shape[0]))
+        return labels, (indicator @ self.counts).tocsr()
+
+    def first_occurrence(self, rows):
+        """Rank of every term by its first occurrence in the given rows, in row order
+
+        Without a token store the vocabulary order (first occurrence in the
+        whole corpus) is used.
+        """
+        n_terms = len(self.vocabulary)
+        if self.store is None:
+            return np.arange(n_terms)
+        offsets = self.store.offsets
+        starts = np.asarray(offsets[rows], dtype=np.int64)
+        lengths = np.asarray(offsets[rows + 1], dtype=np.int64) - starts
+        # Token positions of the rows, concatenated in row order
+        positions = np.repeat(starts - np.cumsum(lengths) + lengths, lengths)
+        positions += np.arange(len(positions))
+        terms = self.columns[np.asarray(self.store.ids)[positions]]
+        terms = terms[terms >= 0]
+        found, first = np.unique(terms, return_index=True)
+        rank = np.full(n_terms, len(terms), dtype=np.int64)
+        rank[found] = first
+        return rank
+
+    def top_terms(self, groups, k=15, score='count', stopwords=STOPWORDS):
+        """Top-k (term, score) pairs of every group, highest first
+
+        Ties keep the order in which terms first occur in the grouped rows, so
+        a subset ranks its terms as a term matrix of the subset alone would.
+        """
+        labels, grouped = self.group_counts(groups)
+        keep = ~np.isin(self.vocabulary, list(stopwords)) if stopwords else np.ones(len(self.vocabulary), bool)
+        grouped = grouped[:, keep].toarray().astype(np.float64)
+        vocabulary = self.vocabulary[keep]
+        first = self.first_occurrence(np.sort(groups.dropna().index.to_numpy()))[keep]
+
+        if score == 'tfidf':
+            doc_freq = np.diff(self.counts.tocsc().indptr)[keep]
+            n_docs = self.counts.shape[0]
+            idf = np.log((1 + n_docs) / (1 + doc_freq)) + 1
+            totals = grouped.sum(axis=1, keepdims=True)
+            values = np.divide(grouped, totals, out=np.zeros_like(grouped), where=totals > 0) * idf
+        elif score == 'keyness':
+            values = log_likelihood(grouped)
+        elif score == 'count':
+            values = grouped
+        else:
+            raise ValueError(f"unknown score '{score}' (use 'count', 'tfidf' or 'keyness')")
+
+        result = {}
+        for label, row, counts in zip(labels, values, grouped):
+            candidates = np.flatnonzero((counts > 0) & (row > 0))
+            top = candidates[np.lexsort((first[candidates], -row[candidates]))[:k]]
+            result[label] = [(vocabulary[i], row[i].item() if score != 'count' else int(row[i]))
+                             for i in top]
+        return result
+
+
+def log_likelihood(grouped):
+    """Dunning log-likelihood (G2) of each group's term counts against the rest
+
+    Terms less frequent in the group than in the rest of the corpus get 0,
+    so only characteristic terms are ranked.
+    """
+    a = grouped
+    b = grouped.sum(axis=0, keepdims=True) - a
+    c = a.sum(axis=1, keepdims=True)
+    d = b.sum(axis=1, keepdims=True)
+    e1 = c * (a + b) / (c + d)
+    e2 = d * (a + b) / (c + d)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        g2 = 2 * (np.where(a > 0, a * np.log(a / e1), 0) + np.where(b > 0, b * np.log(b / e2), 0))
+    return np.where(a > e1, np.nan_to_num(g2), 0)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--dataset', default='full', help='Dataset name or CSV path')
+    parser.add_argument('--column', default='Abstract', help='Text column to tokenise')
+    parser.add_argument('--by', default='subject_megatrend', help='Column to group by')
+    parser.add_argument('--top', type=int, default=10, help='Keywords per group')
+    parser.add_argument('--score', default='count', choices=['count', 'tfidf', 'keyness'])
+    args = parser.parse_args()
+
+    terms = TermMatrix.load(args.dataset, column=args.column)
+    groups = load_dataset(args.dataset, columns=[args.by])[args.by]
+    print(f"{terms.counts.shape[0]:,} documents, {len(terms.vocabulary):,} terms")
+    for label, keywords in terms.top_terms(groups, k=args.top, score=args.score).items():
+        print(f"\n{label}:")
+        print('  ' + ', '.join(term for term, _ in keywords))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,229 @@
+"""
+Token-ID corpus store for the text columns of a dataset
+
+A text column (Title, Abstract) is tokenised once: every lower-case word
+(run of word characters) of every document becomes an int32 id into a
+vocabulary listing the terms in order of first occurrence. The store is a
+directory in data/cache/ next to the dataset cache, rebuilt when the dataset
+changes:
+
+    vocabulary.txt  one term per line; the line number is the token id
+    ids.npy         int32 token ids of all documents, concatenated
+    offsets.npy     int64 start of each document in ids, plus the end
+
+ids and offsets are opened memory-mapped, so loading a store is zero-copy
+and text features (keyword counts, n-grams, search) read the ids directly
+instead of tokenising the text again:
+
+    from common.tokens import TokenStore
+    store = TokenStore.load('full', 'Abstract')
+    store.words(0)                         # tokens of the first abstract
+    counts, terms = store.count_matrix()   # document x term counts
+    counts, grams = store.ngram_counts(2)  # document x bigram counts
+
+Build or refresh the stores (from code/):
+    python -m common.tokens                          # Title and Abstract of every dataset
+    python -m common.tokens --dataset empirical --column Title
+"""
+
+import argparse
+import os
+import re
+import shutil
+import time
+
+import numpy as np
+import pandas as pd
+from scipy import sparse
+
+from common.data_access import DATASETS, ensure_cache, read_cache
+
+TOKEN_PATTERN = r'\w+'
+TEXT_COLUMNS = ['Title', 'Abstract']
+READ_ATTEMPTS = 6       # reads of a store being replaced before rebuilding it
+
+
+def tokenize(texts, pattern=TOKEN_PATTERN):
+    """Flat token ids, document offsets and vocabulary of a text Series"""
+    tokens = texts.astype('string').str.lower().str.findall(pattern)
+    lengths = tokens.str.len().fillna(0).astype(np.int64).to_numpy()
+    flat = tokens.explode().dropna().to_numpy(dtype=object)
+    ids, vocabulary = pd.factorize(flat)
+    offsets = np.zeros(len(texts) + 1, dtype=np.int64)
+    np.cumsum(lengths, out=offsets[1:])
+    return ids.astype(np.int32), offsets, np.asarray(vocabulary, dtype=object)
+
+
+class TokenStore:
+    """Token ids of one text column, documents in dataset row order"""
+
+    def __init__(self, ids, offsets, vocabulary, path=None):
+        self.ids = ids
+        self.offsets = offsets
+        self.vocabulary = np.asarray(vocabulary, dtype=object)
+        self.path = path          # store directory, None for in-memory stores
+        self._index = None
+
+    @classmethod
+    def from_texts(cls, texts):
+        return cls(*tokenize(texts))
+
+    @classmethod
+    def load(cls, name_or_path='full', column='Abstract', refresh=False):
+        """Token store of a dataset column, built on first use and cached"""
+        data_cache = ensure_cache(name_or_path)
+        field = re.sub(r'\W+', '_', column.lower())
+        target = data_cache.with_name(f'tokens_{field}__{data_cache.stem}')
+        if target.exists() and not refresh:
+            # Another process may be swapping in a rebuilt store (see write)
+            for attempt in range(READ_ATTEMPTS):
+                try:
+                    return cls.read(target)
+                except FileNotFoundError:
+                    time.sleep(0.01 * 2 ** attempt)
+        store = cls.from_texts(read_cache(data_cache, [column])[column])
+        store.write(target)
+        return cls.read(target)
+
+    def write(self, target):
+        """Save the store as a directory, atomically renamed into place"""
+        tmp = target.with_name(f'{target.name}.{os.getpid()}.tmp')
+        shutil.rmtree(tmp, ignore_errors=True)
+        tmp.mkdir(parents=True)
+        np.save(tmp / 'ids.npy', np.asarray(self.ids, dtype=np.int32))
+        np.save(tmp / 'offsets.npy', np.asarray(self.offsets, dtype=np.int64))
+        (tmp / 'vocabulary.txt').write_text('\n'.join(self.vocabulary), encoding='utf-8')
+        # Move an existing store aside instead of deleting it first: the
+        # target is only missing between the two renames (load() retries
+        # then), and readers that already mapped the old files keep them
+        old = target.with_name(f'{target.name}.{os.getpid()}.old')
+        try:
+            os.replace(target, old)
+        except FileNotFoundError:
+            old = None
+        try:
+            os.replace(tmp, target)
+        except OSError:
+            # Written concurrently by another process
+            shutil.rmtree(tmp, ignore_errors=True)
+        if old is not None:
+            shutil.rmtree(old, ignore_errors=True)
+
+        # Drop stores built from older versions of the same dataset
+        stem = target.name.split('.')[0]
+        for stale in target.parent.glob(f'{stem}.*'):
+            if stale != target and not stale.name.endswith('.tmp'):
+                shutil.rmtree(stale, ignore_errors=True)
+
+    @classmethod
+    def read(cls, target):
+        """Open a store written by write(), with ids and offsets memory-mapped"""
+        text = (target / 'vocabulary.txt').read_text(encoding='utf-8')
+        return cls(np.load(target / 'ids.npy', mmap_mode='r'),
+                   np.load(target / 'offsets.npy', mmap_mode='r'),
+                   text.split('\n') if text else [], path=target)
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    @property
+    def n_tokens(self):
+        return int(self.offsets[-1])
+
+    @property
+    def index(self):
+        """{term: token id}"""
+        if self._index is None:
+            self._index = {term: i for i, term in enumerate(self.vocabulary)}
+        return self._index
+
+    def document(self, row):
+        """Token ids of one document (a view into ids)"""
+        return self.ids[self.offsets[row]:self.offsets[row + 1]]
+
+    def words(self, row):
+        """Tokens of one document as strings"""
+        return self.vocabulary[self.document(row)].tolist()
+
+    def doc_of_token(self):
+        """Document row of every token"""
+        return np.repeat(np.arange(len(self), dtype=np.int32), np.diff(self.offsets))
+
+    def count_matrix(self, keep=None):
+        """Sparse document x term counts and their vocabulary
+
+        keep optionally is a boolean mask over the vocabulary; the kept terms
+        stay in order of first occurrence.
+        """
+        ids = np.asarray(self.ids)
+        rows = self.doc_of_token()
+        vocabulary = self.vocabulary
+        if keep is not None:
+            remap = np.full(len(vocabulary), -1, dtype=np.int64)
+            remap[keep] = np.arange(int(np.count_nonzero(keep)))
+            ids = remap[ids]
+            rows, ids = rows[ids >= 0], ids[ids >= 0]
+            vocabulary = vocabulary[keep]
+        counts = sparse.csr_matrix((np.ones(len(ids), dtype=np.int32), (rows, ids)),
+                                   shape=(len(self), len(vocabulary)))
+        counts.sum_duplicates()
+        return counts, vocabulary
+
+    def ngram_counts(self, n=2, min_count=1):
+        """Sparse document x n-gram counts and the n-grams as 'w1 w2 ...' strings
+
+        N-grams do not cross document boundaries; only those occurring at
+        least min_count times in the corpus are kept.
+        """
+        ids = np.asarray(self.ids, dtype=np.int64)
+        starts = np.arange(max(len(ids) - n + 1, 0))
+        # A window is valid when it ends inside the document it starts in
+        doc_end = np.repeat(self.offsets[1:], np.diff(self.offsets))[:len(starts)]
+        starts = starts[starts + n <= doc_end]
+        # Each window as one base-V integer, so grams are found with a 1-D unique
+        size = max(len(self.vocabulary), 1)
+        if size ** n >= 2 ** 63:
+            raise ValueError(f"{n}-grams over {size:,} terms do not fit an int64 key")
+        keys = np.zeros(len(starts), dtype=np.int64)
+        for k in range(n):
+            keys = keys * size + ids[starts + k]
+        grams, codes, totals = np.unique(keys, return_inverse=True, return_counts=True)
+
+        keep = totals >= min_count
+        kept = keep[codes]
+        rows = self.doc_of_token()[starts[kept]]
+        codes = (np.cumsum(keep) - 1)[codes[kept]]
+        counts = sparse.csr_matrix((np.ones(len(codes), dtype=np.int32), (rows, codes)),
+                                   shape=(len(self), int(keep.sum())))
+        counts.sum_duplicates()
+
+        words = np.empty((int(keep.sum()), n), dtype=np.int64)
+        grams = grams[keep]
+        for k in reversed(range(n)):
+            grams, words[:, k] = np.divmod(grams, size)
+        labels = np.array([' '.join(g) for g in self.vocabulary[words]], dtype=object)
+        return counts, labels
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--dataset', nargs='+', default=['full', 'empirical', 'non_empirical'],
+                        help='Dataset names or CSV paths (default: the coded datasets)')
+    parser.add_argument('--column', nargs='+', default=TEXT_COLUMNS,
+                        help='Text columns to tokenise (default: Title Abstract)')
+    parser.add_argument('--refresh', action='store_true', help='Rebuild existing stores')
+    args = parser.parse_args()
+
+    for dataset in args.dataset:
+        if dataset not in DATASETS and not os.path.exists(dataset):
+            parser.error(f"unknown dataset '{dataset}'")
+        for column in args.column:
+            start = time.perf_counter()
+            store = TokenStore.load(dataset, column, refresh=args.refresh)
+            elapsed = time.perf_counter() - start
+            print(f"  {dataset}/{column}: {len(store):,} documents, {store.n_tokens:,} tokens, "
+                  f"{len(store.vocabulary):,} terms ({elapsed:.2f}s)")
+
+
+if __name__ == "__main__":
+    main()
@@ -10,6 +10,13 @@ import pandas as pd
 import warnings
 warnings.filterwarnings('ignore')
 
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+from common.data_access import PROCESSED_DIR
+from common.export import save_figure
+
 # PDF settings for editable text in Adobe Illustrator
 plt.rcParams['pdf.fonttype'] = 42  # TrueType fonts (editable in Illustrator)
 plt.rcParams['ps.fonttype'] = 42   # TrueType fonts for PostScript
@@ -58,7 +65,7 @@ SDG_NAMES = {
 
 
 def load_and_process_data():
-    df = pd.read_csv('/mnt/user-data/uploads/ai_task_sdg_table.csv')
+    df = pd.read_csv(PROCESSED_DIR / 'empirical' / 'ai_task_sdg_table.csv')
     
     sdg_cols = [f'SDG {i}' for i in range(1, 17)]
     
@@ -146,8 +153,7 @@ def create_option1_stacked_bar(df):
              title='SDG', title_fontsize=10, frameon=True)
     
     plt.tight_layout()
-    fig.savefig('option1_stacked_bar.png', dpi=300, bbox_inches='tight', facecolor='white')
-    fig.savefig('option1_stacked_bar.pdf', dpi=300, bbox_inches='tight', facecolor='white')
+    save_figure(fig, 'option1_stacked_bar', formats=('png', 'pdf'), dpi=300, facecolor='white')
     plt.close()
     print("Saved: option1_stacked_bar")
 
@@ -203,8 +209,8 @@ def create_option2_percentage_bar(df):
              title='SDG', title_fontsize=10, frameon=True)
     
     plt.tight_layout()
-    fig.savefig('option2_percentage_bar.png', dpi=300, bbox_inches='tight', facecolor='white')
-    fig.savefig('option2_percentage_bar.pdf', dpi=300, bbox_inches='tight', facecolor='white')
+    save_figure(fig, 'option2_percentage_bar', formats=('png', 'pdf'),
+                dpi=300, facecolor='white')
     plt.close()
     print("Saved: option2_percentage_bar")
 
@@ -245,8 +251,7 @@ def create_option3_grouped_bar(df):
     ax.legend(loc='upper right', fontsize=9, frameon=True)
     
     plt.tight_layout()
-    fig.savefig('option3_grouped_bar.png', dpi=300, bbox_inches='tight', facecolor='white')
-    fig.savefig('option3_grouped_bar.pdf', dpi=300, bbox_inches='tight', facecolor='white')
+    save_figure(fig, 'option3_grouped_bar', formats=('png', 'pdf'), dpi=300, facecolor='white')
     plt.close()
     print("Saved: option3_grouped_bar")
 
@@ -293,8 +298,7 @@ def create_option4_lollipop(df):
                 fontsize=16, fontweight='bold', pad=15)
     
     plt.tight_layout()
-    fig.savefig('option4_lollipop.png', dpi=300, bbox_inches='tight', facecolor='white')
-    fig.savefig('option4_lollipop.pdf', dpi=300, bbox_inches='tight', facecolor='white')
+    save_figure(fig, 'option4_lollipop', formats=('png', 'pdf'), dpi=300, facecolor='white')
     plt.close()
     print("Saved: option4_lollipop")
 
@@ -340,8 +344,7 @@ def create_option5_bubble(df):
     ax.legend(title='Articles', loc='lower right', fontsize=9, frameon=True)
     
     plt.tight_layout()
-    fig.savefig('option5_bubble.png', dpi=300, bbox_inches='tight', facecolor='white')
-    fig.savefig('option5_bubble.pdf', dpi=300, bbox_inches='tight', facecolor='white')
+    save_figure(fig, 'option5_bubble', formats=('png', 'pdf'), dpi=300, facecolor='white')
     plt.close()
     print("Saved: option5_bubble")
 
@@ -387,8 +390,7 @@ def create_option6_diverging(df):
                 fontsize=16, fontweight='bold', pad=15)
     
     plt.tight_layout()
-    fig.savefig('option6_diverging.png', dpi=300, bbox_inches='tight', facecolor='white')
-    fig.savefig('option6_diverging.pdf', dpi=300, bbox_inches='tight', facecolor='white')
+    save_figure(fig, 'option6_diverging', formats=('png', 'pdf'), dpi=300, facecolor='white')
     plt.close()
     print("Saved: option6_diverging")
 
@@ -428,8 +430,7 @@ def create_option7_donut(df):
               fontsize=9, bbox_to_anchor=(0.5, -0.02))
     
     plt.tight_layout()
-    fig.savefig('option7_donut.png', dpi=300, bbox_inches='tight', facecolor='white')
-    fig.savefig('option7_donut.pdf', dpi=300, bbox_inches='tight', facecolor='white')
+    save_figure(fig, 'option7_donut', formats=('png', 'pdf'), dpi=300, facecolor='white')
     plt.close()
     print("Saved: option7_donut")
 
@@ -490,8 +491,8 @@ def create_option8_proportional(df):
              fontsize=9, bbox_to_anchor=(0.5, -0.05))
     
     plt.tight_layout()
-    fig.savefig('option8_proportional.png', dpi=300, bbox_inches='tight', facecolor='white')
-    fig.savefig('option8_proportional.pdf', dpi=300, bbox_inches='tight', facecolor='white')
+    save_figure(fig, 'option8_proportional', formats=('png', 'pdf'),
+                dpi=300, facecolor='white')
     plt.close()
     print("Saved: option8_proportional")
 
@@ -1,127 +1,17 @@
 import pandas as pd
 import numpy as np
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+from common.data_access import load_dataset
+from common.standardize import standardize_ai_task
 
 # Read data
-df = pd.read_csv(r'D:\Navid\Study\Ph.D 2\Thesis\12-ai-and-city\material\empirical_clean.csv')
-
-# Create descriptive AI task categories
-def standardize_ai_task_descriptive(task):
-    if pd.isna(task):
-        return None
-    task = str(task).strip()
-    task_lower = task.lower()
-
-    # Skip non-informative categories
-    if task_lower in ['not specified', 'not applicable/not specified', 'not coverage', 'other', 'not applicable', 'multiple']:
-        return None
-
-    # Prediction/Forecasting
-    if any(x in task_lower for x in ['prediction', 'forecasting', 'forecast']):
-        if 'classification' in task_lower or 'pattern' in task_lower:
-            return None  # Skip multi-task combinations
-        return 'Prediction & Forecasting'
-
-    # Classification (merge all classification types)
-    if 'classification' in task_lower:
-        if 'object' not in task_lower:
-            return 'Classification'
-    if task_lower in ['image classification', 'image recognition and classification', 'image recognition']:
-        return 'Classification'
-
-    # Object/Anomaly/Change Detection (comprehensive detection category)
-    if any(x in task_lower for x in ['object detection', 'anomaly detection', 'change detection',
-                                      'intrusion detection', 'fault detection', 'malware']):
-        return 'Object/Anomaly/Change Detection'
-    if task_lower == 'detection':
-        return 'Object/Anomaly/Change Detection'
-    if 'security' in task_lower:
-        return 'Object/Anomaly/Change Detection'
-
-    # Optimization & Resource Allocation
-    if any(x in task_lower for x in ['optimization', 'scheduling', 'resource allocation',
-                                      'resource management', 'route']):
-        return 'Optimization & Resource Allocation'
-
-    # Analysis & Assessment
-    if 'analysis' in task_lower or 'assessment' in task_lower or 'evaluation' in task_lower:
-        if 'causal' in task_lower or 'impact' in task_lower:
-            return 'Causal Inference'
-        if 'risk' in task_lower:
-            return 'Analysis & Assessment'
-        if 'feature' in task_lower or 'explainability' in task_lower:
-            return 'Analysis & Assessment'
-        if 'spatial' in task_lower:
-            return 'Mapping/Spatial Analysis'
-        if 'text' in task_lower or 'nlp' in task_lower or 'sentiment' in task_lower:
-            return 'NLP/Text Analysis'
-        if 'image' in task_lower or 'video' in task_lower:
-            return 'Image/Video Processing'
-        return 'Analysis & Assessment'
-
-    # Image Segmentation
-    if 'segmentation' in task_lower:
-        return 'Segmentation'
-
-    # Image/Video Processing
-    if 'image' in task_lower or 'video' in task_lower or '3d reconstruction' in task_lower:
-        return 'Image/Video Processing'
-
-    # Simulation & Modeling
-    if any(x in task_lower for x in ['simulation', 'modeling', 'scenario']):
-        return 'Simulation/Modeling'
-
-    # Clustering
-    if 'clustering' in task_lower:
-        return 'Clustering'
-
-    # Pattern Recognition (merge pattern-related tasks)
-    if 'pattern' in task_lower or 'recognition' in task_lower:
-        return 'Classification'  # Merge with classification as they're related
-
-    # NLP & Text Analysis
-    if any(x in task_lower for x in ['nlp', 'text', 'natural language', 'sentiment']):
-        return 'NLP/Text Analysis'
-
-    # Decision Support & Planning
-    if any(x in task_lower for x in ['decision', 'planning', 'recommendation']):
-        return 'Decision Support'
-
-    # Generation & Synthesis
-    if any(x in task_lower for x in ['generation', 'synthesis', 'augmentation']):
-        return 'Generation'
-
-    # Data Processing
-    if 'data' in task_lower and any(x in task_lower for x in ['processing', 'fusion', 'integration', 'collection', 'mining']):
-        return 'Data Processing'
-
-    # Monitoring & Tracking
-    if 'monitoring' in task_lower or 'tracking' in task_lower:
-        return 'Monitoring'
-
-    # Mapping & Spatial Analysis
-    if 'mapping' in task_lower or 'spatial' in task_lower:
-        return 'Mapping/Spatial Analysis'
-
-    # Causal Inference
-    if 'causal' in task_lower:
-        return 'Causal Inference'
-
-    # Control & Navigation
-    if 'control' in task_lower or 'navigation' in task_lower:
-        return 'Control/Navigation'
-
-    # Regression
-    if 'regression' in task_lower or 'estimation' in task_lower or 'measurement' in task_lower:
-        return 'Regression'
-
-    # Localization/Identification
-    if any(x in task_lower for x in ['localization', 'identification', 're-identification']):
-        return 'Object/Anomaly/Change Detection'
-
-    return None  # Skip unclassified
-
-# Apply standardization
-df['ai_task_descriptive'] = df['ai_task'].apply(standardize_ai_task_descriptive)
+df = load_dataset('empirical', columns=['ai_task', 'sdg_alignment'])
+
+# Create descriptive AI task categories (rule table in common/standardize.py)
+df['ai_task_descriptive'] = standardize_ai_task(df['ai_task'])
 
 # Filter out None values
 df_filtered = df[df['ai_task_descriptive'].notna()].copy()
@@ -152,10 +42,10 @@ df_filtered['sdg_simple'] = df_filtered['sdg_alignment'].map(sdg_mapping)
 # Create crosstab
 crosstab = pd.crosstab(df_filtered['ai_task_descriptive'], df_filtered['sdg_simple'])
 
-# Reorder SDG columns
+# Reorder SDG columns; SDGs without articles are kept as 0 so the table
+# always has the SDG 1..16 layout of data/processed/empirical/ai_task_sdg_table.csv
 sdg_order = [f'SDG {i}' for i in range(1, 17)]
-existing_sdgs = [sdg for sdg in sdg_order if sdg in crosstab.columns]
-crosstab = crosstab[existing_sdgs]
+crosstab = crosstab.reindex(columns=sdg_order, fill_value=0)
 
 # Add total column
 crosstab['Total'] = crosstab.sum(axis=1)
@@ -168,8 +58,8 @@ print(crosstab)
 print()
 print('Total articles:', crosstab['Total'].sum())
 
-# Save CSV
-crosstab.to_csv(r'D:\Navid\Study\Ph.D 2\Thesis\12-ai-and-city\material\empirical_analysis\ai_task_sdg_table.csv')
+# Save CSV next to the script; the curated table in data/processed is not overwritten
+crosstab.to_csv('ai_task_sdg_table.csv')
 
 # Create markdown table
 md_content = """# AI Tasks by SDG Alignment
@@ -266,21 +156,21 @@ if 'Object/Anomaly/Change Detection' in crosstab.index:
     md_content += f"5. **Object/Anomaly/Change Detection** is primarily applied in SDG 11 ({det_sdg11/det_total*100:.1f}%) and SDG 9 (Infrastructure, {det_sdg9/det_total*100:.1f}%)\n\n"
 
 # SDG 3 (Health) focus
-if 'SDG 3' in crosstab.columns:
+if crosstab['SDG 3'].sum() > 0:
     sdg3_total = crosstab['SDG 3'].sum()
     sdg3_pred = crosstab.loc['Prediction & Forecasting', 'SDG 3'] if 'Prediction & Forecasting' in crosstab.index and 'SDG 3' in crosstab.columns else 0
     sdg3_class = crosstab.loc['Classification', 'SDG 3'] if 'Classification' in crosstab.index and 'SDG 3' in crosstab.columns else 0
     md_content += f"6. **SDG 3 (Health)** research primarily uses Prediction & Forecasting ({sdg3_pred/sdg3_total*100:.1f}%) and Classification ({sdg3_class/sdg3_total*100:.1f}%)\n\n"
 
 # SDG 7 (Energy) focus
-if 'SDG 7' in crosstab.columns:
+if crosstab['SDG 7'].sum() > 0:
     sdg7_total = crosstab['SDG 7'].sum()
     sdg7_pred = crosstab.loc['Prediction & Forecasting', 'SDG 7'] if 'Prediction & Forecasting' in crosstab.index and 'SDG 7' in crosstab.columns else 0
     sdg7_opt = crosstab.loc['Optimization & Resource Allocation', 'SDG 7'] if 'Optimization & Resource Allocation' in crosstab.index and 'SDG 7' in crosstab.columns else 0
     md_content += f"7. **SDG 7 (Energy)** research emphasizes Prediction & Forecasting ({sdg7_pred/sdg7_total*100:.1f}%) and Optimization ({sdg7_opt/sdg7_total*100:.1f}%)\n"
 
 # Save markdown
-with open(r'D:\Navid\Study\Ph.D 2\Thesis\12-ai-and-city\material\empirical_analysis\ai_task_sdg_table.md', 'w', encoding='utf-8') as f:
+with open('ai_task_sdg_table.md', 'w', encoding='utf-8') as f:
     f.write(md_content)
 
 print('\nFiles saved:')
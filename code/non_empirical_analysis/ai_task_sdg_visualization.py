@@ -11,6 +11,13 @@ import pandas as pd
 import warnings
 warnings.filterwarnings('ignore')
 
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+from common.data_access import PROCESSED_DIR
+from common.export import save_figure
+
 # PDF settings for editable text in Adobe Illustrator
 plt.rcParams['pdf.fonttype'] = 42
 plt.rcParams['ps.fonttype'] = 42
@@ -58,7 +65,7 @@ SDG_NAMES = {
 
 
 def load_data():
-    df = pd.read_csv('ai_task_sdg_table.csv')
+    df = pd.read_csv(PROCESSED_DIR / 'non_empirical' / 'ai_task_sdg_table.csv')
     return df
 
 
@@ -127,8 +134,8 @@ def create_stacked_bar_absolute(df):
              title='SDG', title_fontsize=10, frameon=True)
 
     plt.tight_layout()
-    fig.savefig('ai_task_sdg_absolute.png', dpi=300, bbox_inches='tight', facecolor='white')
-    fig.savefig('ai_task_sdg_absolute.pdf', dpi=300, bbox_inches='tight', facecolor='white')
+    save_figure(fig, 'ai_task_sdg_absolute', formats=('png', 'pdf'),
+                dpi=300, facecolor='white')
     plt.close()
     print("Saved: ai_task_sdg_absolute")
 
@@ -182,8 +189,8 @@ def create_stacked_bar_percentage(df):
              title='SDG', title_fontsize=10, frameon=True)
 
     plt.tight_layout()
-    fig.savefig('ai_task_sdg_percentage.png', dpi=300, bbox_inches='tight', facecolor='white')
-    fig.savefig('ai_task_sdg_percentage.pdf', dpi=300, bbox_inches='tight', facecolor='white')
+    save_figure(fig, 'ai_task_sdg_percentage', formats=('png', 'pdf'),
+                dpi=300, facecolor='white')
     plt.close()
     print("Saved: ai_task_sdg_percentage")
 
@@ -227,8 +234,7 @@ def create_bubble_chart(df):
     ax.legend(title='Articles', loc='lower right', fontsize=9, frameon=True)
 
     plt.tight_layout()
-    fig.savefig('ai_task_sdg_bubble.png', dpi=300, bbox_inches='tight', facecolor='white')
-    fig.savefig('ai_task_sdg_bubble.pdf', dpi=300, bbox_inches='tight', facecolor='white')
+    save_figure(fig, 'ai_task_sdg_bubble', formats=('png', 'pdf'), dpi=300, facecolor='white')
     plt.close()
     print("Saved: ai_task_sdg_bubble")
 
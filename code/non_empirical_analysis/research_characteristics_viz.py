@@ -11,6 +11,15 @@ import numpy as np
 import warnings
 warnings.filterwarnings('ignore')
 
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+from common.crosstab import facet_tables, source_columns
+from common.data_access import load_dataset
+from common.export import save_figure
+from common.heatmap import annotate_cells, cell_colors, count_share_labels, draw_cells
+
 plt.rcParams['font.family'] = 'Arial'
 plt.rcParams['pdf.fonttype'] = 42
 plt.rcParams['ps.fonttype'] = 42
@@ -43,68 +52,52 @@ MEGATREND_FULL = [
     'Social Equity & Quality of Life',
 ]
 
-# Data from non-empirical analysis (ordered by article count)
-DATA = {
-    'Methodological Approach': {
-        'categories': ['Quantitative', 'Mixed', 'Qualitative'],
-        'values': np.array([
-            [481, 116, 278],    # Digital
-            [404, 20, 55],      # Mobility
-            [282, 25, 43],      # Climate
-            [197, 14, 16],      # Development
-            [148, 17, 15],      # Resilience
-            [61, 17, 30],       # Social
-        ])
-    },
-    'Spatial Scale': {
-        'categories': ['Local', 'Global', 'Regional', 'National', 'Individual', 'Supranational'],
-        'values': np.array([
-            [680, 129, 19, 22, 21, 4],
-            [426, 21, 3, 2, 24, 2],
-            [293, 26, 6, 2, 20, 3],
-            [205, 10, 4, 2, 5, 1],
-            [157, 11, 1, 1, 10, 0],
-            [81, 16, 0, 0, 10, 1],
-        ])
-    },
-    'Temporal Scale': {
-        'categories': ['Present', 'Future', 'Past'],
-        'values': np.array([
-            [673, 149, 53],
-            [377, 69, 32],
-            [290, 41, 19],
-            [163, 37, 27],
-            [142, 19, 19],
-            [85, 16, 7],
-        ])
-    },
-    'Temporal Focus': {
-        'categories': ['Cross-sectional', 'Longitudinal'],
-        'values': np.array([
-            [724, 151],
-            [367, 111],
-            [269, 81],
-            [169, 58],
-            [123, 57],
-            [81, 27],
-        ])
-    },
-}
+# Facets of the heatmap: (coded column, panel title, categories in display
+# order, or None for all categories by article count). Any coded column,
+# e.g. 'level_of_sustainability' or 'Year', can be added as a facet.
+FACETS = [
+    ('methodological_approach', 'Methodological Approach', ['Quantitative', 'Mixed', 'Qualitative']),
+    ('spatial_scale', 'Spatial Scale',
+     ['Local', 'Global', 'Regional', 'National', 'Individual', 'Supranational']),
+    ('temporal_scale', 'Temporal Scale', ['Present', 'Future', 'Past']),
+    ('temporal_focus', 'Temporal Focus', ['Cross-sectional', 'Longitudinal']),
+]
+
+
+def load_facets(facets=FACETS, dataset='non_empirical'):
+    """Megatrend x category counts of every facet, from one grouped count over the dataset"""
+    columns = [column for column, _, _ in facets]
+    df = load_dataset(dataset, columns=source_columns(['subject_megatrend', *columns]))
+    tables = facet_tables(df, 'subject_megatrend', columns)
 
+    data = {}
+    for column, title, categories in facets:
+        table = tables[column].reindex(index=MEGATREND_FULL, fill_value=0)
+        if categories is None:
+            totals = table.sum(axis=0)
+            categories = totals[totals > 0].sort_values(ascending=False, kind='mergesort').index
+        table = table.reindex(columns=categories, fill_value=0)
+        data[title] = {'categories': [str(c) for c in categories], 'values': table.to_numpy()}
+    return data
 
-def create_faceted_heatmap():
-    """Create a 2x2 faceted heatmap"""
 
-    fig = plt.figure(figsize=(18, 12))
+def create_faceted_heatmap(data):
+    """Create a faceted heatmap, two facets per row"""
 
-    gs = fig.add_gridspec(2, 2, wspace=0.35, hspace=0.3,
-                          left=0.18, right=0.95, top=0.90, bottom=0.08)
+    # Margins are fixed in inches, so the panels keep their size for any
+    # number of facets
+    n_rows = -(-len(data) // 2)
+    height = 6 * n_rows
+    fig = plt.figure(figsize=(18, height))
+
+    gs = fig.add_gridspec(n_rows, 2, wspace=0.35, hspace=0.3,
+                          left=0.18, right=0.95, top=1 - 1.2 / height, bottom=0.96 / height)
 
     # Color map - white to teal
     colors_cmap = ['#FFFFFF', '#E0F2F1', '#80CBC4', '#26A69A', '#00796B', '#004D40']
     cmap = LinearSegmentedColormap.from_list('teal_heat', colors_cmap, N=256)
 
-    variables = list(DATA.keys())
+    variables = list(data.keys())
     axes = []
 
     for idx, var_name in enumerate(variables):
@@ -113,7 +106,7 @@ def create_faceted_heatmap():
         ax = fig.add_subplot(gs[row, col])
         axes.append(ax)
 
-        var_data = DATA[var_name]
+        var_data = data[var_name]
         categories = var_data['categories']
         values = var_data['values']
 
@@ -122,44 +115,20 @@ def create_faceted_heatmap():
 
         # Calculate percentages
         row_totals = values.sum(axis=1, keepdims=True)
-        percentages = (values / row_totals * 100)
+        percentages = np.divide(values * 100, row_totals, out=np.zeros(values.shape),
+                                where=row_totals > 0)
 
         vmax = percentages.max()
 
-        # Draw heatmap cells
-        for i in range(n_mega):
-            for j in range(n_cats):
-                pct = percentages[i, j]
-                val = values[i, j]
-
-                norm_val = pct / vmax if vmax > 0 else 0
-                color = cmap(norm_val)
-
-                rect = Rectangle((j, i), 1, 1, facecolor=color,
-                                edgecolor='white', linewidth=1.5)
-                ax.add_patch(rect)
-
-                if pct >= 50:
-                    text_color = 'white'
-                    fontweight = 'bold'
-                elif pct >= 20:
-                    text_color = '#004D40'
-                    fontweight = 'bold'
-                else:
-                    text_color = '#333333'
-                    fontweight = 'normal'
-
-                if val >= 100:
-                    label = f'{val}\n({pct:.0f}%)'
-                elif val > 0:
-                    label = f'{val}\n({pct:.1f}%)'
-                else:
-                    label = '0'
-                    text_color = '#BDBDBD'
-
-                ax.text(j + 0.5, i + 0.5, label, ha='center', va='center',
-                       fontsize=8, color=text_color, fontweight=fontweight,
-                       linespacing=0.9)
+        # Draw heatmap cells as one collection, coloured by row percentage
+        norm = percentages / vmax if vmax > 0 else np.zeros_like(percentages)
+        draw_cells(ax, cell_colors(norm, cmap), linewidth=1.5)
+        strong = percentages >= 20
+        text_colors = np.select([values == 0, percentages >= 50, strong],
+                                ['#BDBDBD', 'white', '#004D40'], '#333333')
+        annotate_cells(ax, count_share_labels(values, percentages, thousands=False),
+                       colors=text_colors, fontweights=np.where(strong, 'bold', 'normal'),
+                       fontsize=8, linespacing=0.9)
 
         # Category labels on top
         for j, cat in enumerate(categories):
@@ -191,26 +160,27 @@ def create_faceted_heatmap():
 
     # Main title
     fig.suptitle('Non-Empirical Research: Characteristics by Megatrend',
-                fontsize=16, fontweight='bold', y=0.96)
-    fig.text(0.5, 0.92, 'Cell values show article count and percentage within each megatrend',
-            ha='center', fontsize=11, color='#666666')
+                fontsize=16, fontweight='bold', y=1 - 0.48 / height)
+    fig.text(0.5, 1 - 0.96 / height,
+             'Cell values show article count and percentage within each megatrend',
+             ha='center', fontsize=11, color='#666666')
 
     # Legend at bottom
-    legend_y = 0.03
+    legend_y = 0.36 / height
     for i, (mt_short, mt_full) in enumerate(zip(MEGATREND_SHORT, MEGATREND_FULL)):
         x = 0.18 + i * 0.13
         fig.patches.append(mpatches.FancyBboxPatch(
-            (x, legend_y), 0.015, 0.02,
+            (x, legend_y), 0.015, 0.24 / height,
             facecolor=MEGATREND_COLORS[mt_full],
             edgecolor='none',
             transform=fig.transFigure,
             boxstyle='round,pad=0.002'
         ))
-        fig.text(x + 0.02, legend_y + 0.01, mt_short, fontsize=8,
+        fig.text(x + 0.02, legend_y + 0.12 / height, mt_short, fontsize=8,
                 va='center', ha='left', color='#333333')
 
     # Color scale legend
-    cbar_ax = fig.add_axes([0.75, 0.03, 0.15, 0.015])
+    cbar_ax = fig.add_axes([0.75, 0.36 / height, 0.15, 0.18 / height])
     sm = plt.cm.ScalarMappable(cmap=cmap)
     sm.set_array([])
     cbar = fig.colorbar(sm, cax=cbar_ax, orientation='horizontal')
@@ -220,10 +190,8 @@ def create_faceted_heatmap():
     cbar_ax.set_title('% within megatrend', fontsize=8, pad=3)
 
     # Save
-    fig.savefig('research_characteristics_heatmap.pdf', format='pdf', dpi=300,
-               bbox_inches='tight', facecolor='white', edgecolor='none')
-    fig.savefig('research_characteristics_heatmap.png', format='png', dpi=300,
-               bbox_inches='tight', facecolor='white', edgecolor='none')
+    save_figure(fig, 'research_characteristics_heatmap', formats=('pdf', 'png'),
+                dpi=300, facecolor='white', edgecolor='none')
 
     print("Saved: research_characteristics_heatmap.pdf, research_characteristics_heatmap.png")
     plt.close()
@@ -231,5 +199,6 @@ def create_faceted_heatmap():
 
 if __name__ == "__main__":
     print("Creating faceted heatmap for non-empirical research characteristics...")
-    create_faceted_heatmap()
+    data = load_facets()
+    create_faceted_heatmap(data)
     print("Done!")
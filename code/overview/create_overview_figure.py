@@ -8,17 +8,27 @@ Creates a multi-panel figure with:
 - Panel D: Sankey diagram (article_type × methodological_approach × spatial_scale)
 """
 
-import pandas as pd
 import numpy as np
 import matplotlib.pyplot as plt
 import matplotlib.patches as mpatches
-from matplotlib.patches import Wedge, FancyBboxPatch, Circle
-from matplotlib.collections import PatchCollection
+import matplotlib.colors as mcolors
+from matplotlib.patches import FancyBboxPatch
+from matplotlib.collections import LineCollection, PatchCollection
 import warnings
 warnings.filterwarnings('ignore')
 
-# For world map
-import geopandas as gpd
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+from common.cube import CountCube
+from common.countries import display_names, iso3_codes
+from common.data_access import load_dataset
+from common.donut import draw_donuts
+from common.export import save_figure
+from common.geo import draw_countries, land_mask, load_world
+from common.placement import data_per_point, place_callouts, text_widths
+from common.sankey import draw_sankey, sankey_layout
 
 # Use fonts compatible with Adobe Illustrator
 plt.rcParams['font.family'] = 'Arial'
@@ -100,20 +110,29 @@ SUSTAINABILITY_COLORS = {
     'Weak': '#EF5350'
 }
 
+# Coded columns read by the row-level panels; the loader reads only their
+# union. Panels A and C read their matrices from the count cube instead.
+PANEL_COLUMNS = {
+    'B': ['country_first_author', 'sdg_alignment'],
+    'D': ['article_type', 'methodological_approach', 'spatial_scale'],
+}
+
 def load_data():
     """Load the clean research data"""
-    df = pd.read_csv('../clean_research.csv', encoding='utf-8-sig')
-    # Merge USA and United States
-    df['country_clean'] = df['country_first_author'].replace({'United States': 'USA'})
+    columns = sorted({col for cols in PANEL_COLUMNS.values() for col in cols})
+    df = load_dataset('full', columns=columns)
+    # One ISO3 code per country, whatever its spelling (USA / United States, ...)
+    df['country_iso3'] = iso3_codes(df['country_first_author'], source='country_first_author')
+    df['country_clean'] = display_names(df['country_iso3']).to_numpy()
     return df
 
-def create_panel_a(ax, df):
+def create_panel_a(ax, cube):
     """Panel A: Articles per year with SDG color breakdown"""
     # Get year-SDG crosstab
-    year_sdg = pd.crosstab(df['Year'], df['sdg_alignment'])
+    year_sdg = cube.query('Year', 'sdg_alignment')
 
     # Sort SDGs by total count for consistent ordering
-    sdg_order = df['sdg_alignment'].value_counts().index.tolist()
+    sdg_order = cube.query('sdg_alignment').index.tolist()
     year_sdg = year_sdg[sdg_order]
 
     years = year_sdg.index.tolist()
@@ -144,93 +163,45 @@ def create_panel_a(ax, df):
 
     return sdg_order
 
-def draw_donut_on_map(ax, x, y, size, sdg_counts, total):
-    """Draw a donut chart at specified position on map"""
-    # Calculate angles for each SDG
-    angles = []
-    colors = []
-    start_angle = 90
-
-    # Sort by count to draw larger segments first
-    sorted_sdgs = sorted(sdg_counts.items(), key=lambda x: x[1], reverse=True)
-
-    for sdg, count in sorted_sdgs:
-        if count > 0:
-            angle = (count / total) * 360
-            angles.append((start_angle, angle, SDG_COLORS.get(sdg, '#888888')))
-            start_angle -= angle
-
-    # Draw wedges (outer ring)
-    outer_radius = size
-    inner_radius = size * 0.55
+def draw_donuts_on_map(ax, centers, size, sdg_counts, totals):
+    """Draw SDG donut charts with their article counts at the given map positions
 
-    for start, angle, color in angles:
-        wedge = Wedge((x, y), outer_radius, start - angle, start,
-                      width=outer_radius - inner_radius,
-                      facecolor=color, edgecolor='white', linewidth=0.3)
-        ax.add_patch(wedge)
-
-    # Add white center circle
-    center_circle = Circle((x, y), inner_radius * 0.95, facecolor='white', edgecolor='none')
-    ax.add_patch(center_circle)
+    sdg_counts is a country x SDG count table, one row per centre.
+    """
+    colors = [SDG_COLORS.get(sdg, '#888888') for sdg in sdg_counts.columns]
+    draw_donuts(ax, centers, sdg_counts.to_numpy(), colors, radius=size, totals=totals)
 
     # Add count text in center
-    ax.text(x, y, f'{total:,}', ha='center', va='center', fontsize=5, fontweight='bold')
-
-def create_panel_b(ax, df):
-    """Panel B: World map with top 10 countries and SDG donut charts"""
-    # Load world map - download if needed
-    try:
-        world = gpd.read_file(gpd.datasets.get_path('naturalearth_lowres'))
-    except:
-        # Fallback: try to download
-        world = gpd.read_file("https://naciscdn.org/naturalearth/110m/cultural/ne_110m_admin_0_countries.zip")
-
-    # Country name mapping for matching
-    country_mapping = {
-        'USA': 'United States of America',
-        'UK': 'United Kingdom',
-        'South Korea': 'South Korea',
-        'Iran': 'Iran',
-        'Turkey': 'Turkey',
-        'Russia': 'Russia',
-        'Vietnam': 'Vietnam',
-        'Czech Republic': 'Czechia',
-        'UAE': 'United Arab Emirates',
-    }
+    for (x, y), total in zip(centers, totals):
+        ax.text(x, y, f'{total:,}', ha='center', va='center', fontsize=5, fontweight='bold')
 
-    # Get article counts per country
-    country_counts = df['country_clean'].value_counts()
-
-    # Map counts to world dataframe
-    def get_count(country_name):
-        # Direct match first
-        if country_name in country_counts.index:
-            return country_counts[country_name]
-        # Try mapping
-        for clean_name, geo_name in country_mapping.items():
-            if country_name == geo_name:
-                return country_counts.get(clean_name, 0)
-        # Partial match
-        for country in country_counts.index:
-            if country.lower() in country_name.lower() or country_name.lower() in country.lower():
-                return country_counts[country]
-        return 0
-
-    world['article_count'] = world['name'].apply(get_count)
+# Map extent (lon, lat) and donut size in degrees
+MAP_XLIM, MAP_YLIM = (-180, 180), (-60, 85)
+DONUT_RADIUS = 7
+DONUT_LABEL_GAP = 9
 
-    # Create log-scale normalization for better color distribution
-    max_count = world['article_count'].max()
+def create_panel_b(ax, df, n_donuts=10):
+    """Panel B: World map with the top countries and SDG donut charts"""
+    # Bundled, pre-simplified country geometry (no network access needed)
+    world = load_world()
 
-    # Plot base map (countries without articles)
-    world[world['article_count'] == 0].plot(ax=ax, color='#f5f5f5', edgecolor='#cccccc', linewidth=0.2)
+    # Get article counts per country, aligned with the map by ISO3 code
+    article_count = (df['country_iso3'].value_counts()
+                     .reindex(world.iso3, fill_value=0).to_numpy())
 
-    # Plot countries with articles using log color scale
-    countries_with_articles = world[world['article_count'] > 0].copy()
-    countries_with_articles['log_count'] = np.log1p(countries_with_articles['article_count'])
-    countries_with_articles.plot(ax=ax, column='log_count', cmap='YlOrRd',
-                                  edgecolor='#999999', linewidth=0.2,
-                                  legend=False)
+    # Create log-scale normalization for better color distribution
+    max_count = article_count.max()
+
+    # Countries without articles in grey, the others on a log colour scale,
+    # drawn above them as one collection
+    has_articles = article_count > 0
+    log_count = np.log1p(article_count)
+    norm = plt.Normalize(vmin=log_count[has_articles].min(), vmax=log_count[has_articles].max())
+    facecolors = np.where(has_articles[:, None], plt.get_cmap('YlOrRd')(norm(log_count)),
+                          mcolors.to_rgba('#f5f5f5'))
+    edgecolors = np.where(has_articles, '#999999', '#cccccc')
+    draw_countries(ax, world, facecolors, edgecolors, linewidths=0.2,
+                   order=np.argsort(has_articles, kind='stable'))
 
     # Add colorbar
     sm = plt.cm.ScalarMappable(cmap='YlOrRd', norm=plt.Normalize(vmin=0, vmax=np.log1p(max_count)))
@@ -245,48 +216,50 @@ def create_panel_b(ax, df):
     cbar.set_label('Articles', fontsize=8)
     cbar.ax.tick_params(labelsize=6)
 
-    # Top 10 countries for donut charts
-    top_10 = country_counts.head(10)
-
-    # Positions for labels and donuts (longitude, latitude)
-    # Positioned outside countries to avoid overlap
-    label_positions = {
-        'China': {'label': (155, 42), 'centroid': (105, 35), 'label_offset': (0, -9)},
-        'India': {'label': (100, 0), 'centroid': (78, 22), 'label_offset': (0, -9)},
-        'USA': {'label': (-135, 55), 'centroid': (-100, 40), 'label_offset': (0, -9)},
-        'Saudi Arabia': {'label': (30, 45), 'centroid': (45, 24), 'label_offset': (0, -9)},
-        'South Korea': {'label': (155, 20), 'centroid': (128, 36), 'label_offset': (0, -9)},
-        'Italy': {'label': (-15, 58), 'centroid': (12, 43), 'label_offset': (0, -9)},
-        'Pakistan': {'label': (50, 48), 'centroid': (70, 30), 'label_offset': (0, -9)},
-        'Spain': {'label': (-35, 45), 'centroid': (-4, 40), 'label_offset': (0, -9)},
-        'Germany': {'label': (5, 68), 'centroid': (10, 51), 'label_offset': (0, -9)},
-        'Australia': {'label': (165, -40), 'centroid': (134, -25), 'label_offset': (0, -9)},
-    }
-
-    # Draw donut charts for top 10 countries
-    for country, count in top_10.items():
-        if country in label_positions:
-            pos = label_positions[country]
-            label_pos = pos['label']
-            centroid = pos['centroid']
-
-            # Get SDG breakdown for this country
-            country_sdgs = df[df['country_clean'] == country]['sdg_alignment'].value_counts().to_dict()
-
-            # Draw line from country to label position
-            ax.plot([centroid[0], label_pos[0]], [centroid[1], label_pos[1]],
-                   color='#555555', linewidth=0.6, linestyle='-', zorder=1)
-
-            # Draw donut at label position
-            draw_donut_on_map(ax, label_pos[0], label_pos[1], 7, country_sdgs, count)
-
-            # Add country label below donut
-            ax.text(label_pos[0] + pos['label_offset'][0],
-                   label_pos[1] + pos['label_offset'][1],
-                   country, ha='center', va='top', fontsize=6, fontweight='bold')
-
-    ax.set_xlim(-180, 180)
-    ax.set_ylim(-60, 85)
+    # Top countries for donut charts, with their SDG breakdown from one grouped count
+    top = df['country_iso3'].value_counts().head(n_donuts)
+    country_sdg = (df.groupby(['country_iso3', 'sdg_alignment'], observed=True).size()
+                     .unstack(fill_value=0))
+
+    # Place donuts and labels around the country anchors: a donut of radius
+    # DONUT_RADIUS with its label underneath is one box, kept off other
+    # callouts, the anchors and (where possible) land
+    anchors = world.anchor_points(top.index)
+    on_map = ~np.isnan(anchors).any(axis=1)
+    if not on_map.all():
+        print(f"No map position for: {', '.join(top.index[~on_map])}")
+    top, anchors = top[on_map], anchors[on_map]
+    names = display_names(top.index).to_numpy()
+
+    scale = data_per_point(ax, MAP_XLIM, MAP_YLIM)
+    half_width = np.maximum(DONUT_RADIUS, text_widths(names, 6, 'bold') * scale / 2 + 1)
+    label_height = 6 * 1.2 * scale
+    boxes = np.column_stack([-half_width, half_width,
+                             np.full(len(top), -DONUT_LABEL_GAP - label_height),
+                             np.full(len(top), DONUT_RADIUS)])
+    dot = DONUT_RADIUS * 0.3
+    obstacles = np.column_stack([anchors[:, 0] - dot, anchors[:, 0] + dot,
+                                 anchors[:, 1] - dot, anchors[:, 1] + dot])
+    donut_xy = place_callouts(anchors, boxes, MAP_XLIM + MAP_YLIM,
+                              distances=DONUT_RADIUS * np.array([2.0, 3.0, 4.2, 5.6, 7.0]),
+                              priority=top.to_numpy(), obstacles=obstacles,
+                              land=land_mask(world).contains)
+    placed = ~np.isnan(donut_xy).any(axis=1)
+    top, anchors, donut_xy, names = top[placed], anchors[placed], donut_xy[placed], names[placed]
+
+    # Lines from countries to their donuts
+    ax.add_collection(LineCollection(np.stack([anchors, donut_xy], axis=1), colors='#555555',
+                                     linewidths=0.6, linestyles='-', zorder=1), autolim=False)
+
+    draw_donuts_on_map(ax, donut_xy, DONUT_RADIUS,
+                       country_sdg.reindex(top.index, fill_value=0), top.to_numpy())
+
+    # Add country labels below donuts
+    for name, (x, y) in zip(names, donut_xy):
+        ax.text(x, y - DONUT_LABEL_GAP, name, ha='center', va='top', fontsize=6, fontweight='bold')
+
+    ax.set_xlim(*MAP_XLIM)
+    ax.set_ylim(*MAP_YLIM)
     ax.set_aspect('equal')
     ax.axis('off')
     ax.set_title('B', loc='left', fontweight='bold', fontsize=14, x=-0.02)
@@ -316,10 +289,10 @@ def create_sdg_legend(ax, sdgs_in_data):
     ax.set_xlim(0, 1)
     ax.set_ylim(0, 1)
 
-def create_panel_c(ax, df):
+def create_panel_c(ax, cube):
     """Panel C: Article types with sustainability levels"""
     # Get article type counts with sustainability breakdown
-    article_sust = pd.crosstab(df['article_type'], df['level_of_sustainability'])
+    article_sust = cube.query('article_type', 'level_of_sustainability')
 
     # Sort by total count
     article_sust['total'] = article_sust.sum(axis=1)
@@ -362,181 +335,38 @@ def create_panel_c(ax, df):
              title='Sustainability Level', title_fontsize=9,
              framealpha=0.9, edgecolor='#cccccc')
 
-def create_panel_d(ax, df):
-    """Panel D: Sankey diagram for article_type × methodological_approach × spatial_scale"""
+# Panel D stages: coded column, categories shown (list, top N or None for all)
+# and column header
+SANKEY_STAGES = [
+    ('article_type', ['Empirical', 'Methodological', 'Review/Survey', 'Conceptual/Theoretical'],
+     'Article Type'),
+    ('methodological_approach', ['Quantitative', 'Mixed', 'Qualitative'],
+     'Methodological\nApproach'),
+    ('spatial_scale', 4, 'Spatial Scale'),
+]
 
-    # Prepare data - use all 4 article types
-    top_article_types = ['Empirical', 'Methodological', 'Review/Survey', 'Conceptual/Theoretical']
-    methodological = ['Quantitative', 'Mixed', 'Qualitative']
-    top_spatial = df['spatial_scale'].value_counts().head(4).index.tolist()
-
-    # Filter data
-    df_filtered = df[
-        (df['article_type'].isin(top_article_types)) &
-        (df['methodological_approach'].isin(methodological)) &
-        (df['spatial_scale'].isin(top_spatial))
-    ].dropna(subset=['article_type', 'methodological_approach', 'spatial_scale']).copy()
-
-    # Create flow data
-    flow1 = df_filtered.groupby(['article_type', 'methodological_approach']).size().reset_index(name='count')
-    flow2 = df_filtered.groupby(['methodological_approach', 'spatial_scale']).size().reset_index(name='count')
-
-    # Colors for article types
-    article_colors = {
-        'Empirical': '#66c2a5',
-        'Methodological': '#fc8d62',
-        'Review/Survey': '#8da0cb',
-        'Conceptual/Theoretical': '#e78ac3',
-    }
-    method_colors = {'Quantitative': '#4292c6', 'Mixed': '#807dba', 'Qualitative': '#df65b0'}
-    spatial_colors = {
-        top_spatial[0]: '#1b9e77',
-        top_spatial[1]: '#d95f02',
-        top_spatial[2]: '#7570b3',
-        top_spatial[3]: '#e7298a',
+def create_panel_d(ax, df, stages=SANKEY_STAGES):
+    """Panel D: Sankey diagram for article_type × methodological_approach × spatial_scale"""
+    layout = sankey_layout(df, [(column, cats) for column, cats, _ in stages])
+
+    # Colors for article types, methodological approaches and the top spatial scales
+    shown = dict(zip(layout.stages, layout.categories))
+    top_spatial = shown.get('spatial_scale', [])
+    colors = {
+        'article_type': {
+            'Empirical': '#66c2a5',
+            'Methodological': '#fc8d62',
+            'Review/Survey': '#8da0cb',
+            'Conceptual/Theoretical': '#e78ac3',
+        },
+        'methodological_approach': {'Quantitative': '#4292c6', 'Mixed': '#807dba',
+                                    'Qualitative': '#df65b0'},
+        'spatial_scale': dict(zip(top_spatial, ['#1b9e77', '#d95f02', '#7570b3', '#e7298a'])),
     }
 
     ax.set_xlim(0, 1)
     ax.set_ylim(0, 1)
-
-    # Calculate counts and positions
-    article_counts = df_filtered['article_type'].value_counts().reindex(top_article_types).fillna(0)
-    method_counts = df_filtered['methodological_approach'].value_counts().reindex(methodological).fillna(0)
-    spatial_counts = df_filtered['spatial_scale'].value_counts().reindex(top_spatial).fillna(0)
-
-    total = len(df_filtered)
-
-    # X positions for three columns
-    x1, x2, x3 = 0.15, 0.5, 0.85
-    node_width = 0.06
-
-    # Calculate node heights and positions
-    def calculate_positions(counts, total_height=0.75, start_y=0.88):
-        positions = {}
-        y = start_y
-        for name, count in counts.items():
-            if count > 0:
-                height = max((count / total) * total_height, 0.03)
-                positions[name] = {'y_top': y, 'y_bottom': y - height, 'y_center': y - height/2, 'height': height}
-                y -= height + 0.015
-        return positions
-
-    article_positions = calculate_positions(article_counts)
-    method_positions = calculate_positions(method_counts)
-    spatial_positions = calculate_positions(spatial_counts)
-
-    # Draw nodes
-    def draw_node(x, pos_dict, name, color, label_side='left'):
-        if name not in pos_dict:
-            return
-        pos = pos_dict[name]
-        rect = plt.Rectangle((x - node_width/2, pos['y_bottom']), node_width, pos['height'],
-                             facecolor=color, edgecolor='black', linewidth=0.5, zorder=3)
-        ax.add_patch(rect)
-
-        if label_side == 'left':
-            ax.text(x - node_width/2 - 0.01, pos['y_center'], name,
-                   ha='right', va='center', fontsize=7, zorder=4)
-        elif label_side == 'right':
-            ax.text(x + node_width/2 + 0.01, pos['y_center'], name,
-                   ha='left', va='center', fontsize=7, zorder=4)
-        else:  # center
-            ax.text(x, pos['y_center'], name,
-                   ha='center', va='center', fontsize=6, fontweight='bold',
-                   color='white', zorder=4)
-
-    # Draw all nodes
-    for name in top_article_types:
-        draw_node(x1, article_positions, name, article_colors.get(name, '#888888'), 'left')
-    for name in methodological:
-        draw_node(x2, method_positions, name, method_colors.get(name, '#888888'), 'center')
-    for name in top_spatial:
-        draw_node(x3, spatial_positions, name, spatial_colors.get(name, '#888888'), 'right')
-
-    # Draw flows with bezier curves
-    def draw_flow(x_start, x_end, y_start_top, y_start_bottom, y_end_top, y_end_bottom, color, alpha=0.4):
-        from matplotlib.patches import PathPatch
-        from matplotlib.path import Path
-
-        # Control points for bezier curve
-        ctrl_x = (x_start + x_end) / 2
-
-        # Create path for the flow band
-        vertices = [
-            (x_start, y_start_top),
-            (ctrl_x, y_start_top),
-            (ctrl_x, y_end_top),
-            (x_end, y_end_top),
-            (x_end, y_end_bottom),
-            (ctrl_x, y_end_bottom),
-            (ctrl_x, y_start_bottom),
-            (x_start, y_start_bottom),
-            (x_start, y_start_top),
-        ]
-
-        codes = [Path.MOVETO, Path.CURVE4, Path.CURVE4, Path.CURVE4,
-                Path.LINETO, Path.CURVE4, Path.CURVE4, Path.CURVE4, Path.CLOSEPOLY]
-
-        path = Path(vertices, codes)
-        patch = PathPatch(path, facecolor=color, edgecolor='none', alpha=alpha, zorder=1)
-        ax.add_patch(patch)
-
-    # Track y offsets for stacking flows
-    article_offsets = {name: 0 for name in top_article_types}
-    method_offsets_left = {name: 0 for name in methodological}
-    method_offsets_right = {name: 0 for name in methodological}
-    spatial_offsets = {name: 0 for name in top_spatial}
-
-    # Draw flows from article_type to methodological_approach
-    for _, row in flow1.iterrows():
-        art = row['article_type']
-        meth = row['methodological_approach']
-        count = row['count']
-
-        if art in article_positions and meth in method_positions:
-            flow_height_art = (count / article_counts[art]) * article_positions[art]['height']
-            flow_height_meth = (count / method_counts[meth]) * method_positions[meth]['height']
-
-            y_art_top = article_positions[art]['y_top'] - article_offsets[art]
-            y_art_bottom = y_art_top - flow_height_art
-
-            y_meth_top = method_positions[meth]['y_top'] - method_offsets_left[meth]
-            y_meth_bottom = y_meth_top - flow_height_meth
-
-            draw_flow(x1 + node_width/2, x2 - node_width/2,
-                     y_art_top, y_art_bottom, y_meth_top, y_meth_bottom,
-                     article_colors.get(art, '#888888'), alpha=0.35)
-
-            article_offsets[art] += flow_height_art
-            method_offsets_left[meth] += flow_height_meth
-
-    # Draw flows from methodological_approach to spatial_scale
-    for _, row in flow2.iterrows():
-        meth = row['methodological_approach']
-        spat = row['spatial_scale']
-        count = row['count']
-
-        if meth in method_positions and spat in spatial_positions:
-            flow_height_meth = (count / method_counts[meth]) * method_positions[meth]['height']
-            flow_height_spat = (count / spatial_counts[spat]) * spatial_positions[spat]['height']
-
-            y_meth_top = method_positions[meth]['y_top'] - method_offsets_right[meth]
-            y_meth_bottom = y_meth_top - flow_height_meth
-
-            y_spat_top = spatial_positions[spat]['y_top'] - spatial_offsets[spat]
-            y_spat_bottom = y_spat_top - flow_height_spat
-
-            draw_flow(x2 + node_width/2, x3 - node_width/2,
-                     y_meth_top, y_meth_bottom, y_spat_top, y_spat_bottom,
-                     method_colors.get(meth, '#888888'), alpha=0.35)
-
-            method_offsets_right[meth] += flow_height_meth
-            spatial_offsets[spat] += flow_height_spat
-
-    # Add column headers
-    ax.text(x1, 0.95, 'Article Type', ha='center', va='bottom', fontsize=10, fontweight='bold')
-    ax.text(x2, 0.95, 'Methodological\nApproach', ha='center', va='bottom', fontsize=10, fontweight='bold')
-    ax.text(x3, 0.95, 'Spatial Scale', ha='center', va='bottom', fontsize=10, fontweight='bold')
+    draw_sankey(ax, layout, colors, headers=[header for _, _, header in stages])
 
     ax.axis('off')
     ax.set_title('D', loc='left', fontweight='bold', fontsize=14, x=-0.02)
@@ -545,6 +375,7 @@ def main():
     """Create the complete overview figure"""
     print("Loading data...")
     df = load_data()
+    cube = CountCube.load('full')
     print(f"Loaded {len(df)} articles")
 
     # Create figure with custom layout
@@ -559,7 +390,7 @@ def main():
     # Panel A: Articles per year
     print("Creating Panel A...")
     ax_a = fig.add_subplot(gs[0, 0])
-    sdg_order = create_panel_a(ax_a, df)
+    sdg_order = create_panel_a(ax_a, cube)
 
     # Panel B: World map
     print("Creating Panel B...")
@@ -574,7 +405,7 @@ def main():
     # Panel C: Article types with sustainability
     print("Creating Panel C...")
     ax_c = fig.add_subplot(gs[2, 0])
-    create_panel_c(ax_c, df)
+    create_panel_c(ax_c, cube)
 
     # Panel D: Sankey diagram
     print("Creating Panel D...")
@@ -584,11 +415,8 @@ def main():
     # Save as PDF
     output_path = 'overview_figure.pdf'
     print(f"Saving to {output_path}...")
-    fig.savefig(output_path, format='pdf', dpi=300, bbox_inches='tight',
-                edgecolor='none', facecolor='white')
-
-    # Also save as PNG for quick preview
-    fig.savefig('overview_figure.png', format='png', dpi=300, bbox_inches='tight',
+    # PDF plus a PNG for quick preview
+    save_figure(fig, 'overview_figure', formats=('pdf', 'png'), dpi=300,
                 edgecolor='none', facecolor='white')
 
     print("Done! Files saved: overview_figure.pdf, overview_figure.png")